@@ -2,68 +2,332 @@
 JalJeevan Score - Clean Dashboard & API
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse, JSONResponse, Response
+import asyncio
+import hmac
+import importlib.util
+import io
 import json
 import math
 import os
 import traceback
+from contextlib import asynccontextmanager, suppress
 from datetime import datetime
-import uvicorn
-from config import STATS_JSONL, ALERTS_JSONL, NGT_DIR, ZONES
+from typing import Optional
+from config import STATS_JSONL, ALERTS_JSONL, NGT_DIR, FIR_CONFIG
+from config import ALERT_VIOLATIONS, LEGAL_VIOLATIONS
+from config import ADMIN_TOKEN, PROFILE_DIR, VALIDATION_JSON, RAG_CONFIG
+from config import LATENCY_CONFIG
+from docstore import DocStoreClient
+from evidence import EvidenceIndex
+from federation import Federation
+from fir import FirRegistry, FirSubmitter, IdempotencyConflict
+from legal import clause_index
+from lifecycle import row_decline, zone_status
+from lineage import LatencyTracker
+from profiling import MEMORY, SAMPLER, install as install_profiling
+from rollups import RollupIndex
+from views import ZoneView
+from zones import registry
+
+# Optional fast encoders -- the API degrades to stdlib JSON without them.
+# pandas and pyarrow take ~0.5 s to import, so they load on the first data
+# request (or the warm-up started by lifespan), never before /api/health answers.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+HAS_ARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed."""
+
+    def render(self, content):
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Run the FIR submitter alongside the API when an authority endpoint is
+    configured, follow the sinks so rows are applied (and their latency timed)
+    as they land, and import pandas / pyarrow in the background meanwhile.
+    """
+    install_profiling("api")
+    warm = asyncio.get_running_loop().run_in_executor(None, _warm_imports)
+    tasks = [asyncio.create_task(_follow_sinks())]
+    if SUBMITTER.endpoint:
+        tasks.append(asyncio.create_task(SUBMITTER.run()))
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await warm
+    await SUBMITTER.close()
+    await FEDERATION.close()
+    await DOCSTORE.close()
+
+
+app = FastAPI(title="JalJeevan Score", default_response_class=FastJSONResponse, lifespan=lifespan)
+
+MEDIA_JSON = "application/json"
+MEDIA_MSGPACK = "application/msgpack"
+MEDIA_ARROW = "application/vnd.apache.arrow.stream"
+
+# Accept-header aliases -> canonical media type
+_MEDIA_ALIASES = {
+    MEDIA_JSON: MEDIA_JSON,
+    MEDIA_MSGPACK: MEDIA_MSGPACK,
+    "application/x-msgpack": MEDIA_MSGPACK,
+    MEDIA_ARROW: MEDIA_ARROW,
+    "application/vnd.apache.arrow.file": MEDIA_ARROW,
+}
+
+EVIDENCE = EvidenceIndex()
+ROLLUPS = RollupIndex()
+FIRS = FirRegistry()
+SUBMITTER = FirSubmitter(FIRS)
+FEDERATION = Federation()  # stats / alerts / legal come from the basin APIs when configured
+DOCSTORE = DocStoreClient()  # the pipeline's live DocumentStore (docstore.py)
+
+STATS_NUMERIC = ["dolphin_count", "avg_48h", "min_48h", "max_48h", "mining_conf", "total_samples"]
+STATS_SORT = {"zone": str, "decline_pct": float, "dolphin_count": float, "avg_48h": float,
+              "causal_strength": float, "forecast_decline_pct": float, "observed_at": str}
+ALERTS_SORT = {"zone": str, "decline_pct": float, "dolphin_count": float, "observed_at": str}
+
+
+def _with_status(row):
+    """decline_pct / status for stats rows written before the pipeline added them."""
+    if "status" in row:
+        return row
+    decline = row_decline(row)
+    return dict(row, decline_pct=decline, status=zone_status(decline))
+
+
+LATENCY = LatencyTracker()  # ingest -> visible per row, from the lineage on sink rows
+STATS = ZoneView(STATS_JSONL, STATS_SORT, derive=_with_status,
+                 visible=LATENCY.observer("stats"))
+ALERTS = ZoneView(ALERTS_JSONL, ALERTS_SORT, status_field="state",
+                  keep=lambda a: a.get("state") != "resolved",
+                  visible=LATENCY.observer("alerts"))
+
+
+async def _follow_sinks():
+    """Apply new sink rows every follow_ms, so visibility does not wait for a request."""
+    while True:
+        await asyncio.sleep(LATENCY_CONFIG["follow_ms"] / 1000)
+        try:
+            STATS.refresh()
+            ALERTS.refresh()
+        except Exception:  # a bad sink read must not stop the follower
+            traceback.print_exc()
 
-app = FastAPI(title="JalJeevan Score")
 
 # Helpers
-def _read_jsonl(path):
-    """Read JSONL file, return latest row per zone."""
-    if not os.path.exists(path):
-        return []
+def _available_media():
+    """Media types whose encoder is installed, in server preference order."""
+    out = [MEDIA_JSON]
+    if msgpack is not None:
+        out.append(MEDIA_MSGPACK)
+    if HAS_ARROW:
+        out.append(MEDIA_ARROW)
+    return out
+
+
+def _negotiate(accept):
+    """Pick a response media type from an Accept header (JSON when absent or */*)."""
+    if not accept or not accept.strip():
+        return MEDIA_JSON
+    available = _available_media()
+    ranked = []
+    for i, part in enumerate(accept.split(",")):
+        fields = [f.strip() for f in part.split(";")]
+        media, q = fields[0].lower(), 1.0
+        for p in fields[1:]:
+            if p.startswith("q="):
+                try:
+                    q = float(p[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            ranked.append((-q, i, media))
+    for _, _, media in sorted(ranked):
+        if media in ("*/*", "application/*"):
+            return MEDIA_JSON
+        media = _MEDIA_ALIASES.get(media)
+        if media in available:
+            return media
+    raise HTTPException(
+        status_code=406,
+        detail={"error": "Not Acceptable", "supported": available},
+    )
+
+
+def _frame(rows):
+    """DataFrame of row dicts (pandas is imported on the first call)."""
+    import pandas as pd
+    return pd.DataFrame(rows)
+
+
+def _warm_imports():
+    """Import the data-path libraries off the event loop once the API is up."""
+    import pandas  # noqa: F401
+    if HAS_ARROW:
+        import pyarrow  # noqa: F401
+
+
+def _arrow_table(frame):
+    """Columnar Arrow table; mixed-type object columns are coerced to strings."""
+    import pyarrow as pa
     try:
-        rows = {}
-        for line in open(path, encoding="utf-8"):
-            if line.strip():
-                obj = json.loads(line)
-                rows[obj.get("zone", "?")] = obj
-        return list(rows.values())
-    except Exception:
-        return []
+        return pa.Table.from_pandas(frame, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        obj = frame.select_dtypes(include="object").columns
+        fixed = frame.copy()
+        fixed[obj] = fixed[obj].where(fixed[obj].isna(), fixed[obj].astype(str))
+        return pa.Table.from_pandas(fixed, preserve_index=False)
+
+
+def _frame_response(frame, media):
+    """Serialize a whole DataFrame in one step using the negotiated format."""
+    headers = {"Vary": "Accept"}
+    if media == MEDIA_ARROW:
+        import pyarrow as pa
+        table = _arrow_table(frame)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(sink.getvalue(), media_type=media, headers=headers)
+    if media == MEDIA_MSGPACK:
+        records = frame.astype(object).where(frame.notna(), None).to_dict("records")
+        return Response(msgpack.packb(records), media_type=media, headers=headers)
+    body = frame.to_json(orient="records", date_format="iso") if len(frame.columns) else "[]"
+    return Response(body, media_type=MEDIA_JSON, headers=headers)
+
+
+def _clean_stats(data):
+    """Zero-fill missing numeric stats columns for all zones at once."""
+    import pandas as pd
+    frame = pd.DataFrame(data)
+    for col in STATS_NUMERIC:
+        if col not in frame:
+            frame[col] = 0
+    frame[STATS_NUMERIC] = frame[STATS_NUMERIC].apply(pd.to_numeric, errors="coerce").fillna(0)
+    frame["mining_detected"] = frame["mining_conf"] > 0
+    return frame
+
+
+def _page_response(view, request, status, sort, limit, cursor, clean=None):
+    """One page of an indexed view, with X-Total-Count / X-Next-Cursor headers."""
+    media = _negotiate(request.headers.get("accept"))
+    try:
+        rows, total, next_cursor = view.page(status or None, sort, limit, cursor or None)
+    except KeyError:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": f"Unknown sort {sort}", "supported": list(view.sort_keys)},
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={"error": str(e)})
+    frame = clean(rows) if clean is not None and rows else _frame(rows)
+    response = _frame_response(frame, media)
+    response.headers["X-Total-Count"] = str(total)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+
+async def _federated_page(path, sort_keys, request, status, sort, limit, cursor):
+    """A page merged across the basin backends; X-Federation-* name the missing ones."""
+    media = _negotiate(request.headers.get("accept"))
+    try:
+        rows, total, next_cursor, report = await FEDERATION.page(
+            path, sort_keys, status, sort, limit, cursor)
+    except KeyError:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": f"Unknown sort {sort}", "supported": list(sort_keys)},
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={"error": str(e)})
+    if len(report["failed"]) == len(FEDERATION.backends):
+        raise HTTPException(status_code=502, detail={"error": "No basin backend answered"})
+    response = _frame_response(_frame(rows), media)
+    response.headers["X-Total-Count"] = str(total)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    for state, basins in report.items():
+        if basins:
+            response.headers[f"X-Federation-{state.title()}"] = ",".join(basins)
+    return response
+
+
+def _changes(view, since, clean=None):
+    """Rows changed since a view version, for clients that patch their own copy."""
+    rows, removed, version, full = view.changes(since or None)
+    if clean is not None and rows:
+        frame = clean(rows)
+        rows = frame.astype(object).where(frame.notna(), None).to_dict("records")
+    return {"version": version, "full": full, "rows": rows, "removed": removed}
+
 
 def bm25_rag(query):
-    """BM25-style retrieval over NGT orders."""
+    """BM25-style retrieval over NGT orders (served from the clause index, never re-read)."""
     if not os.path.exists(NGT_DIR):
         return {"answer": "NGT documents not found.", "sources": [], "confidence": 0, "method": "BM25", "indexed_documents": 0}
-    
-    docs = {}
-    for f in os.listdir(NGT_DIR):
-        if f.endswith(".txt"):
-            try:
-                docs[f] = open(os.path.join(NGT_DIR, f), encoding="utf-8").read()
-            except:
-                pass
-    
-    if not docs:
+
+    index = clause_index()
+    if not len(index):
         return {"answer": "No NGT documents available.", "sources": [], "confidence": 0, "method": "BM25", "indexed_documents": 0}
-    
+
     words = set(query.lower().split())
-    scored = sorted(
-        [(sum(v.lower().count(w) for w in words), k, v) for k, v in docs.items()],
-        reverse=True,
-    )
-    
-    if not scored or scored[0][0] == 0:
-        return {"answer": "No relevant documents found.", "sources": list(docs.keys()), "confidence": 0, "method": "BM25", "indexed_documents": len(docs)}
-    
-    sc, fname, content = scored[0]
-    paras = [p.strip() for p in content.split("\n\n") if p.strip()]
-    best = next((p for p in paras if any(w in p.lower() for w in words)), paras[0])
-    
+    scored = index.search(words)
+
+    if not scored:
+        return {"answer": "No relevant documents found.",
+                "sources": [o["source"] for o in index.orders()], "confidence": 0,
+                "method": "BM25", "indexed_documents": len(index)}
+
+    sc, _, best = scored[0]
     return {
         "answer": best,
-        "sources": [s[1] for s in scored if s[0] > 0][:3],
+        "sources": [s[1] for s in scored][:3],
         "confidence": round(min(sc / (max(len(words), 1) * 3), 1.0), 2),
         "method": "BM25",
-        "indexed_documents": len(docs),
+        "indexed_documents": len(index),
+    }
+
+
+async def docstore_rag(query):
+    """Retrieval from the pipeline's DocumentStore service; None when it is down."""
+    hits, stats = await asyncio.gather(DOCSTORE.retrieve(query, RAG_CONFIG["k_retrieval"]),
+                                       DOCSTORE.statistics())
+    if hits is None:
+        return None
+    count = (stats or {}).get("file_count")
+    if not hits:
+        return {"answer": "No relevant documents found.", "sources": [], "confidence": 0,
+                "method": "DocumentStore", "indexed_documents": count}
+
+    words = set(query.lower().split())
+    paras = [p.strip() for p in hits[0]["text"].split("\n\n") if p.strip()] or [hits[0]["text"]]
+    counts = [sum(p.lower().count(w) for w in words) for p in paras]
+    best = paras[counts.index(max(counts))]
+    return {
+        "answer": best,
+        "sources": list(dict.fromkeys(h["source"] for h in hits))[:3],
+        "confidence": round(min(sum(counts) / (max(len(words), 1) * 3), 1.0), 2),
+        "method": "DocumentStore",
+        "indexed_documents": count,
     }
 
 # API Endpoints
@@ -74,79 +338,125 @@ async def health():
         ngt_count = 0
         if os.path.exists(NGT_DIR):
             ngt_count = len([f for f in os.listdir(NGT_DIR) if f.endswith(".txt")])
+        rejected = 0
+        if os.path.exists(VALIDATION_JSON):
+            with open(VALIDATION_JSON) as f:
+                rejected = json.load(f)["rejected"]
         return {
             "status": "operational",
             "pathway": "streaming_active",
             "stats_file": os.path.exists(STATS_JSONL),
             "alerts_file": os.path.exists(ALERTS_JSONL),
             "ngt_docs": ngt_count,
-            "zones": len(ZONES),
+            "zones": len(registry()),
+            "zones_version": registry().version,
+            "zone_status": STATS.refresh().counts(),
+            "legal_orders": len(clause_index()),
+            "legal_version": clause_index().version,
+            "rejected_rows": rejected,
+            "basins": sorted(FEDERATION.backends),
+            "docstore": DOCSTORE.snapshot(),
+            "latency": LATENCY.summary(),
             "timestamp": datetime.now().isoformat(),
         }
     except Exception as e:
         return {"status": "error", "error": str(e), "timestamp": datetime.now().isoformat()}
 
 @app.get("/api/stats")
-async def stats():
-    """Get zone statistics"""
-    try:
-        data = _read_jsonl(STATS_JSONL)
-        if data:
-            cleaned = []
-            for row in data:
-                fixed = dict(row)
-                fixed["dolphin_count"] = row.get("dolphin_count") or 0
-                fixed["avg_48h"] = row.get("avg_48h") or 0
-                fixed["min_48h"] = row.get("min_48h") or 0
-                fixed["max_48h"] = row.get("max_48h") or 0
-                fixed["mining_conf"] = row.get("mining_conf") or 0
-                fixed["total_samples"] = row.get("total_samples") or 0
-                fixed["mining_detected"] = fixed["mining_conf"] > 0
-                cleaned.append(fixed)
-            return cleaned
-        return []
-    except Exception as e:
-        traceback.print_exc()
-        return []
+async def stats(request: Request, status: str = "", sort: str = "zone",
+                limit: Optional[int] = None, cursor: str = ""):
+    """Zone statistics, filtered by status (crit / warn / good), sorted and paged"""
+    if FEDERATION:
+        return await _federated_page("/api/stats", STATS_SORT, request, status, sort, limit, cursor)
+    return _page_response(STATS, request, status, sort, limit, cursor, clean=_clean_stats)
 
 @app.get("/api/alerts")
-async def alerts():
-    """Get alerts"""
-    try:
-        data = _read_jsonl(ALERTS_JSONL)
-        if data:
-            return data
-        return []
-    except Exception as e:
-        traceback.print_exc()
-        return []
+async def alerts(request: Request, status: str = "", sort: str = "zone",
+                 limit: Optional[int] = None, cursor: str = ""):
+    """Active alerts (latest lifecycle record per zone, resolved dropped), paged"""
+    if FEDERATION:
+        return await _federated_page("/api/alerts", ALERTS_SORT, request, status, sort, limit,
+                                     cursor)
+    return _page_response(ALERTS, request, status, sort, limit, cursor)
+
+@app.get("/api/stats/changes")
+async def stats_changes(since: str = ""):
+    """Stats rows changed since `since` (a version from a previous call); full when stale"""
+    if FEDERATION:
+        return await FEDERATION.changes("/api/stats/changes", since)
+    return _changes(STATS, since, clean=_clean_stats)
+
+@app.get("/api/alerts/changes")
+async def alerts_changes(since: str = ""):
+    """Alerts changed or resolved since `since`; full snapshot when stale"""
+    if FEDERATION:
+        return await FEDERATION.changes("/api/alerts/changes", since)
+    return _changes(ALERTS, since)
+
+@app.get("/api/federation")
+async def federation():
+    """Basin backends: URL, timeout, ok / stale / failed answers, last latency and error"""
+    return {"backends": FEDERATION.snapshot()}
 
 @app.get("/api/evidence")
-async def evidence():
-    """Get evidence packages"""
+async def evidence(request: Request, zone: str = ""):
+    """Get evidence package summaries (JSON, MessagePack or Arrow via Accept)"""
+    media = _negotiate(request.headers.get("accept"))
     try:
-        data = _read_jsonl(ALERTS_JSONL)
-        packages = []
-        for a in data:
-            dolphin_count = a.get("dolphin_count") or 0
-            avg_48h = a.get("avg_48h") or 0
-            decline_pct = a.get("decline_pct") or 0
-            mining_conf = a.get("mining_conf") or 0
-            zone = a.get("zone") or "Unknown"
-            
-            packages.append({
-                "case_id": a.get("case_id", f"NGT-{datetime.now().strftime('%Y%m%d')}-{zone}"),
-                "zone": zone,
-                "dolphin_count": dolphin_count,
-                "avg_48h": avg_48h,
-                "decline_pct": decline_pct,
-                "mining_conf": mining_conf,
-                "status": "ready_for_filing",
-            })
-        return packages
+        frame = _frame(EVIDENCE.list(zone or None))
     except Exception as e:
         traceback.print_exc()
-        return []
+        frame = _frame([])
+    return _frame_response(frame, media)
+
+@app.get("/api/evidence/{case_id}")
+async def evidence_package(case_id: str):
+    """Full evidence package, served byte-for-byte from the content-addressed store"""
+    body = EVIDENCE.get_bytes(case_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail=f"No evidence package for {case_id}")
+    return Response(body, media_type=MEDIA_JSON)
+
+@app.get("/api/rollups")
+async def rollups(request: Request, zone: str = "", start: str = "", end: str = "",
+                  resolution: str = ""):
+    """Pre-aggregated per-zone buckets; resolution picked from the range unless given"""
+    media = _negotiate(request.headers.get("accept"))
+    try:
+        res, points = ROLLUPS.query(zone or None, start or None, end or None, resolution or None)
+    except KeyError:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": f"Unknown resolution {resolution}",
+                    "supported": list(ROLLUPS.resolutions)},
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={"error": str(e)})
+    response = _frame_response(_frame(points), media)
+    response.headers["X-Rollup-Resolution"] = res
+    return response
+
+@app.get("/api/latency")
+async def latency(zone: str = "", limit: int = 50):
+    """Per-stage ingest -> API visibility histograms and sampled row traces"""
+    STATS.refresh()
+    ALERTS.refresh()
+    return LATENCY.snapshot(zone or None, max(0, min(limit, 1000)))
+
+@app.get("/api/zones")
+async def zones(request: Request, lat: Optional[float] = None, lon: Optional[float] = None,
+                max_km: Optional[float] = None):
+    """Registered zones; with lat/lon, the nearest zone and its distance"""
+    reg = registry()
+    if lat is None and lon is None:
+        return _frame_response(_frame(list(reg)), _negotiate(request.headers.get("accept")))
+    if lat is None or lon is None:
+        raise HTTPException(status_code=400, detail={"error": "Give both lat and lon"})
+    hit = reg.nearest(lat, lon, max_km)
+    if hit is None:
+        raise HTTPException(status_code=404, detail={"error": "No zone within range"})
+    zone, km = hit
+    return dict(zone, distance_km=km)
 
 @app.get("/api/legal")
 async def legal(q: str = ""):
@@ -154,25 +464,128 @@ async def legal(q: str = ""):
     try:
         if not q.strip():
             return {"answer": "Ask about NGT laws.", "sources": [], "confidence": 0, "method": "BM25", "indexed_documents": 0}
-        return bm25_rag(q)
+        if FEDERATION:
+            return await FEDERATION.legal(q)
+        return await docstore_rag(q) or bm25_rag(q)
     except Exception as e:
         traceback.print_exc()
         return {"answer": f"Error: {str(e)}", "sources": [], "confidence": 0, "method": "BM25", "indexed_documents": 0}
 
+@app.get("/api/legal/clauses")
+async def legal_clauses(violation: str = ""):
+    """Structured NGT clauses (orders, sections, penalties, thresholds, deadlines) by violation"""
+    kinds = [v for v in violation.split(",") if v] or list(ALERT_VIOLATIONS)
+    unknown = [v for v in kinds if v not in LEGAL_VIOLATIONS]
+    if unknown:
+        raise HTTPException(status_code=400,
+                            detail={"error": f"Unknown violation {unknown[0]}",
+                                    "supported": list(LEGAL_VIOLATIONS)})
+    index = clause_index()
+    return {"violations": kinds, "sections": index.sections(kinds), "clauses": index.lookup(kinds)}
+
+def _fir_view(rec):
+    return {
+        "status": rec["status"],
+        "fir_number": rec["fir_number"],
+        "case_id": rec["case_id"],
+        "incident_id": rec["incident_id"],
+        "zone": rec["zone"],
+        "submitted_to": rec.get("submitted_to"),
+        "evidence": [rec.get("evidence_hash")],
+        "legal_sections": rec.get("legal_sections", []),
+        "timestamp": rec["created_at"],
+        "submitted_at": rec["submitted_at"],
+        "reference": rec["reference"],
+        "attempts": rec["attempts"],
+        "last_error": rec["last_error"],
+    }
+
+@app.get("/api/fir/metrics")
+async def fir_metrics():
+    """FIR submitter throughput, queue depth and filings per status"""
+    return SUBMITTER.snapshot()
+
+@app.get("/api/fir/{case_id}")
+async def fir_status(case_id: str):
+    """Filing state of a case's FIR"""
+    rec = FIRS.get(case_id)
+    if rec is None:
+        raise HTTPException(status_code=404, detail=f"No FIR filed for {case_id}")
+    return _fir_view(rec)
+
 @app.post("/api/fir/{case_id}")
-async def fir(case_id: str):
-    """Auto-file FIR"""
+async def fir(case_id: str, request: Request):
+    """File an FIR for a case once; repeats return the same FIR (201 only when new)"""
+    body = EVIDENCE.get_bytes(case_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail=f"No evidence package for {case_id}")
+    package = json.loads(body)
+    payload = {
+        "evidence_hash": package["content_hash"],
+        "legal_sections": (package.get("legal_sections")
+                           or clause_index().sections(ALERT_VIOLATIONS)),
+        "submitted_to": FIR_CONFIG["authority"],
+    }
     try:
-        return {
-            "status": "success",
-            "fir_number": f"FIR-{datetime.now().strftime('%Y%m%d%H%M')}-{case_id}",
-            "submitted_to": "District Magistrate Varanasi + NGT",
-            "evidence": ["sentinel1_sar.png", "cpcb_sensor_data.csv"],
-            "legal_sections": ["IPC §379", "EPA 1986 §15"],
-            "timestamp": datetime.now().isoformat(),
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        rec, created = FIRS.file(
+            case_id, payload, idempotency_key=request.headers.get("idempotency-key"),
+            incident_id=package.get("incident_id"), zone=package.get("zone"),
+        )
+    except IdempotencyConflict:
+        raise HTTPException(status_code=409,
+                            detail={"error": "Idempotency-Key already used for another case"})
+    if created:
+        SUBMITTER.wake()
+    return FastJSONResponse(_fir_view(rec), status_code=201 if created else 200)
+
+def _admin(request):
+    """Admin endpoints exist only when JALJEEVAN_ADMIN_TOKEN is set, and need it."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    token = request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail={"error": "Bad or missing X-Admin-Token"})
+
+def _profile_status():
+    files = sorted(PROFILE_DIR.glob("*.collapsed"), key=lambda p: p.stat().st_mtime)
+    return {
+        "running": SAMPLER.running,
+        "until": datetime.fromtimestamp(SAMPLER.until).isoformat() if SAMPLER.until else None,
+        "samples": SAMPLER.samples,
+        "last": str(SAMPLER.last_path) if SAMPLER.last_path else None,
+        "profiles": [p.name for p in files[-20:]],
+    }
+
+@app.get("/api/admin/profile")
+async def profile_status(request: Request):
+    """Sampling profiler state and the most recent collapsed-stack files"""
+    _admin(request)
+    return _profile_status()
+
+@app.post("/api/admin/profile")
+async def profile_start(request: Request, seconds: Optional[float] = None):
+    """Sample this process's stacks for `seconds` (409 if a profile is running)"""
+    _admin(request)
+    if seconds is not None and seconds <= 0:
+        raise HTTPException(status_code=400, detail={"error": "seconds must be positive"})
+    if not SAMPLER.start(seconds):
+        raise HTTPException(status_code=409, detail={"error": "A profile is already running"})
+    return FastJSONResponse(_profile_status(), status_code=202)
+
+@app.get("/api/admin/memory")
+async def memory_diff(request: Request, top: int = 20):
+    """Allocation growth since the previous call (tracemalloc must be on)"""
+    _admin(request)
+    if not MEMORY.active:
+        raise HTTPException(status_code=409, detail={"error": "Memory tracing is off"})
+    return {"diff": MEMORY.diff(top=max(1, min(top, 200)))}
+
+@app.post("/api/admin/memory")
+async def memory_switch(request: Request, on: bool = True):
+    """Switch tracemalloc on (baseline snapshot) or off"""
+    _admin(request)
+    MEMORY.enable() if on else MEMORY.disable()
+    return {"active": MEMORY.active}
 
 HTML = """<!DOCTYPE html>
 <html>
@@ -187,14 +600,23 @@ body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Arial, sans-s
 .stat { padding: 15px; background: #f5f5f5; border-radius: 8px; }
 .stat-label { font-size: 12px; color: #666; text-transform: uppercase; margin-bottom: 5px; }
 .stat-value { font-size: 24px; font-weight: bold; }
-.zones { display: grid; grid-template-columns: repeat(3, 1fr); gap: 15px; margin: 20px 0; }
-.zone { padding: 15px; background: #f5f5f5; border-radius: 8px; border-left: 4px solid #999; }
+.vlist { position: relative; overflow-y: auto; margin: 20px 0; }
+.vinner { position: relative; }
+.vinner > div { position: absolute; top: 0; left: 0; }
+.zones { height: 420px; }
+.zone { height: 86px; overflow: hidden; padding: 15px; background: #f5f5f5; border-radius: 8px;
+        border-left: 4px solid #999; }
 .zone.good { border-left-color: #22c55e; }
 .zone.warn { border-left-color: #f59e0b; background: #fffbeb; }
 .zone.crit { border-left-color: #ef4444; background: #fef2f2; }
-table { width: 100%; border-collapse: collapse; margin: 20px 0; }
-th, td { padding: 10px; text-align: left; border-bottom: 1px solid #eee; }
-th { font-weight: 600; background: #f5f5f5; }
+.table { height: 400px; margin-top: 0; }
+.trow { display: grid; grid-template-columns: 2fr 1fr 1fr 1fr 1fr; height: 40px;
+        align-items: center; border-bottom: 1px solid #eee; }
+.trow > span { padding: 0 10px; overflow: hidden; white-space: nowrap; text-overflow: ellipsis; }
+.thead { font-weight: 600; background: #f5f5f5; margin-top: 20px; }
+.alerts { max-height: 300px; }
+.alert { height: 84px; overflow: hidden; background: #fef2f2; padding: 10px;
+         border-left: 4px solid #ef4444; }
 button { padding: 8px 12px; background: #0066cc; color: white; border: none; border-radius: 4px; cursor: pointer; }
 button:hover { background: #0052a3; }
 #ragOut { display: none; padding: 15px; background: #f5f5f5; border-radius: 8px; margin: 10px 0; }
@@ -215,13 +637,16 @@ button:hover { background: #0052a3; }
   </div>
 
   <h2 style="margin-top: 30px;">Zone Status</h2>
-  <div class="zones" id="zones"></div>
+  <div class="vlist zones" id="zones"></div>
 
   <h2 style="margin-top: 30px;">Details</h2>
-  <table><thead><tr><th>Zone</th><th>Count</th><th>48h Avg</th><th>Mining</th><th>Status</th></tr></thead><tbody id="tbody"></tbody></table>
+  <div class="trow thead"><span>Zone</span><span>Count</span><span>48h Avg</span>
+    <span>Mining</span><span>Status</span></div>
+  <div class="vlist table" id="table"></div>
 
   <h2>Alerts</h2>
-  <div id="alerts" style="color: #888;">No active alerts</div>
+  <div id="noAlerts" style="color: #888;">No active alerts</div>
+  <div class="vlist alerts" id="alerts"></div>
 
   <h2>Legal Search</h2>
   <input id="qIn" type="text" style="width: 100%; padding: 10px; margin: 10px 0;" placeholder="Ask about NGT orders...">
@@ -230,44 +655,149 @@ button:hover { background: #0052a3; }
 </div>
 
 <script>
+// Rows keyed by zone, patched from /api/*/changes deltas (only changed zones travel)
+const OVERSCAN = 4;
+const views = {
+  stats: {rows: new Map(), version: ''},
+  alerts: {rows: new Map(), version: ''},
+};
+
+function applyDelta(view, delta) {
+  if (delta.full) view.rows.clear();
+  for (const r of delta.rows) view.rows.set(r.zone, r);
+  for (const z of delta.removed) view.rows.delete(z);
+  view.version = delta.version;
+  return delta.full || delta.rows.length > 0 || delta.removed.length > 0;
+}
+
+function byDecline(rows) {
+  // Worst first, then by zone, so the top of each list is what needs attention
+  const d = r => (r.decline_pct == null ? -Infinity : r.decline_pct);
+  return rows.sort((a, b) => (d(b) - d(a)) || (a.zone < b.zone ? -1 : a.zone > b.zone ? 1 : 0));
+}
+
+function windowRange(scrollTop, viewHeight, itemHeight, cols, count) {
+  // [first, last) item indexes with a DOM node: the visible rows plus OVERSCAN each side
+  const rows = Math.ceil(count / cols);
+  const first = Math.max(0, Math.floor(scrollTop / itemHeight) - OVERSCAN);
+  const last = Math.min(rows, Math.ceil((scrollTop + viewHeight) / itemHeight) + OVERSCAN);
+  return [Math.min(count, first * cols), Math.min(count, last * cols)];
+}
+
+// Virtualized list / grid: nodes exist only for the visible window, are keyed by
+// zone, and are refilled only when that zone's row object was replaced by a delta
+class VirtualList {
+  constructor(el, itemHeight, minWidth, gap, make, fill) {
+    Object.assign(this, {el, itemHeight, minWidth, gap, make, fill});
+    this.items = [];
+    this.nodes = new Map();
+    this.inner = el.appendChild(document.createElement('div'));
+    this.inner.className = 'vinner';
+    el.addEventListener('scroll', () => this.schedule());
+    window.addEventListener('resize', () => this.schedule());
+  }
+  setItems(items) { this.items = items; this.schedule(); }
+  schedule() {
+    if (this.pending) return;
+    this.pending = true;
+    requestAnimationFrame(() => { this.pending = false; this.draw(); });
+  }
+  draw() {
+    const width = this.el.clientWidth;
+    const cols = Math.max(1, Math.floor(width / this.minWidth));
+    const colWidth = width / cols;
+    const rows = Math.ceil(this.items.length / cols);
+    this.inner.style.height = rows * this.itemHeight + 'px';
+    const [lo, hi] = windowRange(this.el.scrollTop, this.el.clientHeight, this.itemHeight,
+                                 cols, this.items.length);
+    const seen = new Set();
+    for (let i = lo; i < hi; i++) {
+      const row = this.items[i];
+      let node = this.nodes.get(row.zone);
+      if (!node) {
+        node = this.inner.appendChild(this.make());
+        this.nodes.set(row.zone, node);
+      }
+      seen.add(row.zone);
+      if (node._row !== row) { this.fill(node, row); node._row = row; }
+      const pos = `${(i % cols) * colWidth}px,${Math.floor(i / cols) * this.itemHeight}px`;
+      if (node._pos !== pos) {
+        node.style.transform = `translate(${pos})`;
+        node.style.width = (colWidth - this.gap) + 'px';
+        node._pos = pos;
+      }
+    }
+    for (const [zone, node] of this.nodes) {
+      if (!seen.has(zone)) { node.remove(); this.nodes.delete(zone); }
+    }
+  }
+}
+
+function template(cls, html) {
+  return () => {
+    const n = document.createElement('div');
+    n.className = cls;
+    n.innerHTML = html;
+    return n;
+  };
+}
+
+function texts(node, values) {
+  node.querySelectorAll('[data-f]').forEach((el, i) => { el.textContent = values[i]; });
+}
+
+const fmtAvg = z => (z.avg_48h ? Math.round(z.avg_48h) : '--');
+
+function fillCard(n, z) {
+  n.className = 'zone ' + (z.status || 'good');  // status computed by the pipeline
+  texts(n, [z.zone, z.dolphin_count || 0, fmtAvg(z)]);
+}
+
+function fillRow(n, z) {
+  texts(n, [z.zone, z.dolphin_count || 0, fmtAvg(z), z.mining_detected ? 'YES' : 'No',
+            (z.status || 'good').toUpperCase()]);
+}
+
+function fillAlert(n, a) {
+  texts(n, [a.zone, `${a.dolphin_count} dolphins (↓ ${a.decline_pct}%)`,
+            a.mining_conf ? Math.round(a.mining_conf * 100) + '%' : 'N/A', a.case_id || 'Pending']);
+}
+
+let zoneList, tableList, alertList, loading = false;
+
+async function fetchChanges(url, view) {
+  const delta = await fetch(url + '?since=' + encodeURIComponent(view.version))
+    .then(r => r.json()).catch(() => null);
+  return delta ? applyDelta(view, delta) : false;
+}
+
 async function load() {
-  const now = new Date().toLocaleTimeString();
-  document.getElementById('ts').innerText = 'Updated: ' + now;
-
-  const stats = await fetch('/api/stats').then(r => r.json()).catch(() => []);
-  if (!stats.length) return;
-
-  let total = 0;
-  stats.forEach(z => total += (z.dolphin_count || 0));
-  document.getElementById('nDolph').innerText = total;
-  document.getElementById('nHealth').innerText = Math.round(total / 3);
-
-  let zoneHTML = '';
-  let tableHTML = '';
-  stats.forEach(z => {
-    const cnt = z.dolphin_count || 0;
-    const avg = z.avg_48h ? Math.round(z.avg_48h) : '--';
-    let cls = 'good';
-    if (cnt < avg * 0.75) cls = 'crit';
-    else if (cnt < avg) cls = 'warn';
-    
-    zoneHTML += `<div class="zone ${cls}"><strong>${z.zone}</strong><br>Count: ${cnt}<br>Avg: ${avg}</div>`;
-    tableHTML += `<tr><td>${z.zone}</td><td>${cnt}</td><td>${avg}</td><td>${z.mining_detected ? 'YES' : 'No'}</td><td>${cls.toUpperCase()}</td></tr>`;
-  });
-  document.getElementById('zones').innerHTML = zoneHTML;
-  document.getElementById('tbody').innerHTML = tableHTML;
-
-  const alerts = await fetch('/api/alerts').then(r => r.json()).catch(() => []);
-  document.getElementById('nAlert').innerText = alerts.length;
-  document.getElementById('nCases').innerText = alerts.length;
-  
-  if (alerts.length > 0) {
-    const html = alerts.map(a => `<div style="background: #fef2f2; padding: 10px; margin: 10px 0; border-left: 4px solid #ef4444;">
-      <strong>${a.zone}</strong>: ${a.dolphin_count} dolphins (↓ ${a.decline_pct}%)<br>
-      Confidence: ${a.mining_conf ? Math.round(a.mining_conf * 100) + '%' : 'N/A'}<br>
-      Case: ${a.case_id || 'Pending'}
-    </div>`).join('');
-    document.getElementById('alerts').innerHTML = html;
+  if (loading) return;  // a slow response never stacks requests
+  loading = true;
+  try {
+    const [statsChanged, alertsChanged] = await Promise.all([
+      fetchChanges('/api/stats/changes', views.stats),
+      fetchChanges('/api/alerts/changes', views.alerts),
+    ]);
+    if (statsChanged) {
+      const items = byDecline([...views.stats.rows.values()]);
+      zoneList.setItems(items);
+      tableList.setItems(items);
+      const total = items.reduce((sum, z) => sum + (z.dolphin_count || 0), 0);
+      document.getElementById('nDolph').innerText = total;
+      document.getElementById('nHealth').innerText =
+        items.length ? Math.round(total / items.length) : '--';
+    }
+    if (alertsChanged) {
+      const items = byDecline([...views.alerts.rows.values()]);
+      alertList.setItems(items);
+      document.getElementById('nAlert').innerText = items.length;
+      document.getElementById('nCases').innerText = items.length;
+      document.getElementById('noAlerts').style.display = items.length ? 'none' : '';
+    }
+    document.getElementById('ts').innerText = 'Updated: ' + new Date().toLocaleTimeString();
+  } finally {
+    loading = false;
   }
 }
 
@@ -281,8 +811,21 @@ async function askRAG() {
   box.innerHTML = `<strong>Answer:</strong> ${result.answer || 'No answer'}<br><strong>Sources:</strong> ${(result.sources || []).join(', ')}<br><span style="color: #999;">Confidence: ${Math.round((result.confidence || 0) * 100)}%</span>`;
 }
 
-load();
-setInterval(load, 5000);
+if (typeof document !== 'undefined') {
+  zoneList = new VirtualList(document.getElementById('zones'), 101, 220, 15,
+    template('zone', '<strong data-f></strong><br>Count: <span data-f></span>'
+                     + '<br>Avg: <span data-f></span>'),
+    fillCard);
+  tableList = new VirtualList(document.getElementById('table'), 40, Infinity, 0,
+    template('trow', '<span data-f></span>'.repeat(5)), fillRow);
+  alertList = new VirtualList(document.getElementById('alerts'), 94, Infinity, 0,
+    template('alert', '<strong data-f></strong>: <span data-f></span>'
+                      + '<br>Confidence: <span data-f></span><br>Case: <span data-f></span>'),
+    fillAlert);
+  load();
+  setInterval(load, 5000);
+}
+if (typeof module !== 'undefined') module.exports = {applyDelta, byDecline, windowRange};
 </script>
 </body>
 </html>"""
@@ -294,4 +837,5 @@ async def dashboard():
 if __name__ == "__main__":
     print("\n  Dashboard -> http://localhost:8000")
     print("  API docs  -> http://localhost:8000/docs\n")
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,250 @@
+"""
+JalJeevan Score -- Raw Input Archive
+====================================
+The live CSVs only need the rows the engine's windows can still use.  Older
+rows are moved into compressed, day-partitioned archives so the live files
+(and everything that reads them) stay bounded by the retention horizon:
+
+  ARCHIVE_DIR/<stream>/<YYYY-MM-DD>.csv.gz    header + rows of that day; later
+                                              compactions append gzip members
+  ARCHIVE_DIR/manifest.json                   per stream: bytes removed from the
+                                              live file so far ("base"), the live
+                                              file's inode, archived row counts
+
+Read offsets stay valid across compaction because consumers keep logical
+offsets: base + position in the current live file.  Only bytes a consumer
+has already read, and only a leading run of rows older than the cutoff, are
+moved, so the live file is always a suffix of the stream and nothing is lost
+or read twice.  A compaction goes (1) manifest notes the partition sizes;
+(2) rows appended, fsync; (3) manifest records the rows as archived and the
+rewritten file as pending; (4) it replaces the live file; (5) manifest
+commits the new base.  A crash before (3) is undone by cutting the
+partitions back, one after it skips the rows already archived, and one
+between (4) and (5) is resolved by the pending file's inode.
+
+Writers append under append_lock(path), which compaction also holds while it
+rewrites the file (simulator.py does; external sensors must too, or pause).
+
+  python archive.py dolphins --start 2026-03-01 > dolphins.csv
+
+prints archived + live rows as one CSV, the input replay / backfill takes.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from config import ARCHIVE_CONFIG, ARCHIVE_DIR, DOLPHIN_CSV, MINING_CSV
+from validation import REQUIRED, SCHEMAS, validate
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LIVE = {"dolphins": DOLPHIN_CSV, "mining": MINING_CSV}
+
+
+@contextmanager
+def append_lock(path):
+    """Exclusive lock on a live CSV (a <name>.lock file beside it) for appends and compaction."""
+    with open(str(path) + ".lock", "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _durable_write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class Archive:
+    """Compacts live CSVs into the archive and maps logical offsets onto them."""
+
+    def __init__(self, root=ARCHIVE_DIR, cfg=ARCHIVE_CONFIG):
+        self.root = Path(root)
+        self.cfg = dict(cfg)
+        self.manifest_path = self.root / "manifest.json"
+        try:
+            self.manifest = json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            self.manifest = {}
+        self.compacted_at = time.monotonic()
+
+    def _save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_name("manifest.json.tmp")
+        _durable_write(tmp, json.dumps(self.manifest, sort_keys=True).encode())
+        os.replace(tmp, self.manifest_path)
+
+    def due(self):
+        return (self.cfg["enabled"]
+                and time.monotonic() - self.compacted_at >= self.cfg["interval_s"])
+
+    # ── Offsets ────────────────────────────────────────────────────────────────
+
+    def base(self, name, path):
+        """Bytes of `name` archived out of the live file at `path` (0 if never compacted)."""
+        entry = self.manifest.get(name)
+        if entry is None:
+            return 0
+        ino = os.stat(path).st_ino
+        if ino == entry["inode"]:
+            return entry["base"]
+        pending = entry.get("pending")
+        if pending and ino == pending["inode"]:  # crashed between replace and commit
+            entry.update(base=pending["base"], inode=ino, pending=None)
+            self._save()
+            return entry["base"]
+        del self.manifest[name]  # the file was replaced by something else: a new stream
+        self._save()
+        return 0
+
+    # ── Compaction ─────────────────────────────────────────────────────────────
+
+    def compact(self, name, path, consumed, cutoff):
+        """
+        Move the leading rows of `path` that are before logical offset
+        `consumed` and older than `cutoff` (a Timestamp) into the archive.
+        Returns the bytes removed from the live file.
+        """
+        import pandas as pd
+        with append_lock(path):
+            base = self.base(name, path)
+            with open(path, "rb") as f:
+                data = f.read()
+            header_end = data.find(b"\n") + 1
+            if not header_end:
+                return 0
+            stop = min(max(consumed - base, header_end), len(data))
+            region = data[header_end:stop]
+            if len(region) < self.cfg["min_bytes"]:
+                return 0
+            ends = np.flatnonzero(np.frombuffer(region, dtype=np.uint8) == 10) + 1
+            starts = np.concatenate(([0], ends[:-1]))
+            lines = [region[s:e] for s, e in zip(starts, ends)]
+            stamps = pd.to_datetime(pd.Series([ln.split(b",", 1)[0].decode("utf-8", "replace")
+                                               for ln in lines]),
+                                    format="ISO8601", errors="coerce")
+            young = np.flatnonzero((stamps >= cutoff).to_numpy())
+            n = young[0] if len(young) else len(lines)
+            cut = header_end + (int(ends[n - 1]) if n else 0)
+            if cut - header_end < self.cfg["min_bytes"]:
+                return 0
+
+            entry = self.manifest.setdefault(name, {"base": base, "inode": os.stat(path).st_ino,
+                                                    "archived_through": base, "rows": {}})
+            self._append(name, data[:header_end], lines[:n], stamps[:n],
+                         base + header_end + starts[:n], entry)
+            removed = cut - header_end
+            tmp = Path(str(path) + ".compact")
+            _durable_write(tmp, data[:header_end] + data[cut:])
+            entry.update(archived_through=base + cut, parts=None,
+                         pending={"base": base + removed, "inode": os.stat(tmp).st_ino})
+            self._save()
+            os.replace(tmp, path)
+            entry.update(base=base + removed, inode=os.stat(path).st_ino, pending=None)
+            self._save()
+        return removed
+
+    def _append(self, name, header, lines, stamps, offsets, entry):
+        """
+        Append rows to their day partitions.  Rows a crashed run already
+        recorded as archived are skipped; partitions a crashed run was still
+        appending to (sizes saved in "parts" first) are cut back and rewritten.
+        """
+        folder = self.root / name
+        for day, size in (entry.get("parts") or {}).items():
+            with open(folder / f"{day}.csv.gz", "r+b") as f:
+                f.truncate(size)
+        fresh = offsets >= entry["archived_through"]
+        days = stamps.dt.strftime("%Y-%m-%d").where(stamps.notna()).ffill().bfill()
+        days = days.fillna("undated").to_numpy()
+        todo = list(dict.fromkeys(days[fresh]))
+        folder.mkdir(parents=True, exist_ok=True)
+        for day in todo:
+            (folder / f"{day}.csv.gz").touch()
+        entry["parts"] = {day: (folder / f"{day}.csv.gz").stat().st_size for day in todo}
+        self._save()
+        for day in todo:
+            rows = [ln for ln, d, f in zip(lines, days, fresh) if f and d == day]
+            with open(folder / f"{day}.csv.gz", "ab") as f:
+                f.write(gzip.compress((b"" if entry["parts"][day] else header) + b"".join(rows)))
+                f.flush()
+                os.fsync(f.fileno())
+            entry["rows"][day] = entry["rows"].get(day, 0) + len(rows)
+
+    # ── Reading ────────────────────────────────────────────────────────────────
+
+    def read(self, name, start=None, end=None):
+        """
+        Archived rows of a stream as one validated frame, in stream order.
+        Partitions outside [start, end] (ISO dates or date-times) are not opened.
+        """
+        import pandas as pd
+        lo, hi = (start or "")[:10], (end or "")[:10]
+        frames = []
+        for part in sorted((self.root / name).glob("*.csv.gz")):
+            day = part.name[:10]
+            if day != "undated" and ((lo and day < lo) or (hi and day > hi)):
+                continue
+            with gzip.open(part, "rb") as f:
+                frames.append(validate(f.read(), name)[0])
+        frames = [f for f in frames if len(f)]
+        if not frames:
+            return validate(",".join((*REQUIRED, *SCHEMAS[name])).encode() + b"\n", name)[0]
+        return _between(pd.concat(frames, ignore_index=True), start, end)
+
+    def history(self, name, live_path=None, start=None, end=None):
+        """Archived plus live rows of a stream, the input for replay and backfill."""
+        import pandas as pd
+        with open(live_path or LIVE[name], "rb") as f:
+            live = validate(f.read(), name)[0]
+        frames = [f for f in (self.read(name, start, end), _between(live, start, end)) if len(f)]
+        return pd.concat(frames, ignore_index=True) if frames else live.iloc[:0]
+
+    def snapshot(self):
+        """Per stream: bytes archived out of the live file and rows per day partition."""
+        return {name: {"archived_bytes": e["base"], "rows": dict(e["rows"])}
+                for name, e in self.manifest.items()}
+
+
+def _between(frame, start, end):
+    """Rows with start <= timestamp <= end (either bound optional)."""
+    import pandas as pd
+    if start:
+        frame = frame[frame["timestamp"] >= pd.Timestamp(start)]
+    if end:
+        frame = frame[frame["timestamp"] <= pd.Timestamp(end)]
+    return frame.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print archived + live rows of a stream as CSV")
+    parser.add_argument("stream", choices=sorted(LIVE))
+    parser.add_argument("--start", help="ISO date or date-time (inclusive)")
+    parser.add_argument("--end", help="ISO date or date-time (inclusive)")
+    args = parser.parse_args()
+    rows = Archive().history(args.stream, start=args.start, end=args.end)
+    rows.to_csv(sys.stdout, index=False, date_format="%Y-%m-%dT%H:%M:%S.%f")
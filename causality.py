@@ -0,0 +1,273 @@
+"""
+JalJeevan Score -- Lagged Cross-Correlation
+===========================================
+Incremental estimator behind the "mining -> turbidity -> dolphin decline"
+claim.  For every zone it keeps, over a sliding window of W time bins, the
+Pearson correlation between mining intensity at bin t-k and the change in
+dolphin count at bin t, for every lag k in 0..XCORR_CONFIG["max_lag_hours"].
+
+State is a set of NumPy arrays shared by all zones, one row per interned
+zone id (zones.py):
+
+  x_ring, ysum_ring, ycnt_ring, dy_ring   (zones, R)  per-bin ring buffers
+  sxy, sx, sy, sxx, syy                    (zones, L)  running pair sums per lag
+
+Closing a bin is one vectorized update over (zones, lags): the pair entering
+the window is added and the pair leaving it subtracted, so the cost per bin
+is O(zones * lags) NumPy work regardless of history length, and ingesting a
+row is O(1).  Bins stay open for `grace_bins` so mildly out-of-order rows
+from the two streams still land in the right bin, and mining rows shifted
+downstream by river travel time may be written up to RIVER_MAX_TRAVEL_HOURS
+ahead of the clock.
+
+Mining decreasing dolphin counts shows up as a *negative* correlation, so
+`strength` is reported as -corr: positive means mining precedes decline.
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import RIVER_MAX_TRAVEL_HOURS, XCORR_CONFIG
+from zones import registry
+
+
+def _bins(timestamps, bin_seconds):
+    ns = pd.to_datetime(pd.Series(timestamps)).astype("datetime64[ns]").astype("int64")
+    return (ns.to_numpy() // (bin_seconds * 10**9)).astype(np.int64)
+
+
+class LaggedXCorr:
+    """Per-zone sliding-window cross-correlation over a fixed set of lags."""
+
+    _RING = ("x_ring", "ysum_ring", "ycnt_ring", "dy_ring")
+    _SUMS = ("sxy", "sx", "sy", "sxx", "syy")
+
+    def __init__(self, cfg=XCORR_CONFIG, horizon_hours=RIVER_MAX_TRAVEL_HOURS):
+        self.bin_seconds = int(cfg["bin_minutes"] * 60)
+        self.lags = np.arange(0, int(cfg["max_lag_hours"] * 3600 // self.bin_seconds) + 1)
+        self.window = int(cfg["window_bins"])
+        self.grace = int(cfg["grace_bins"])
+        self.min_pairs = int(cfg["min_pairs"])
+        self.horizon = int(np.ceil(horizon_hours * 3600 / self.bin_seconds))
+        self.ring = self.window + int(self.lags[-1]) + self.grace + self.horizon + 2
+        self.registry = registry()
+        self.seen = np.zeros(0, dtype=bool)  # rows of zones with state
+        self.closed = None  # next bin to close
+        self.opened = None  # highest bin whose ring slot is initialized
+        self.late_rows = 0
+        self.n = np.zeros(len(self.lags), dtype=np.int64)
+        for name in self._RING:
+            setattr(self, name, np.zeros((0, self.ring)))
+        for name in self._SUMS:
+            setattr(self, name, np.zeros((0, len(self.lags))))
+        self.last_mean = np.zeros(0)
+        self.has_mean = np.zeros(0, dtype=bool)
+
+    # ── zone registry ────────────────────────────────────────────────────
+
+    def _rows(self, zones):
+        """State rows (interned ids) of `zones`, adding any not seen before."""
+        rows = self.registry.codes(zones, assign=True)
+        if len(rows):
+            self._reserve(int(rows.max()) + 1)
+            self.seen[rows] = True
+        return rows
+
+    def _lookup(self, zones):
+        """State rows of `zones`; -1 for zones without state."""
+        rows = self.registry.codes(zones)
+        ok = (rows >= 0) & (rows < len(self.seen))
+        ok[ok] = self.seen[rows[ok]]
+        return np.where(ok, rows, -1)
+
+    def _reserve(self, size):
+        """Room for `size` rows; capacity doubles, so adding zones one at a time is O(Z)."""
+        capacity = len(self.seen)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        for name in self._RING + self._SUMS + ("last_mean", "has_mean", "seen"):
+            old = getattr(self, name)
+            grown = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, name, grown)
+
+    # ── bin clock ────────────────────────────────────────────────────────
+
+    def _advance(self, now):
+        """Move the clock to bin `now`: close every bin older than now - grace."""
+        if self.closed is None:
+            self.closed, self.opened = now - self.grace, now - self.grace - 1
+        if now - self.closed > self.window + int(self.lags[-1]) + self.grace:
+            self._reset_window(now - self.grace)
+        while self.closed < now - self.grace:
+            self._close(self.closed)
+            self.closed += 1
+
+    def _open(self, b):
+        """Clear ring slots up to bin `b` so it can be written."""
+        while self.opened < b:
+            self.opened += 1
+            slot = self.opened % self.ring
+            for name in ("x_ring", "ysum_ring", "ycnt_ring"):
+                getattr(self, name)[:, slot] = 0.0
+
+    def _reset_window(self, b):
+        """Gap longer than window + max lag: everything has expired."""
+        for name in self._RING + self._SUMS:
+            getattr(self, name)[:] = 0.0
+        self.n[:] = 0
+        self.has_mean[:] = False
+        self.closed, self.opened = b, b - 1
+
+    def _close(self, t):
+        self._open(t)
+        slot = t % self.ring
+        cnt = self.ycnt_ring[:, slot]
+        mean = np.where(cnt > 0, self.ysum_ring[:, slot] / np.maximum(cnt, 1), self.last_mean)
+        dy = np.where(self.has_mean, mean - self.last_mean, 0.0)
+        self.has_mean |= cnt > 0
+        self.last_mean = mean
+        self.dy_ring[:, slot] = dy
+
+        # pair (x[t-k], dy[t]) enters the window ...
+        x = self.x_ring[:, (t - self.lags) % self.ring]
+        self._accumulate(x, dy[:, None], +1.0)
+        self.n += 1
+        # ... and (x[t-W-k], dy[t-W]) leaves it
+        if self.n[0] > self.window:
+            old = t - self.window
+            x = self.x_ring[:, (old - self.lags) % self.ring]
+            self._accumulate(x, self.dy_ring[:, old % self.ring][:, None], -1.0)
+            self.n -= 1
+
+    def _accumulate(self, x, y, sign):
+        self.sxy += sign * x * y
+        self.sx += sign * x
+        self.sy += sign * y
+        self.sxx += sign * x * x
+        self.syy += sign * y * y
+
+    # ── ingestion ────────────────────────────────────────────────────────
+
+    def observe(self, dolphins=None, mining=None):
+        """
+        Ingest a batch of rows from both streams in event-time order.
+
+        `dolphins` has zone, timestamp, dolphin_count.  `mining` has zone,
+        timestamp, confidence and optionally event_time (river.fanout output):
+        values land in the `timestamp` bin while the clock follows
+        `event_time`, so events shifted downstream by river travel time fill
+        future bins without closing bins early.
+        """
+        parts = []
+        if dolphins is not None and len(dolphins):
+            parts.append((dolphins["zone"], dolphins["timestamp"], dolphins["timestamp"],
+                          dolphins["dolphin_count"], False))
+        if mining is not None and len(mining):
+            clock = mining["event_time"] if "event_time" in mining else mining["timestamp"]
+            parts.append((mining["zone"], mining["timestamp"], clock, mining["confidence"], True))
+        if not parts:
+            return
+        zones = [z for p in parts for z in p[0]]
+        rows = self._rows(zones)
+        bins = np.concatenate([_bins(p[1], self.bin_seconds) for p in parts])
+        clock = np.concatenate([_bins(p[2], self.bin_seconds) for p in parts])
+        values = np.concatenate([np.asarray(p[3], dtype=float) for p in parts])
+        is_mining = np.concatenate([np.full(len(p[0]), p[4]) for p in parts])
+
+        order = np.argsort(clock, kind="stable")
+        rows, bins, clock = rows[order], bins[order], clock[order]
+        values, is_mining = values[order], is_mining[order]
+        bounds = np.flatnonzero(np.diff(clock)) + 1
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(clock)]):
+            self._advance(int(clock[lo]))
+            b = bins[lo:hi]
+            ok = (b >= self.closed) & (b <= self.closed + self.grace + self.horizon)
+            self.late_rows += int((~ok).sum())
+            if not ok.any():
+                continue
+            self._open(int(b[ok].max()))
+            r, slots, v = rows[lo:hi], b % self.ring, values[lo:hi]
+            mine = ok & is_mining[lo:hi]
+            seen = ok & ~is_mining[lo:hi]
+            np.add.at(self.x_ring, (r[mine], slots[mine]), v[mine])
+            np.add.at(self.ysum_ring, (r[seen], slots[seen]), v[seen])
+            np.add.at(self.ycnt_ring, (r[seen], slots[seen]), 1.0)
+
+    def observe_dolphin(self, zone, timestamp, count):
+        """Single-row form of observe() for per-row callbacks."""
+        self.observe(dolphins={"zone": [zone], "timestamp": [timestamp],
+                               "dolphin_count": [count]})
+
+    def observe_mining(self, zone, timestamp, confidence, event_time=None):
+        """Single-row form of observe(); `timestamp` is the arrival time at `zone`."""
+        self.observe(mining={"zone": [zone], "timestamp": [timestamp],
+                             "confidence": [confidence],
+                             "event_time": [timestamp if event_time is None else event_time]})
+
+    # ── read side ────────────────────────────────────────────────────────
+
+    def correlations(self, rows=None):
+        """(zones, lags) Pearson correlation, optionally for some zone rows only."""
+        pick = slice(None) if rows is None else rows
+        sxy, sx, sy = self.sxy[pick], self.sx[pick], self.sy[pick]
+        n = self.n.astype(float)[None, :]
+        cov = n * sxy - sx * sy
+        vx = n * self.sxx[pick] - sx ** 2
+        vy = n * self.syy[pick] - sy ** 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = cov / np.sqrt(vx * vy)
+        corr[:, self.n < self.min_pairs] = np.nan
+        corr[~np.isfinite(corr)] = np.nan
+        return corr
+
+    def estimate(self, zones):
+        """
+        Best lag (hours) and strength (-corr at that lag) for each zone, as two
+        arrays aligned with `zones`; NaN where there is not enough data.
+        """
+        lag = np.full(len(zones), np.nan)
+        strength = np.full(len(zones), np.nan)
+        rows = self._lookup(zones)
+        known = np.flatnonzero(rows >= 0)
+        if len(known):
+            corr = -self.correlations(rows[known])
+            ok = ~np.all(np.isnan(corr), axis=1)
+            best = np.argmax(np.where(np.isnan(corr), -np.inf, corr), axis=1)
+            idx = known
+            hours = self.lags[best] * self.bin_seconds / 3600
+            lag[idx[ok]] = hours[ok]
+            strength[idx[ok]] = np.round(corr[np.arange(len(known)), best][ok], 3)
+        return lag, strength
+
+    # ── checkpoint ───────────────────────────────────────────────────────
+
+    def to_dict(self):
+        """All state as plain values and arrays (for the engine checkpoint)."""
+        rows = np.flatnonzero(self.seen)  # zones by id: interned ints are per process
+        state = {name: getattr(self, name)[rows]
+                 for name in self._RING + self._SUMS + ("last_mean", "has_mean")}
+        state.update(
+            n=self.n, zones=[self.registry.ids[r] for r in rows],
+            closed=self.closed, opened=self.opened,
+            late_rows=self.late_rows, ring=self.ring, lags=len(self.lags),
+        )
+        return state
+
+    def load(self, state):
+        if not state or state.get("ring") != self.ring or state.get("lags") != len(self.lags):
+            return self  # nothing saved, or config changed; start fresh
+        rows = self.registry.codes(state["zones"], assign=True)
+        size = int(rows.max()) + 1 if len(rows) else 0
+        for name in self._RING + self._SUMS + ("last_mean", "has_mean"):
+            saved = np.asarray(state[name])
+            full = np.zeros((size,) + saved.shape[1:], dtype=saved.dtype)
+            full[rows] = saved
+            setattr(self, name, full)
+        self.seen = np.zeros(size, dtype=bool)
+        self.seen[rows] = True
+        self.n = np.array(state["n"])
+        self.closed, self.opened = state["closed"], state["opened"]
+        self.late_rows = state["late_rows"]
+        return self
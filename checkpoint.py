@@ -0,0 +1,56 @@
+"""
+JalJeevan Score -- Engine Checkpoints
+=====================================
+The simulation engine's equivalent of Pathway's persistence: all operator
+state goes into one binary file, written atomically (tmp + os.replace) so a
+crash leaves either the previous checkpoint or the new one, never a mix.
+
+  MAGIC (8 bytes) | sha256 of payload (32 bytes) | payload (pickle)
+
+The checksum rejects torn or foreign files; a rejected checkpoint means a
+cold start (replay from the beginning of the CSVs), never a crash.  Pickle
+keeps NumPy arrays and DataFrames compact and fast to load; the file is only
+ever read back from the engine's own persistence directory.
+"""
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+MAGIC = b"JJCKPT01"
+VERSION = 1
+
+
+def write_checkpoint(path, state):
+    """Atomically replace `path` with `state`; returns the file size in bytes."""
+    payload = pickle.dumps(dict(state, version=VERSION), protocol=pickle.HIGHEST_PROTOCOL)
+    data = MAGIC + hashlib.sha256(payload).digest() + payload
+    tmp = Path(f"{path}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return len(data)
+
+
+def read_checkpoint(path):
+    """State dict from `path`, or None when missing, corrupt or from another version."""
+    try:
+        data = Path(path).read_bytes()
+    except OSError:
+        return None
+    head = len(MAGIC) + 32
+    if len(data) < head or not data.startswith(MAGIC):
+        return None
+    payload = data[head:]
+    if hashlib.sha256(payload).digest() != data[len(MAGIC):head]:
+        return None
+    try:
+        state = pickle.loads(payload)
+    except Exception:
+        return None
+    if not isinstance(state, dict) or state.get("version") != VERSION:
+        return None
+    return state
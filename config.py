@@ -9,7 +9,7 @@ from pathlib import Path
 # ============================================================================
 # PATHS
 # ============================================================================
-BASE_DIR = Path(__file__).parent
+BASE_DIR = Path(os.environ.get("JALJEEVAN_HOME") or Path(__file__).parent)  # data/output root
 DATA_DIR = BASE_DIR / "data"
 OUTPUT_DIR = BASE_DIR / "output"
 NGT_DIR = DATA_DIR / "ngt_orders"
@@ -22,29 +22,133 @@ MINING_CSV = DATA_DIR / "live_mining.csv"
 # Output Files
 STATS_JSONL = OUTPUT_DIR / "stats.jsonl"
 ALERTS_JSONL = OUTPUT_DIR / "alerts.jsonl"
+EVIDENCE_DIR = OUTPUT_DIR / "evidence"  # content-addressed evidence packages
+ROLLUP_DIR = OUTPUT_DIR / "rollups"  # finalized 1m / 1h / 1d per-zone buckets
+DEADLETTER_JSONL = OUTPUT_DIR / "deadletter.jsonl"  # rejected CSV lines with reason codes
+VALIDATION_JSON = OUTPUT_DIR / "validation.json"  # accepted / rejected counts per stream + reason
+
+# Raw input archive (archive.py): rows past the window horizon leave the live CSVs
+ARCHIVE_DIR = DATA_DIR / "archive"  # <stream>/<YYYY-MM-DD>.csv.gz + manifest.json
+ARCHIVE_CONFIG = {
+    "enabled": True,  # Simulation engine only; Pathway's fs connector owns its own offsets
+    "interval_s": 600,  # Compaction period
+    "slack_hours": 24,  # Kept past the dolphin / mining window horizons
+    "min_bytes": 1 << 20,  # Skip compactions that would move less than this
+}
+
+# Zone registry (zones.py): .csv / .json / .geojson, seeded from ZONES below
+ZONES_FILE = DATA_DIR / "zones.json"
 
 # ============================================================================
 # STREAMING CONFIGURATION
 # ============================================================================
 AUTOCOMMIT_MS = 2000  # Check for new data every 2 seconds
+CHECKPOINT_INTERVAL_S = 10  # Simulation engine state checkpoint period (bounds restart replay)
+
+# Row lineage (lineage.py): writers may stamp rows with INGEST_COLUMN (epoch
+# seconds); stats / alert records carry read / emit times and the API times
+# when each first becomes visible, per stage against the 2 s claim
+INGEST_COLUMN = "ingested_at"
+LATENCY_CONFIG = {
+    "slo_ms": 2000,  # ingest -> visible target
+    "buckets_ms": (10, 25, 50, 100, 250, 500, 1000, 2000, 5000, 10000, 30000),
+    "sample_every": 100,  # keep 1 in N traces; every trace over the SLO is kept
+    "traces_per_zone": 20,
+    "max_zones": 10_000,  # zones with kept traces (least recently traced dropped first)
+    "follow_ms": 250,  # API refreshes its sink views this often even with no requests
+}
 
 # ============================================================================
 # THRESHOLDS
 # ============================================================================
-DOLPHIN_DECLINE_THRESHOLD = 0.20  # Alert if >20% drop from 48h average
+DOLPHIN_DECLINE_THRESHOLD = 0.20  # Alert if >20% drop from the 48h baseline
+DOLPHIN_RESOLVE_THRESHOLD = 0.15  # Hysteresis: incident resolves only below 15%
+DOLPHIN_ESCALATE_THRESHOLD = 0.40  # Open incident escalates above 40%
+ALERT_DELTA_PCT = 5.0  # Re-emit an open incident only when decline moves >= 5 points
+DECLINE_BASELINE = "p50_48h"  # Stats column declines are measured against (avg_48h if absent)
+ZONE_CRIT_PCT = 25.0  # Zone status "crit" above this decline, "warn" above ZONE_WARN_PCT
+ZONE_WARN_PCT = 0.0
 MINING_CONFIDENCE_THRESHOLD = 0.80  # Only consider mining with >80% confidence
+MAX_DOLPHIN_COUNT = 10_000  # Counts above this are rejected as sensor faults (validation.py)
+
+# Causal interval join: a dolphin observation at time t is matched with mining
+# events in [t - MINING_LAG_MAX_HOURS, t - MINING_LAG_MIN_HOURS]; older events expire
+MINING_LAG_MIN_HOURS = 0
+MINING_LAG_MAX_HOURS = 24
+
+# Streaming change detectors over turbidity_anomaly, night_activity and
+# dolphin_count (per zone; scores are in units of sigma after `warmup` rows)
+DETECTOR_CONFIG = {
+    "alpha": 0.05,  # EWMA smoothing for the baseline mean / variance
+    "warmup": 10,  # rows before scores are reported
+    "min_std": 1e-3,  # absolute floor for the baseline std (flat signals)
+    "min_rel_std": 0.05,  # ... and relative to the baseline mean
+    "z_alarm": 3.0,  # |z| that counts as an EWMA alarm
+    "cusum_k": 0.5,  # CUSUM slack per row
+    "cusum_h": 5.0,  # CUSUM alarm threshold
+    "ph_delta": 0.1,  # Page-Hinkley tolerance per row
+    "ph_lambda": 10.0,  # Page-Hinkley alarm threshold
+}
+
+# Lagged cross-correlation: mining intensity vs dolphin count change (causality.py)
+XCORR_CONFIG = {
+    "bin_minutes": 60,  # time bin for both series
+    "max_lag_hours": 48,  # lags 0..max tested
+    "window_bins": 168,  # sliding window (one week of hourly bins)
+    "grace_bins": 1,  # bins kept open for out-of-order rows
+    "min_pairs": 24,  # pairs needed before a correlation is reported
+}
+
+# Per-zone KLL quantile sketches of dolphin_count (quantiles.py)
+QUANTILE_CONFIG = {
+    "k": 200,  # sketch size; rank error roughly 1/k
+    "bucket_hours": 4,  # one sketch per bucket; the window merges the buckets it covers
+    "window_hours": 48,
+    "quantiles": (0.1, 0.5, 0.9),  # exposed as p10_48h / p50_48h / p90_48h
+}
+
+# Short-horizon dolphin_count forecasts (forecast.py): damped-trend Holt-Winters
+# over hourly bins with a daily season, all zones updated as one array per bin
+FORECAST_CONFIG = {
+    "bin_minutes": 60,
+    "season_bins": 24,  # one daily cycle
+    "alpha": 0.12,  # level smoothing
+    "beta": 0.08,  # trend smoothing
+    "gamma": 0.25,  # seasonal smoothing (plain averages over the first cycles)
+    "phi": 0.98,  # trend damping per bin
+    "sigma_alpha": 0.1,  # EWMA weight of the one-step residual variance
+    "warmup": 12,  # bins with data before a zone is forecast
+    "horizons_h": (6, 12, 24),  # exposed as forecast_<h>h / _lo / _hi
+    "interval_z": 1.28,  # ~80% prediction interval
+}
+
+# Multi-resolution rollups (rollups.py): bucket name -> seconds.  The API serves
+# the finest resolution whose bucket count over the requested range fits the cap.
+ROLLUP_RESOLUTIONS = {"1m": 60, "1h": 3600, "1d": 86400}
+ROLLUP_MAX_POINTS = 2000
 
 # ============================================================================
 # RIVER ZONES
 # ============================================================================
+# Default registry, written to ZONES_FILE by bootstrap.  At runtime zones come
+# from zones.registry(), which hot-reloads the file.
 ZONES = [
     {"id": "Zone7", "name": "Varanasi North", "base": 40, "lat": 25.3176, "lon": 82.9739},
     {"id": "Zone8", "name": "Ramnagar", "base": 30, "lat": 25.4102, "lon": 82.8912},
     {"id": "Zone9", "name": "Mirzapur", "base": 20, "lat": 25.5012, "lon": 82.8123},
 ]
 
-# Zone lookup dictionary
-ZONE_DICT = {z["id"]: z for z in ZONES}
+ZONE_GRID_DEG = 0.1  # Spatial index cell size (degrees, ~11 km)
+ZONE_RELOAD_S = 1.0  # Minimum seconds between checks of ZONES_FILE for changes
+
+# River topology: reaches listed upstream -> downstream with channel distance.
+# Travel time is km / flow_kmh unless a reach gives "travel_hours" explicitly.
+RIVER_REACHES = [
+    {"from": "Zone9", "to": "Zone8", "km": 48.0},  # Mirzapur -> Ramnagar
+    {"from": "Zone8", "to": "Zone7", "km": 14.0},  # Ramnagar -> Varanasi North
+]
+RIVER_FLOW_KMH = 3.0  # Mean channel velocity for travel-time estimates
+RIVER_MAX_TRAVEL_HOURS = 48  # Ignore causal links that take longer to arrive
 
 # ============================================================================
 # RAG CONFIGURATION
@@ -58,6 +162,34 @@ RAG_CONFIG = {
     "k_retrieval": 3
 }
 
+# Live DocumentStore service (docstore.py): the real-engine pipeline serves its
+# index of NGT_DIR here and every API worker queries it, answering from its own
+# clause index while the service is down
+DOCSTORE_CONFIG = {
+    "host": "127.0.0.1",  # Where the pipeline's DocumentStoreServer listens
+    "port": int(os.environ.get("JALJEEVAN_DOCSTORE_PORT", "8765")),
+    "url": os.environ.get("JALJEEVAN_DOCSTORE_URL"),  # None = http://host:port; "" = never ask
+    "timeout_s": 1.0,
+    "retry_s": 10.0,  # After a failure, answer locally this long before asking again
+    "stats_ttl_s": 30.0,  # /v1/statistics is asked at most this often, not once per query
+    "max_connections": 8,
+}
+
+# ============================================================================
+# LEGAL CLAUSE INDEX (legal.py)
+# ============================================================================
+# Violation types and the phrases that tag a line / paragraph / order with them
+LEGAL_VIOLATIONS = {
+    "sand_mining": ("sand mining", "illegal mining", "unauthorized mining", "mining violation",
+                    "mining activities", "mining sites", "riverbed"),
+    "dolphin_harm": ("dolphin", "sanctuary", "habitat"),
+    "water_pollution": ("effluent", "water pollution", "water quality", "bod", "toxic waste"),
+    "sewage": ("sewage", "stp"),
+}
+ALERT_VIOLATIONS = ("sand_mining", "dolphin_harm")  # What a mining -> dolphin alert violates
+LEGAL_RELOAD_S = 1.0  # Minimum seconds between scans of NGT_DIR for changed orders
+LEGAL_INDEX_FILE = OUTPUT_DIR / "legal_index.json"  # Parsed orders, saved by pipeline bootstrap
+
 # ============================================================================
 # LLM CONFIGURATION
 # ============================================================================
@@ -73,3 +205,50 @@ LLM_CONFIG = {
 API_HOST = "0.0.0.0"
 API_PORT = 8000
 API_REFRESH_MS = 5000  # Dashboard refresh every 5 seconds
+
+# ============================================================================
+# FEDERATION (federation.py)
+# ============================================================================
+# One pipeline + API per river basin; an API started with backends set serves no
+# sinks of its own and fans /api/stats, /api/alerts and /api/legal out to them.
+# JALJEEVAN_BACKENDS="ganga=http://10.0.0.5:8000,yamuna=http://10.0.0.6:8000"
+FEDERATION_CONFIG = {
+    "backends": os.environ.get("JALJEEVAN_BACKENDS", ""),  # Empty = not federating
+    "timeout_s": 2.0,  # Per basin request; a slow basin is left out (or served stale) after it
+    "timeouts": {},  # basin -> timeout_s override, e.g. for a far-away node
+    "max_connections": 16,  # Pooled keep-alive connections shared by all basins
+    "cache_ttl_s": 1.0,  # Merged answers (partial ones too) are reused this long
+    "cache_max": 1024,  # Cached merged answers before expired ones are dropped
+    "stale_s": 300.0,  # A failed basin is answered from its last good response this old
+}
+
+# ============================================================================
+# FIR FILING (fir.py)
+# ============================================================================
+FIR_DB = PERSISTENCE_DIR / "fir.sqlite3"  # Durable registry: one FIR per case_id
+FIR_CONFIG = {
+    "endpoint": os.environ.get("FIR_ENDPOINT", ""),  # Authority intake URL; empty = queue only
+    "authority": "District Magistrate Varanasi + NGT",
+    "batch_size": 50,  # Filings per POST
+    "max_attempts": 8,  # Then the filing is marked failed
+    "backoff_base_s": 1.0,  # Retry delay ~ uniform(0, min(cap, base * 2**attempts))
+    "backoff_cap_s": 300.0,
+    "interval_s": 2.0,  # Idle poll period (new filings wake the submitter at once)
+    "timeout_s": 10.0,
+    "max_connections": 4,  # Pooled keep-alive connections to the endpoint
+}
+
+# ============================================================================
+# RUNTIME PROFILING (profiling.py)
+# ============================================================================
+# Off by default and free when off: SIGUSR1 (or POST /api/admin/profile) samples
+# stacks for `duration_s`; SIGUSR2 toggles tracemalloc diffs between ticks
+PROFILE_DIR = OUTPUT_DIR / "profiles"  # <name>-<time>.collapsed + memory-<name>.log
+PROFILE_CONFIG = {
+    "interval_ms": 5,  # Stack sampling period
+    "duration_s": 30,  # Default profile length
+    "max_duration_s": 600,
+    "memory_frames": 1,  # Traceback depth tracemalloc keeps while tracing
+    "memory_top": 20,  # Growth lines reported per diff
+}
+ADMIN_TOKEN = os.environ.get("JALJEEVAN_ADMIN_TOKEN", "")  # /api/admin/* is disabled when empty
@@ -0,0 +1,153 @@
+"""
+JalJeevan Score -- Streaming Anomaly Detectors
+==============================================
+O(1)-per-row change detectors over the sensor columns the static thresholds
+ignore (`turbidity_anomaly`, `night_activity`) and over `dolphin_count`.
+
+Each (zone, signal) keeps a constant-size state:
+
+  EWMA        exponentially weighted mean/variance -> z-score of the new value
+  CUSUM       cumulative sum of z beyond a slack k (catches small sustained shifts)
+  Page-Hinkley cumulative deviation from the running mean of z
+
+No raw window is kept, so memory is fixed per zone regardless of sample rate.
+The whole bank serializes to a plain dict so it is checkpointed with the rest
+of the engine state, and its per-zone verdicts feed the alert lifecycle: a
+slow-onset mining pattern can raise an incident even when no single reading
+crosses MINING_CONFIDENCE_THRESHOLD or the 48h decline threshold.
+"""
+
+import math
+
+from config import DETECTOR_CONFIG
+
+# Signal -> direction that indicates harm
+MINING_SIGNALS = {"turbidity_anomaly": "up", "night_activity": "up"}
+DOLPHIN_SIGNALS = {"dolphin_count": "down"}
+SIGNALS = {**MINING_SIGNALS, **DOLPHIN_SIGNALS}
+
+_MIN_STD = 1e-6
+
+
+class StreamDetector:
+    """EWMA z-score, two-sided CUSUM and Page-Hinkley for one signal."""
+
+    __slots__ = ("n", "mean", "var", "z", "cu_hi", "cu_lo", "z_mean", "ph_up", "ph_min",
+                 "ph_dn", "ph_max")
+
+    def __init__(self, state=None):
+        self.n, self.mean, self.var, self.z = 0, 0.0, 0.0, 0.0
+        self.cu_hi = self.cu_lo = 0.0
+        self.z_mean = self.ph_up = self.ph_min = self.ph_dn = self.ph_max = 0.0
+        if state:
+            for k, v in zip(self.__slots__, state):
+                setattr(self, k, v)
+
+    def update(self, x, cfg=DETECTOR_CONFIG):
+        """Consume one value in O(1)."""
+        if self.n == 0:
+            self.mean = x
+        std = math.sqrt(self.var) if self.var > 0 else 0.0
+        floor = max(cfg["min_std"], cfg["min_rel_std"] * abs(self.mean), _MIN_STD)
+        z = (x - self.mean) / max(std, floor)
+        if self.n >= cfg["warmup"]:
+            self.z = z
+            cap = 2 * cfg["cusum_h"]
+            self.cu_hi = min(cap, max(0.0, self.cu_hi + z - cfg["cusum_k"]))
+            self.cu_lo = min(cap, max(0.0, self.cu_lo - z - cfg["cusum_k"]))
+
+            k = self.n - cfg["warmup"] + 1
+            self.z_mean += (z - self.z_mean) / k
+            cap = 2 * cfg["ph_lambda"]
+            self.ph_up += z - self.z_mean - cfg["ph_delta"]
+            self.ph_min = max(min(self.ph_min, self.ph_up), self.ph_up - cap)
+            self.ph_dn += z - self.z_mean + cfg["ph_delta"]
+            self.ph_max = min(max(self.ph_max, self.ph_dn), self.ph_dn + cap)
+
+        diff = x - self.mean
+        incr = cfg["alpha"] * diff
+        self.mean += incr
+        self.var = (1 - cfg["alpha"]) * (self.var + diff * incr)
+        self.n += 1
+
+    def score(self, direction, cfg=DETECTOR_CONFIG):
+        """Normalized scores for the harmful direction; >= 1.0 means alarm."""
+        if direction == "up":
+            z, cusum, ph = self.z, self.cu_hi, self.ph_up - self.ph_min
+        else:
+            z, cusum, ph = -self.z, self.cu_lo, self.ph_max - self.ph_dn
+        return {
+            "z": round(z, 3),
+            "ewma": round(max(z, 0.0) / cfg["z_alarm"], 3),
+            "cusum": round(cusum / cfg["cusum_h"], 3),
+            "page_hinkley": round(ph / cfg["ph_lambda"], 3),
+        }
+
+    def state(self):
+        return [getattr(self, k) for k in self.__slots__]
+
+
+class DetectorBank:
+    """All (zone, signal) detectors for the pipeline, checkpointable as a dict."""
+
+    def __init__(self, cfg=DETECTOR_CONFIG, upstream=None):
+        self.cfg = cfg
+        self.upstream = upstream  # zone -> iterable of zones whose mining can reach it
+        self.detectors = {}
+
+    def update(self, zone, signal, value):
+        if value is None or value != value:  # missing / NaN
+            return
+        det = self.detectors.get((zone, signal))
+        if det is None:
+            det = self.detectors[(zone, signal)] = StreamDetector()
+        det.update(float(value), self.cfg)
+
+    def observe_mining(self, zone, turbidity_anomaly, night_activity):
+        self.update(zone, "turbidity_anomaly", turbidity_anomaly)
+        self.update(zone, "night_activity", night_activity)
+
+    def observe_dolphin(self, zone, dolphin_count):
+        self.update(zone, "dolphin_count", dolphin_count)
+
+    def _max_score(self, zones, signals):
+        best = 0.0
+        for z in zones:
+            for sig, direction in signals.items():
+                det = self.detectors.get((z, sig))
+                if det is not None:
+                    s = det.score(direction, self.cfg)
+                    best = max(best, s["ewma"], s["cusum"], s["page_hinkley"])
+        return best
+
+    def anomaly(self, zone):
+        """
+        Verdict for the alert stage.  Mining signals are taken from the zone
+        and everything upstream of it; the dolphin signal from the zone only.
+        """
+        sources = self.upstream(zone) if self.upstream else [zone]
+        mining = self._max_score(sources, MINING_SIGNALS)
+        dolphin = self._max_score([zone], DOLPHIN_SIGNALS)
+        return {
+            "mining_anomaly": mining >= 1.0,
+            "dolphin_anomaly": dolphin >= 1.0,
+            "mining_score": round(mining, 3),
+            "dolphin_score": round(dolphin, 3),
+        }
+
+    def scores(self, zone):
+        """Every detector score for one zone (for evidence / debugging)."""
+        return {
+            sig: self.detectors[(zone, sig)].score(direction, self.cfg)
+            for sig, direction in SIGNALS.items() if (zone, sig) in self.detectors
+        }
+
+    def to_dict(self):
+        return {f"{z}|{s}": d.state() for (z, s), d in self.detectors.items()}
+
+    def load(self, state):
+        self.detectors = {}
+        for key, values in (state or {}).items():
+            zone, signal = key.rsplit("|", 1)
+            self.detectors[(zone, signal)] = StreamDetector(values)
+        return self
@@ -0,0 +1,113 @@
+"""
+JalJeevan Score -- Document Store Client
+========================================
+Under the real engine the pipeline serves its live DocumentStore (BM25 over
+the chunks of ngt_orders/, re-indexed by Pathway whenever a file is added,
+changed or removed) with Pathway's DocumentStoreServer on DOCSTORE_CONFIG's
+port:
+
+  POST /v1/retrieve     {"query", "k"} -> [{"text", "metadata": {"path"}, "dist"}]
+  POST /v1/statistics   {} -> {"file_count", "last_modified", "last_indexed"}
+
+Every API worker queries that one index over a pooled keep-alive client
+instead of parsing the orders itself.  When the service cannot answer
+(simulation engine, pipeline restarting) the calls return None and
+/api/legal answers from the local clause index; after a failure the service
+is skipped for `retry_s`, so a dead port costs one attempt per `retry_s`
+rather than one per query.  Statistics only fill `indexed_documents`, so they
+are cached for `stats_ttl_s` instead of doubling the load on the index.
+"""
+
+import time
+
+from config import DOCSTORE_CONFIG
+
+try:
+    import httpx
+except ImportError:  # the API then always answers from the local index
+    httpx = None
+
+
+class DocStoreClient:
+    """Pooled client for the pipeline's DocumentStoreServer, with a retry hold-off."""
+
+    def __init__(self, url=None, cfg=DOCSTORE_CONFIG, client=None):
+        if url is None:
+            url = cfg["url"] if cfg["url"] is not None else f"http://{cfg['host']}:{cfg['port']}"
+        self.url = url.rstrip("/")
+        self.cfg = dict(cfg)
+        self._client = client
+        self._down_until = 0.0
+        self._stats = (None, 0.0)  # (last statistics, monotonic time fetched)
+        self.metrics = {"served": 0, "failed": 0, "skipped": 0, "last_ms": None,
+                        "last_error": None}
+
+    @property
+    def enabled(self):
+        return bool(self.url) and httpx is not None
+
+    @property
+    def up(self):
+        """False while held off after a failure, None before the first call."""
+        if time.monotonic() < self._down_until:
+            return False
+        return True if self.metrics["served"] else None
+
+    def _http(self):
+        if self._client is None:
+            n = self.cfg["max_connections"]
+            self._client = httpx.AsyncClient(
+                timeout=self.cfg["timeout_s"],
+                limits=httpx.Limits(max_connections=n, max_keepalive_connections=n),
+            )
+        return self._client
+
+    async def _post(self, route, payload):
+        if not self.enabled:
+            return None
+        if time.monotonic() < self._down_until:
+            self.metrics["skipped"] += 1
+            return None
+        started = time.perf_counter()
+        try:
+            r = await self._http().post(self.url + route, json=payload)
+            r.raise_for_status()
+            body = r.json()
+        except (httpx.HTTPError, ValueError) as e:
+            self.metrics["failed"] += 1
+            self.metrics["last_error"] = f"{type(e).__name__}: {e}".rstrip(": ")
+            self._down_until = time.monotonic() + self.cfg["retry_s"]
+            return None
+        finally:
+            self.metrics["last_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        self.metrics["served"] += 1
+        return body
+
+    async def retrieve(self, query, k):
+        """[{"text", "source", "dist"}] best first, or None when the service is down."""
+        hits = await self._post("/v1/retrieve", {"query": query, "k": k})
+        if not isinstance(hits, list):
+            return None
+        return [{"text": h.get("text", ""),
+                 "source": str((h.get("metadata") or {}).get("path", "?")).replace("\\", "/")
+                 .rsplit("/", 1)[-1],
+                 "dist": h.get("dist")} for h in hits]
+
+    async def statistics(self):
+        """{"file_count", "last_modified", "last_indexed"} (at most stats_ttl_s old) or None."""
+        stats, fetched = self._stats
+        if stats is not None and time.monotonic() - fetched < self.cfg["stats_ttl_s"]:
+            return stats
+        stats = await self._post("/v1/statistics", {})
+        if not isinstance(stats, dict):
+            return None
+        self._stats = (stats, time.monotonic())
+        return stats
+
+    def snapshot(self):
+        return dict(self.metrics, url=self.url, enabled=self.enabled, up=self.up)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,218 @@
+"""
+JalJeevan Score -- Evidence Packages
+====================================
+Court-ready evidence packages are built by the pipeline once per alert state
+change and stored content-addressed, so the API serves them with dictionary
+lookups instead of rebuilding them from alerts.jsonl on every request.
+
+  output/evidence/objects/<sha256>.json   canonical package bytes
+  output/evidence/index.json              case_id -> object, zone -> case_ids
+
+Packages contain only values derived from the input streams (no wall-clock
+timestamps), and are serialized with sorted keys, so the same alert always
+produces byte-identical files across restarts.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from config import ALERT_VIOLATIONS, EVIDENCE_DIR, MINING_LAG_MAX_HOURS, MINING_LAG_MIN_HOURS
+from legal import clause_index
+from river import network
+from zones import registry
+
+WINDOW_HOURS = 48
+
+
+def case_id_for(zone, opened_at):
+    """
+    Stable case id, one per incident: data date, zone and the time of the
+    observation that opened it (as in the incident_id), so a zone that
+    reopens on the same day gets a new case.
+    """
+    import pandas as pd
+    t = pd.Timestamp(opened_at)
+    return f"NGT-{t:%Y%m%d}-{zone}-{t:%H%M%S}"
+
+
+def canonical_bytes(obj):
+    """Deterministic JSON encoding used for hashing and storage."""
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _ts(value):
+    import pandas as pd
+    return pd.Timestamp(value).isoformat()
+
+
+def _num(value, cast=float):
+    """Plain Python number (numpy scalars and NaN/None normalized)."""
+    import pandas as pd
+    if value is None or pd.isna(value):
+        return None
+    return cast(value)
+
+
+# ── Package construction ────────────────────────────────────────────────────
+
+def build_package(alert, dolphins, mining):
+    """
+    Assemble the evidence package for one alert.
+
+    `dolphins` and `mining` are the parsed CSV frames (any zones); only the
+    alert's zone, the 48h window ending at the alert observation and the mining
+    events (in that zone or upstream of it, arrival-time shifted) inside the
+    causal lag interval before it are kept.
+    """
+    import pandas as pd
+    zone = alert["zone"]
+    end = pd.Timestamp(alert["observed_at"])
+    start = end - pd.Timedelta(hours=WINDOW_HOURS)
+
+    d = dolphins[(dolphins["zone"] == zone)
+                 & (dolphins["timestamp"] >= start) & (dolphins["timestamp"] <= end)]
+    d = d.sort_values("timestamp", kind="stable")
+    upstream = [z for z, _, _ in network().upstream_of(zone)]
+    m = network().fanout(mining[mining["zone"].isin(upstream)])
+    m = m[(m["zone"] == zone)
+          & (m["timestamp"] >= end - pd.Timedelta(hours=MINING_LAG_MAX_HOURS))
+          & (m["timestamp"] <= end - pd.Timedelta(hours=MINING_LAG_MIN_HOURS))]
+    m = m.sort_values(["event_time", "source_zone"], kind="stable")
+
+    package = {
+        "case_id": alert["case_id"],
+        "incident_id": alert.get("incident_id"),
+        "zone": zone,
+        "zone_name": registry().name(zone),
+        "status": "ready_for_filing",
+        "alert": {
+            "observed_at": _ts(end),
+            "state": alert.get("state"),
+            "dolphin_count": _num(alert["dolphin_count"], int),
+            "avg_48h": _num(alert["avg_48h"]),
+            "p50_48h": _num(alert.get("p50_48h")),
+            "decline_pct": _num(alert["decline_pct"]),
+            "mining_conf": _num(alert["mining_conf"]),
+        },
+        "causal_link": {
+            "lag_hours": _num(alert.get("causal_lag_h")),
+            "strength": _num(alert.get("causal_strength")),
+        },
+        "forecast": alert.get("forecast"),
+        "dolphin_window": {
+            "start": _ts(start),
+            "end": _ts(end),
+            "samples": [[_ts(t), int(c)] for t, c in zip(d["timestamp"], d["dolphin_count"])],
+        },
+        "mining_events": [
+            {
+                "timestamp": _ts(r["event_time"]),
+                "source_zone": r["source_zone"],
+                "river_km": float(r["km"]),
+                "arrival": _ts(r["timestamp"]),
+                "confidence": float(r["confidence"]),
+                "turbidity_anomaly": float(r.get("turbidity_anomaly", 0) or 0),
+                "night_activity": float(r.get("night_activity", 0) or 0),
+            }
+            for r in m.to_dict("records")
+        ],
+        "ngt_clauses": clause_index().lookup(ALERT_VIOLATIONS),
+        "legal_sections": clause_index().sections(ALERT_VIOLATIONS),
+    }
+    package["content_hash"] = hashlib.sha256(canonical_bytes(package)).hexdigest()
+    return package
+
+
+# ── Content-addressed store ─────────────────────────────────────────────────
+
+class EvidenceStore:
+    """Content-addressed evidence objects plus a case_id / zone index."""
+
+    def __init__(self, root=EVIDENCE_DIR):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.index_path = self.root / "index.json"
+        os.makedirs(self.objects, exist_ok=True)
+        try:
+            self.index = json.loads(self.index_path.read_text())
+        except Exception:
+            self.index = {"cases": {}, "zones": {}}
+
+    def put(self, package):
+        """Store a package; returns True when the index changed."""
+        sha = package["content_hash"]
+        path = self.objects / f"{sha}.json"
+        if not path.exists():
+            _atomic_write(path, canonical_bytes(package))
+
+        case_id, zone = package["case_id"], package["zone"]
+        if self.index["cases"].get(case_id, {}).get("object") == sha:
+            return False
+        self.index["cases"][case_id] = {
+            "object": sha,
+            "zone": zone,
+            "summary": dict(package["alert"], status=package["status"]),
+        }
+        cases = self.index["zones"].setdefault(zone, [])
+        if case_id not in cases:
+            cases.append(case_id)
+            cases.sort()
+        _atomic_write(self.index_path, canonical_bytes(self.index))
+        return True
+
+    def record(self, alert, dolphins, mining):
+        """Build and store the package for an alert whose state just changed."""
+        return self.put(build_package(alert, dolphins, mining))
+
+
+def _atomic_write(path, data):
+    tmp = Path(f"{path}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+# ── Read side (used by app.py) ──────────────────────────────────────────────
+
+class EvidenceIndex:
+    """Read-only view of the evidence index, reloaded only when it changes."""
+
+    def __init__(self, root=EVIDENCE_DIR):
+        self.root = Path(root)
+        self._mtime = None
+        self._index = {"cases": {}, "zones": {}}
+
+    def _refresh(self):
+        path = self.root / "index.json"
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return self._index
+        if mtime != self._mtime:
+            try:
+                self._index = json.loads(path.read_text())
+                self._mtime = mtime
+            except ValueError:
+                pass  # half-written by another process; keep previous view
+        return self._index
+
+    def list(self, zone=None):
+        """Summaries of every case, optionally restricted to one zone."""
+        index = self._refresh()
+        ids = index["zones"].get(zone, []) if zone else sorted(index["cases"])
+        return [
+            dict(index["cases"][c]["summary"], case_id=c, zone=index["cases"][c]["zone"],
+                 content_hash=index["cases"][c]["object"])
+            for c in ids
+        ]
+
+    def get_bytes(self, case_id):
+        """Stored package bytes for a case, or None."""
+        entry = self._refresh()["cases"].get(case_id)
+        if entry is None:
+            return None
+        try:
+            return (self.root / "objects" / f"{entry['object']}.json").read_bytes()
+        except OSError:
+            return None
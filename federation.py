@@ -0,0 +1,292 @@
+"""
+JalJeevan Score -- Basin Federation
+===================================
+One pipeline + API pair serves one river basin.  A federating API (with
+FEDERATION_CONFIG["backends"] set) owns no sinks: each read fans out to every
+basin API at once and the answers are merged.
+
+  /api/stats, /api/alerts     every backend returns one page in the requested
+                              order; the pages are merged on the same
+                              (value, zone) keys the views sort by and cut to
+                              `limit`.  Zones are renamed "<basin>/<zone>" so
+                              ids stay unique.  The federated cursor keeps one
+                              backend cursor per basin, resuming each right
+                              after the last of its rows that was returned,
+                              so any page costs at most `limit` rows per basin
+  /api/{stats,alerts}/changes the version is every basin's version; a basin
+                              that answers with a full snapshot makes the
+                              merged answer a full snapshot
+  /api/legal                  the most confident basin's answer; sources from
+                              all basins, most confident first
+
+Backends are called over one pooled keep-alive httpx client, each under its
+own timeout, so a slow basin costs its timeout and nothing more.  A basin that
+fails is answered from its last good response to the same request (up to
+`stale_s` old) or left out, and the answer says which (`stale` / `failed`).
+Merged answers, partial ones included, are kept for `cache_ttl_s` and
+concurrent identical requests share one fan-out, so many dashboards polling
+the federation cost each basin about one request per TTL.
+"""
+
+import asyncio
+import base64
+import json
+import time
+
+from config import FEDERATION_CONFIG
+from views import cursor_after, sort_key
+
+try:
+    import httpx
+except ImportError:  # only needed when federating
+    httpx = None
+
+STALE, FAILED = "stale", "failed"
+
+
+def parse_backends(spec):
+    """{basin: base url} from "ganga=http://host:8000,yamuna=http://host2:8000"."""
+    out = {}
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        basin, sep, url = item.partition("=")
+        if not sep or not basin.strip() or not url.strip():
+            raise ValueError(f"Bad backend {item!r} (want basin=url)")
+        out[basin.strip()] = url.strip().rstrip("/")
+    return out
+
+
+def _encode(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def _decode(token):
+    try:
+        return json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Malformed cursor")
+
+
+def _ordered(items, desc):
+    """Merged ((value, zone), ...) items in page order: values, then rows without one."""
+    present = sorted((x for x in items if x[0][0] is not None), key=lambda x: x[0], reverse=desc)
+    return present + sorted((x for x in items if x[0][0] is None), key=lambda x: x[0][1])
+
+
+class Federation:
+    """Scatter-gather over the basin APIs, with per-basin health and caches."""
+
+    def __init__(self, backends=None, cfg=FEDERATION_CONFIG, client=None):
+        self.cfg = dict(cfg)
+        self.backends = parse_backends(cfg["backends"]) if backends is None else dict(backends)
+        self._client = client
+        self._last = {}  # (basin, path, params) -> (monotonic, body, headers)
+        self._cache = {}  # (kind, args) -> (expires, task)
+        self.health = {b: {"url": u, "ok": 0, "stale": 0, "failed": 0, "last_ms": None,
+                           "last_error": None} for b, u in self.backends.items()}
+
+    def __bool__(self):
+        return bool(self.backends)
+
+    def _http(self):
+        if self._client is None:
+            if httpx is None:
+                raise RuntimeError("httpx is required to federate basins")
+            n = self.cfg["max_connections"]
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=n, max_keepalive_connections=n),
+            )
+        return self._client
+
+    def timeout(self, basin):
+        return self.cfg["timeouts"].get(basin, self.cfg["timeout_s"])
+
+    # ── Fan-out ────────────────────────────────────────────────────────────────
+
+    async def _get(self, basin, path, params):
+        """(state, body, headers) from one basin: ok, stale (cached) or failed."""
+        health = self.health[basin]
+        key = (basin, path, tuple(sorted(params.items())))
+        client = self._http()
+        started = time.perf_counter()
+        try:
+            r = await asyncio.wait_for(
+                client.get(self.backends[basin] + path, params=params,
+                           headers={"Accept": "application/json"}),
+                self.timeout(basin))
+            r.raise_for_status()
+            body = r.json()
+        except (asyncio.TimeoutError, httpx.HTTPError, ValueError) as e:
+            health["last_error"] = f"{type(e).__name__}: {e}".rstrip(": ")
+            cached = self._last.get(key)
+            if cached is not None and time.monotonic() - cached[0] <= self.cfg["stale_s"]:
+                health[STALE] += 1
+                return STALE, cached[1], cached[2]
+            health[FAILED] += 1
+            return FAILED, None, {}
+        finally:
+            health["last_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        health["ok"] += 1
+        headers = {k.lower(): v for k, v in r.headers.items() if k.lower().startswith("x-")}
+        self._last.pop(key, None)
+        self._last[key] = (time.monotonic(), body, headers)
+        while len(self._last) > self.cfg["cache_max"]:  # oldest response first
+            del self._last[next(iter(self._last))]
+        return "ok", body, headers
+
+    async def scatter(self, path, params):
+        """{basin: (state, body, headers)} for per-basin params, all basins at once."""
+        basins = list(params)
+        results = await asyncio.gather(*(self._get(b, path, params[b]) for b in basins))
+        return dict(zip(basins, results))
+
+    async def _cached(self, key, make):
+        """Run `make()` once per key and TTL; concurrent callers share the call."""
+        now = time.monotonic()
+        hit = self._cache.get(key)
+        if hit is not None and (not hit[1].done() or hit[0] > now):
+            return await asyncio.shield(hit[1])
+        if len(self._cache) >= self.cfg["cache_max"]:
+            self._cache = {k: v for k, v in self._cache.items()
+                           if not v[1].done() or v[0] > now}
+        task = asyncio.ensure_future(make())
+        self._cache[key] = (float("inf"), task)
+
+        def expire(t):
+            if t.cancelled() or t.exception() is not None:
+                self._cache.pop(key, None)
+            else:
+                self._cache[key] = (time.monotonic() + self.cfg["cache_ttl_s"], t)
+
+        task.add_done_callback(expire)
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _report(results):
+        return {state: sorted(b for b, r in results.items() if r[0] == state)
+                for state in (STALE, FAILED)}
+
+    # ── Merged reads ───────────────────────────────────────────────────────────
+
+    async def page(self, path, sort_keys, status="", sort="zone", limit=None, cursor=""):
+        """
+        (rows, total, next_cursor, report) like ZoneView.page over every basin.
+        Unknown sorts raise KeyError, bad limits and cursors ValueError.
+        """
+        if sort.lstrip("-") not in sort_keys:
+            raise KeyError(sort.lstrip("-"))
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be positive")
+        if cursor:
+            try:
+                c_sort, c_status, after, totals = _decode(cursor)
+                after = {str(b): c for b, c in after.items()}
+                totals = {str(b): int(n) for b, n in totals.items()}
+            except (ValueError, TypeError, AttributeError):
+                raise ValueError("Malformed cursor")
+            if (c_sort, c_status) != (sort, status):
+                raise ValueError("Cursor belongs to a different sort or status")
+        else:
+            after, totals = dict.fromkeys(self.backends, ""), {}
+        return await self._cached(
+            ("page", path, status, sort, limit, cursor),
+            lambda: self._page(path, sort_keys, status, sort, limit, after, totals))
+
+    async def _page(self, path, sort_keys, status, sort, limit, after, totals):
+        params = {}
+        for basin, c in after.items():
+            if c is not None and basin in self.backends:  # None: that basin is exhausted
+                params[basin] = dict({"status": status, "sort": sort},
+                                     **({"limit": limit} if limit else {}),
+                                     **({"cursor": c} if c else {}))
+        results = await self.scatter(path, params)
+
+        by_zone = sort.lstrip("-") == "zone"  # "<basin>/<zone>" keeps each basin's order
+        merged, totals = [], dict(totals)  # exhausted basins keep the total they last had
+        for basin, (_, rows, headers) in results.items():
+            if rows is None:
+                continue
+            totals[basin] = int(headers.get("x-total-count", len(rows)))
+            for i, row in enumerate(rows):
+                key = sort_key(row, sort, sort_keys)  # the backend's own key, for its cursor
+                zone = f"{basin}/{key[1]}"
+                order = (zone if by_zone else key[0], zone)
+                merged.append((order, basin, (i, key), dict(row, zone=zone, basin=basin)))
+        taken = _ordered(merged, sort.startswith("-"))[:limit]
+
+        last = {}
+        for _, basin, at, _ in taken:
+            last[basin] = at
+        nxt = dict(after)
+        for basin, (_, rows, headers) in results.items():
+            if rows is None:
+                continue  # failed: keeps its cursor, so its rows come late rather than never
+            if basin in last and last[basin][0] < len(rows) - 1:
+                nxt[basin] = cursor_after(sort, status, last[basin][1])
+            elif basin in last or not rows:
+                nxt[basin] = headers.get("x-next-cursor")
+        more = any(c is not None for b, c in nxt.items() if b in self.backends)
+        next_cursor = _encode([sort, status, nxt, totals]) if more else None
+        total = sum(n for b, n in totals.items() if b in self.backends)
+        return [row for *_, row in taken], total, next_cursor, self._report(results)
+
+    async def changes(self, path, since=""):
+        """{"version", "full", "rows", "removed", "federation"} across basins."""
+        try:
+            versions = _decode(since) if since else {}
+        except ValueError:
+            versions = {}
+        versions = versions if isinstance(versions, dict) else {}
+        return await self._cached(("changes", path, since),
+                                  lambda: self._changes(path, versions))
+
+    async def _changes(self, path, versions):
+        results = await self.scatter(path, {b: {"since": versions.get(b, "")}
+                                            for b in self.backends})
+        answered = {b: r[1] for b, r in results.items() if r[1] is not None}
+        full = not versions or any(body["full"] for body in answered.values())
+        if full and versions:  # one basin restarted: everyone sends a snapshot
+            redo = [b for b, body in answered.items() if not body["full"]]
+            results.update(await self.scatter(path, {b: {"since": ""} for b in redo}))
+            answered = {b: r[1] for b, r in results.items() if r[1] is not None}
+        rows, removed, version = [], [], {}
+        for basin in self.backends:
+            body = answered.get(basin)
+            if body is None:  # failed; after a snapshot it must send one of its own
+                version[basin] = "" if full else versions.get(basin, "")
+                continue
+            version[basin] = body["version"]
+            rows += [dict(r, zone=f"{basin}/{r.get('zone', '?')}", basin=basin)
+                     for r in body["rows"]]
+            removed += [f"{basin}/{z}" for z in body["removed"]]
+        return {"version": _encode(version), "full": full, "rows": rows, "removed": removed,
+                "federation": self._report(results)}
+
+    async def legal(self, q):
+        """The most confident basin's answer, sources of all basins ranked by confidence."""
+        return await self._cached(("legal", q), lambda: self._legal(q))
+
+    async def _legal(self, q):
+        results = await self.scatter("/api/legal", {b: {"q": q} for b in self.backends})
+        ranked = sorted(((body.get("confidence") or 0, basin, body)
+                         for basin, (_, body, _) in results.items() if body is not None),
+                        key=lambda x: (-x[0], x[1]))
+        hits = [x for x in ranked if x[2].get("sources") and x[0] > 0]
+        best = hits[0] if hits else (0, None, {"answer": "No relevant documents found."})
+        return {
+            "answer": best[2]["answer"],
+            "sources": [f"{b}/{s}" for _, b, body in hits for s in body["sources"]][:3],
+            "confidence": best[0],
+            "method": "BM25",
+            "indexed_documents": sum(body.get("indexed_documents", 0) for *_, body in ranked),
+            "basin": best[1],
+            "federation": self._report(results),
+        }
+
+    def snapshot(self):
+        """Per-basin URL, timeout, answer counts, last latency and last error."""
+        return {b: dict(h, timeout_s=self.timeout(b)) for b, h in self.health.items()}
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
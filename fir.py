@@ -0,0 +1,388 @@
+"""
+JalJeevan Score -- FIR Registry and Submitter
+=============================================
+Filing an FIR is a side effect on an outside authority, so it must happen
+once per case no matter how often the button is pressed or the API restarts.
+
+  FirRegistry    sqlite table in persistence/, one row per case_id (indexed
+                 by incident too).  Filing a case twice returns the first
+                 FIR; an Idempotency-Key already used for another case is a
+                 conflict.  Rows are queued -> submitted | failed.
+  FirSubmitter   asyncio loop in the API process.  Claims due filings in
+                 batches (a lease, so a crash mid-request only delays a
+                 retry), POSTs them over one pooled keep-alive httpx client
+                 and reschedules failures with full-jitter exponential
+                 backoff.  Throughput and queue depth are in snapshot().
+
+Wire format (POST FIR_CONFIG["endpoint"]):
+
+  request   {"filings": [{fir_number, case_id, incident_id, zone,
+                          idempotency_key, evidence_hash, legal_sections,
+                          filed_at}, ...]}
+  response  2xx {"accepted": [{fir_number, reference}], "rejected":
+            [{fir_number, error}]} -- a 2xx without them accepts the batch;
+            429 / 5xx / network errors retry, other 4xx fail the batch.
+            Items that do not name a filing of the batch are ignored (the
+            filing is retried as unacknowledged).
+
+Any other error (bad endpoint URL, httpx missing, sqlite) is logged and
+backed off in run(), which keeps going; the batch it hit comes due again
+when its lease expires.
+"""
+
+import asyncio
+import json
+import random
+import sqlite3
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from config import FIR_CONFIG, FIR_DB
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+QUEUED, SUBMITTED, FAILED = "queued", "submitted", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS firs (
+    seq             INTEGER PRIMARY KEY AUTOINCREMENT,
+    fir_number      TEXT NOT NULL UNIQUE,
+    case_id         TEXT NOT NULL UNIQUE,
+    incident_id     TEXT,
+    zone            TEXT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    payload         TEXT NOT NULL,
+    status          TEXT NOT NULL,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error      TEXT,
+    reference       TEXT,
+    created_at      TEXT NOT NULL,
+    submitted_at    TEXT
+);
+CREATE INDEX IF NOT EXISTS firs_incident ON firs (incident_id);
+CREATE INDEX IF NOT EXISTS firs_due ON firs (status, next_attempt_at);
+"""
+
+
+class IdempotencyConflict(Exception):
+    """The Idempotency-Key was already used to file a different case."""
+
+
+def _record(row):
+    if row is None:
+        return None
+    rec = dict(row)
+    rec.update(json.loads(rec.pop("payload")))
+    return rec
+
+
+class FirRegistry:
+    """Durable FIR records keyed by case_id, incident_id and idempotency key."""
+
+    def __init__(self, path=FIR_DB):
+        self.path = Path(path)
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def _db(self):
+        if self._conn is None:  # opened on first use, so importing the API creates nothing
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _one(self, sql, args):
+        with self._lock:
+            return _record(self._db.execute(sql, args).fetchone())
+
+    def get(self, case_id):
+        return self._one("SELECT * FROM firs WHERE case_id = ?", (case_id,))
+
+    def by_key(self, key):
+        return self._one("SELECT * FROM firs WHERE idempotency_key = ?", (key,))
+
+    def by_incident(self, incident_id):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM firs WHERE incident_id = ? ORDER BY seq", (incident_id,)
+            ).fetchall()
+        return [_record(r) for r in rows]
+
+    def file(self, case_id, payload, idempotency_key=None, incident_id=None, zone=None):
+        """(record, created).  Filing an already-filed case returns its FIR."""
+        key = idempotency_key or f"case:{case_id}"
+        now = datetime.now()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                prior = self._db.execute(
+                    "SELECT * FROM firs WHERE idempotency_key = ? OR case_id = ?", (key, case_id)
+                ).fetchall()
+                for row in prior:
+                    if row["case_id"] != case_id:
+                        raise IdempotencyConflict(key)
+                if prior:
+                    self._db.execute("COMMIT")
+                    return _record(prior[0]), False
+                cur = self._db.execute(
+                    "INSERT INTO firs (fir_number, case_id, incident_id, zone, idempotency_key,"
+                    " payload, status, next_attempt_at, created_at)"
+                    " VALUES ('', ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (case_id, incident_id, zone, key, json.dumps(payload), QUEUED,
+                     time.time(), now.isoformat()),
+                )
+                number = f"FIR-{now:%Y%m%d}-{cur.lastrowid:06d}"
+                self._db.execute("UPDATE firs SET fir_number = ? WHERE seq = ?",
+                                 (number, cur.lastrowid))
+                row = self._db.execute("SELECT * FROM firs WHERE seq = ?",
+                                       (cur.lastrowid,)).fetchone()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return _record(row), True
+
+    def claim(self, limit, lease_s, now=None):
+        """Due queued filings, leased for `lease_s` so no other worker sends them."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT * FROM firs WHERE status = ? AND next_attempt_at <= ?"
+                    " ORDER BY next_attempt_at, seq LIMIT ?", (QUEUED, now, limit),
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE firs SET next_attempt_at = ? WHERE seq = ?",
+                    [(now + lease_s, r["seq"]) for r in rows],
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return [_record(r) for r in rows]
+
+    def _update(self, sql, rows):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(sql, rows)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def mark_submitted(self, references):
+        """references: {fir_number: authority reference or None}."""
+        stamp = datetime.now().isoformat()
+        self._update(
+            "UPDATE firs SET status = ?, reference = ?, submitted_at = ?, last_error = NULL,"
+            " attempts = attempts + 1 WHERE fir_number = ?",
+            [(SUBMITTED, ref, stamp, number) for number, ref in references.items()],
+        )
+
+    def mark_failed(self, errors):
+        """errors: {fir_number: reason}; the filing is not retried."""
+        self._update(
+            "UPDATE firs SET status = ?, last_error = ?, attempts = attempts + 1"
+            " WHERE fir_number = ?",
+            [(FAILED, err, number) for number, err in errors.items()],
+        )
+
+    def mark_retry(self, schedule, error):
+        """schedule: {fir_number: next attempt (epoch seconds)}."""
+        self._update(
+            "UPDATE firs SET attempts = attempts + 1, next_attempt_at = ?, last_error = ?"
+            " WHERE fir_number = ?",
+            [(at, error, number) for number, at in schedule.items()],
+        )
+
+    def counts(self):
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM firs GROUP BY status")
+            return dict(rows.fetchall())
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+# ── Outbound submission ─────────────────────────────────────────────────────
+
+def _wire(rec):
+    return {
+        "fir_number": rec["fir_number"],
+        "case_id": rec["case_id"],
+        "incident_id": rec["incident_id"],
+        "zone": rec["zone"],
+        "idempotency_key": rec["idempotency_key"],
+        "evidence_hash": rec.get("evidence_hash"),
+        "legal_sections": rec.get("legal_sections", []),
+        "filed_at": rec["created_at"],
+    }
+
+
+def _acks(items, numbers):
+    """Reply items (dicts) naming a filing in `numbers`; anything else is ignored."""
+    if not isinstance(items, list):
+        return []
+    return [x for x in items if isinstance(x, dict) and x.get("fir_number") in numbers]
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get("Retry-After", 0))
+    except ValueError:
+        return 0.0
+
+
+class FirSubmitter:
+    """Batches queued filings to the authority endpoint over a pooled client."""
+
+    def __init__(self, registry, endpoint=None, cfg=FIR_CONFIG, client=None, rng=None):
+        self.registry = registry
+        self.endpoint = cfg["endpoint"] if endpoint is None else endpoint
+        self.cfg = dict(cfg)
+        self._client = client
+        self._rng = rng or random.Random()
+        self._wake = None
+        self._recent = deque()  # (monotonic time, accepted) for throughput
+        self.metrics = {"batches": 0, "submitted": 0, "rejected": 0, "retried": 0,
+                        "errors": 0, "last_batch_ms": None, "last_error": None}
+
+    def _http(self):
+        if self._client is None:
+            if httpx is None:
+                raise RuntimeError("httpx is required to submit FIRs")
+            n = self.cfg["max_connections"]
+            self._client = httpx.AsyncClient(
+                timeout=self.cfg["timeout_s"],
+                limits=httpx.Limits(max_connections=n, max_keepalive_connections=n),
+            )
+        return self._client
+
+    def backoff(self, attempts):
+        """Full jitter: uniform(0, min(cap, base * 2**attempts))."""
+        cap = min(self.cfg["backoff_cap_s"], self.cfg["backoff_base_s"] * 2 ** attempts)
+        return self._rng.uniform(0, cap)
+
+    async def flush(self):
+        """Submit one batch of due filings; returns how many were claimed."""
+        batch = self.registry.claim(self.cfg["batch_size"], 2 * self.cfg["timeout_s"])
+        if not batch:
+            return 0
+        started = time.perf_counter()
+        self.metrics["batches"] += 1
+        try:
+            r = await self._http().post(self.endpoint, json={"filings": [_wire(f) for f in batch]})
+        except httpx.HTTPError as e:
+            self._retry(batch, f"{type(e).__name__}: {e}")
+            return len(batch)
+        finally:
+            self.metrics["last_batch_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        if r.status_code == 429 or r.status_code >= 500:
+            self._retry(batch, f"HTTP {r.status_code}", _retry_after(r))
+        elif r.status_code >= 400:
+            self._reject({f["fir_number"]: f"HTTP {r.status_code}: {r.text[:200]}" for f in batch})
+        else:
+            try:
+                body = r.json()
+            except ValueError:
+                body = {}
+            body = body if isinstance(body, dict) else {}
+            if "accepted" in body or "rejected" in body:
+                numbers = {f["fir_number"] for f in batch}
+                accepted = {a["fir_number"]: a.get("reference")
+                            for a in _acks(body.get("accepted"), numbers)}
+                rejected = {x["fir_number"]: str(x.get("error", "rejected"))
+                            for x in _acks(body.get("rejected"), numbers)
+                            if x["fir_number"] not in accepted}
+                self._reject(rejected)
+                missing = [f for f in batch
+                           if f["fir_number"] not in accepted and f["fir_number"] not in rejected]
+                if missing:
+                    self._retry(missing, "not acknowledged")
+            else:
+                accepted = {f["fir_number"]: None for f in batch}
+            self.registry.mark_submitted(accepted)
+            self.metrics["submitted"] += len(accepted)
+            self._recent.append((time.monotonic(), len(accepted)))
+        return len(batch)
+
+    def _reject(self, errors):
+        if errors:
+            self.registry.mark_failed(errors)
+            self.metrics["rejected"] += len(errors)
+            self.metrics["last_error"] = next(iter(errors.values()))
+
+    def _retry(self, batch, error, after=0.0):
+        self.metrics["retried"] += len(batch)
+        self.metrics["last_error"] = error
+        now, give_up, schedule = time.time(), {}, {}
+        for f in batch:
+            if f["attempts"] + 1 >= self.cfg["max_attempts"]:
+                give_up[f["fir_number"]] = error
+            else:
+                schedule[f["fir_number"]] = now + max(after, self.backoff(f["attempts"]))
+        self.registry.mark_retry(schedule, error)
+        self._reject(give_up)
+
+    def wake(self):
+        """Called after a new filing so it goes out without waiting for the poll."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def run(self):
+        """Drain due filings forever; sleeps interval_s (or until woken) when idle."""
+        self._wake = asyncio.Event()
+        failures = 0
+        while True:
+            try:
+                claimed = await self.flush()
+            except Exception as e:  # the task must outlive any one batch
+                traceback.print_exc()
+                self.metrics["errors"] += 1
+                self.metrics["last_error"] = f"{type(e).__name__}: {e}"
+                await asyncio.sleep(self.backoff(failures))
+                failures += 1
+                continue
+            failures = 0
+            if claimed >= self.cfg["batch_size"]:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.cfg["interval_s"])
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def snapshot(self):
+        """Metrics plus queue depth and accepted filings per second over the last minute."""
+        now = time.monotonic()
+        while self._recent and now - self._recent[0][0] > 60:
+            self._recent.popleft()
+        counts = self.registry.counts()
+        return dict(
+            self.metrics,
+            enabled=bool(self.endpoint),
+            queue_depth=counts.get(QUEUED, 0),
+            by_status=counts,
+            throughput_per_s=round(sum(n for _, n in self._recent) / 60, 3),
+        )
@@ -0,0 +1,240 @@
+"""
+JalJeevan Score -- Dolphin Count Forecasts
+==========================================
+Alerts fire once dolphin_count is already DOLPHIN_DECLINE_THRESHOLD below its
+baseline.  This stage looks ahead: every zone keeps damped-trend Holt-Winters
+state over hourly bins (level, trend, a daily season and the one-step
+residual variance) and projects counts FORECAST_CONFIG["horizons_h"] ahead
+with prediction intervals.  A zone whose projection crosses the threshold
+before its current count does gets `forecast_warning`.
+
+State is a set of NumPy arrays shared by all zones, as in causality.py,
+with one row per interned zone id (zones.py):
+
+  level, trend, sigma2, n    (zones,)            smoothing state per zone
+  season                     (zones, season_bins)
+  bin_sum, bin_cnt           (zones,)            the open bin's samples
+
+Closing a bin is one vectorized update of every zone (zones without a
+sample in it only carry their trend forward), so the cost per tick is a few
+array passes whatever the zone count, and ingesting a row is O(1).
+Forecasts start from the last closed bin; rows for bins already closed are
+counted as late and dropped.
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import DOLPHIN_DECLINE_THRESHOLD, FORECAST_CONFIG
+from zones import registry
+
+
+def _bins(timestamps, bin_seconds):
+    ns = pd.to_datetime(pd.Series(timestamps)).astype("datetime64[ns]").astype("int64")
+    return (ns.to_numpy() // (bin_seconds * 10**9)).astype(np.int64)
+
+
+class HoltWinters:
+    """Per-zone damped-trend, additive-season exponential smoothing over time bins."""
+
+    _ARRAYS = ("level", "trend", "sigma2", "n", "bin_sum", "bin_cnt")
+
+    def __init__(self, cfg=FORECAST_CONFIG, threshold=DOLPHIN_DECLINE_THRESHOLD):
+        self.cfg = dict(cfg)
+        self.bin_seconds = int(cfg["bin_minutes"] * 60)
+        self.m = int(cfg["season_bins"])
+        self.horizons = np.asarray(cfg["horizons_h"], dtype=float)
+        self.steps = np.ceil(self.horizons * 3600 / self.bin_seconds).astype(np.int64)
+        self.threshold_pct = threshold * 100
+        self.registry = registry()
+        self.seen = np.zeros(0, dtype=bool)  # rows of zones with state
+        self.bin = None  # the open bin
+        self.late_rows = 0
+        for name in self._ARRAYS:
+            setattr(self, name, np.zeros(0))
+        self.season = np.zeros((0, self.m))
+        self._spread = self._spread_factors()
+
+    def _spread_factors(self):
+        """Forecast variance / one-step variance for 1 .. max(steps) + 1 bins ahead."""
+        a, b, g, phi = (self.cfg[k] for k in ("alpha", "beta", "gamma", "phi"))
+        j = np.arange(1, int(self.steps.max()) + 2)
+        damped = np.cumsum(phi ** j)  # phi + phi^2 + ... + phi^j
+        c = a * (1 + b * damped) + g * (j % self.m == 0)
+        return 1 + np.concatenate(([0.0], np.cumsum(c ** 2)[:-1]))
+
+    # ── zone registry ────────────────────────────────────────────────────
+
+    def _rows(self, zones):
+        """State rows (interned ids) of `zones`, adding any not seen before."""
+        rows = self.registry.codes(zones, assign=True)
+        if len(rows):
+            self._reserve(int(rows.max()) + 1)
+            self.seen[rows] = True
+        return rows
+
+    def _lookup(self, zones):
+        """State rows of `zones`; -1 for zones without state."""
+        rows = self.registry.codes(zones)
+        ok = (rows >= 0) & (rows < len(self.seen))
+        ok[ok] = self.seen[rows[ok]]
+        return np.where(ok, rows, -1)
+
+    def _reserve(self, size):
+        """Room for `size` rows; capacity doubles, so adding zones one at a time is O(Z)."""
+        capacity = len(self.level)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        for name in self._ARRAYS + ("season", "seen"):
+            old = getattr(self, name)
+            grown = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, name, grown)
+
+    # ── bin clock ────────────────────────────────────────────────────────
+
+    def _close(self, t):
+        """Fold the open bin `t` into every zone's state."""
+        cfg, phi = self.cfg, self.cfg["phi"]
+        has = self.bin_cnt > 0
+        y = np.where(has, self.bin_sum / np.maximum(self.bin_cnt, 1), 0.0)
+        slot = t % self.m
+        s = self.season[:, slot]
+        first = has & (self.n == 0)
+        seen = has & ~first
+
+        err = y - (self.level + phi * self.trend + s)
+        level = cfg["alpha"] * (y - s) + (1 - cfg["alpha"]) * (self.level + phi * self.trend)
+        trend = cfg["beta"] * (level - self.level) + (1 - cfg["beta"]) * phi * self.trend
+        weight = np.maximum(1 / np.maximum(self.n, 1), cfg["sigma_alpha"])
+        sigma2 = self.sigma2 + weight * (err ** 2 - self.sigma2)
+
+        gamma = np.maximum(cfg["gamma"], 1 / (1 + self.n // self.m))  # first cycles: averages
+        self.season[seen, slot] = (gamma * (y - level) + (1 - gamma) * s)[seen]
+        idle = ~has
+        self.level = np.where(seen, level, np.where(first, y, self.level + phi * self.trend))
+        self.trend = np.where(seen, trend, np.where(idle, phi * self.trend, 0.0))
+        self.sigma2 = np.where(seen, sigma2, self.sigma2)
+        self.n += has
+        self.bin_sum[:] = 0.0
+        self.bin_cnt[:] = 0.0
+
+    def _advance(self, b):
+        """Move the clock to bin `b`: close the open bin and any empty ones before b."""
+        if self.bin is None:
+            self.bin = b
+            return
+        self._close(self.bin)
+        gap = b - self.bin - 1  # bins with no rows at all: carry the damped trend
+        if gap > 0:
+            phi = self.cfg["phi"]
+            carried = phi * (1 - phi ** gap) / (1 - phi) if phi != 1 else float(gap)
+            self.level = self.level + carried * self.trend
+            self.trend = self.trend * phi ** gap
+        self.bin = b
+
+    # ── ingestion ────────────────────────────────────────────────────────
+
+    def observe(self, zones, timestamps, values):
+        """Add dolphin counts (any order within the batch)."""
+        if len(zones) == 0:
+            return
+        rows = self._rows(list(zones))
+        bins = _bins(timestamps, self.bin_seconds)
+        values = np.asarray(values, dtype=float)
+        keep = ~np.isnan(values)
+        order = np.argsort(bins, kind="stable")
+        rows, bins, values, keep = rows[order], bins[order], values[order], keep[order]
+        starts = np.flatnonzero(np.r_[True, np.diff(bins) != 0])
+        for lo, hi in zip(starts, np.r_[starts[1:], len(bins)]):
+            b = int(bins[lo])
+            if self.bin is not None and b < self.bin:
+                self.late_rows += int(keep[lo:hi].sum())
+                continue
+            if b != self.bin:
+                self._advance(b)
+            ok = keep[lo:hi]
+            np.add.at(self.bin_sum, rows[lo:hi][ok], values[lo:hi][ok])
+            np.add.at(self.bin_cnt, rows[lo:hi][ok], 1.0)
+
+    # ── read side ────────────────────────────────────────────────────────
+
+    def forecast(self, zones):
+        """
+        (point, lo, hi) arrays of shape (len(zones), len(horizons)), counted
+        from the open bin; NaN for unknown zones and zones still warming up.
+        """
+        shape = (len(zones), len(self.horizons))
+        point, lo, hi = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+        rows = self._lookup(zones)
+        known = np.flatnonzero(rows >= 0)
+        if not len(known) or self.bin is None:
+            return point, lo, hi
+        r = rows[known]
+        ready = self.n[r] >= self.cfg["warmup"]
+        r, idx = r[ready], known[ready]
+        if not len(r):
+            return point, lo, hi
+        phi = self.cfg["phi"]
+        ahead = self.steps + 1  # from the last closed bin
+        damped = np.cumsum(phi ** np.arange(1, int(ahead.max()) + 1))[ahead - 1]
+        slots = (self.bin - 1 + ahead) % self.m
+        p = self.level[r, None] + damped[None, :] * self.trend[r, None] + self.season[r][:, slots]
+        width = self.cfg["interval_z"] * np.sqrt(self.sigma2[r, None] * self._spread[ahead - 1])
+        point[idx] = np.maximum(p, 0.0)
+        lo[idx] = np.maximum(p - width, 0.0)
+        hi[idx] = np.maximum(p + width, 0.0)
+        return point, lo, hi
+
+    def columns(self, zones, counts, baselines):
+        """
+        Stats-row columns for `zones` as arrays aligned with them (NaN where
+        there is no forecast): forecast_<h>h with _lo / _hi, the worst
+        projected decline against `baselines`, the first horizon that crosses
+        the alert threshold and the early warning.
+        """
+        point, lo, hi = self.forecast(list(zones))
+        base = np.asarray(baselines, dtype=float)[:, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            projected = np.where(base > 0, (1 - point / base) * 100, np.nan)
+            now = np.where(base[:, 0] > 0, (1 - np.asarray(counts, dtype=float) / base[:, 0]) * 100,
+                           0.0)
+        crossed = projected > self.threshold_pct
+        ahead = crossed.any(axis=1)
+        worst = np.where(np.isnan(projected).all(axis=1), np.nan,
+                         np.max(np.where(np.isnan(projected), -np.inf, projected), axis=1))
+        out = {}
+        for j, h in enumerate(self.cfg["horizons_h"]):
+            out[f"forecast_{h}h"] = np.round(point[:, j], 2)
+            out[f"forecast_{h}h_lo"] = np.round(lo[:, j], 2)
+            out[f"forecast_{h}h_hi"] = np.round(hi[:, j], 2)
+        out["forecast_decline_pct"] = np.round(worst, 2)
+        out["forecast_cross_h"] = np.where(ahead, self.horizons[crossed.argmax(axis=1)], np.nan)
+        out["forecast_warning"] = ahead & ~(now > self.threshold_pct)
+        return out
+
+    # ── checkpoint ───────────────────────────────────────────────────────
+
+    def to_dict(self):
+        rows = np.flatnonzero(self.seen)  # zones by id: interned ints are per process
+        state = {name: getattr(self, name)[rows] for name in self._ARRAYS}
+        state.update(season=self.season[rows], zones=[self.registry.ids[r] for r in rows],
+                     bin=self.bin, late_rows=self.late_rows, bin_seconds=self.bin_seconds,
+                     m=self.m)
+        return state
+
+    def load(self, state):
+        if not state or (state.get("bin_seconds"), state.get("m")) != (self.bin_seconds, self.m):
+            return self  # nothing saved, or config changed; start fresh
+        rows = self.registry.codes(state["zones"], assign=True)
+        size = int(rows.max()) + 1 if len(rows) else 0
+        for name in self._ARRAYS + ("season",):
+            saved = np.asarray(state[name], dtype=float)
+            full = np.zeros((size,) + saved.shape[1:])
+            full[rows] = saved
+            setattr(self, name, full)
+        self.seen = np.zeros(size, dtype=bool)
+        self.seen[rows] = True
+        self.bin, self.late_rows = state["bin"], state["late_rows"]
+        return self
@@ -0,0 +1,496 @@
+"""
+JalJeevan Score -- Engine Harness
+=================================
+Differential equivalence and performance checks for the two engines.  The
+same generated CSV stream is fed, batch by batch, through each engine and
+the outputs are compared after normalization:
+
+  generate     deterministic dolphin / mining streams per scenario: zone
+               count, rows per zone-hour, late rows (held back 1-6 batches,
+               timestamps unchanged) and out-of-order rows (shuffled within
+               their batch)
+  engines      simulation           one _tick() per batch
+               simulation-restart   the same, checkpointed and resumed in a
+                                    new process halfway (warm restart path)
+               pathway              run_pathway(replay=...), one __time__ per
+                                    batch; only where real Pathway is installed
+                                    and PATHWAY_REAL != 0
+  compare      final stats row per zone (Pathway retractions applied) and
+               each zone's alert sequence, floats within tolerance, against
+               the simulation engine
+  baseline     runtime and peak RSS per scenario and engine, tracked in
+               tests/engine_baseline.json; --update-baseline rewrites it
+  startup      --startup: seconds from spawning a fresh process to its first
+               useful output -- pipeline.py to its first stats snapshot (cold,
+               then restarted over the same home) and the API to its first
+               /api/health 200 -- failing when over STARTUP_BUDGET_S
+
+Every run is a subprocess whose JALJEEVAN_HOME is its own directory, so runs
+never share files or module state.
+
+  python harness.py                        all scenarios, available engines
+  python harness.py -s late -e simulation,pathway
+  python harness.py --update-baseline
+  python harness.py --startup
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPO = Path(__file__).parent
+BASELINE = REPO / "tests" / "engine_baseline.json"
+START = datetime(2026, 3, 1)
+
+SCENARIOS = {
+    "basic": dict(zones=3, hours=24, rate=6, late=0.0, disorder=0.0, seed=1),
+    "late": dict(zones=3, hours=36, rate=6, late=0.05, disorder=0.2, seed=2),
+    "wide": dict(zones=200, hours=24, rate=2, late=0.02, disorder=0.1, seed=3),
+}
+# Seconds from process spawn to first output; a crashed worker is back within these
+STARTUP_BUDGET_S = {"pipeline_cold_s": 6.0, "pipeline_restart_s": 6.0, "api_health_s": 2.0}
+ENGINES = ("simulation", "simulation-restart", "pathway")
+REFERENCE = "simulation"
+
+# Columns compared per zone; floats match within the tolerance (avg_48h is
+# rounded to 2 places by the simulation engine only)
+STATS_KEYS = ("dolphin_count", "avg_48h", "min_48h", "max_48h", "total_samples", "observed_at",
+              "mining_detected", "mining_conf", "mining_events", "p10_48h", "p50_48h", "p90_48h",
+              "causal_lag_h", "causal_strength", "decline_pct", "status")
+ALERT_KEYS = ("incident_id", "case_id", "event", "state", "opened_at", "observed_at",
+              "decline_pct", "trigger")
+TOLERANCE = {"avg_48h": 0.0051, "decline_pct": 0.051}
+FLOAT_TOL = 1e-6
+
+
+# ── Stream generation ──────────────────────────────────────────────────────────
+
+def _zones(n):
+    from config import ZONES
+    zones = [dict(z) for z in ZONES[:n]]
+    for i in range(len(zones), n):
+        zones.append({"id": f"H{i:04d}", "name": f"Reach {i}", "base": 20 + i % 25,
+                      "lat": round(25.0 + i * 0.01, 4), "lon": round(82.0 + (i % 50) * 0.01, 4)})
+    return zones
+
+
+def generate(home, zones=3, hours=24, rate=6, late=0.0, disorder=0.0, seed=0):
+    """
+    Write a scenario's stream under `home`: zones.json, the NGT orders, empty
+    live CSVs and stream.csv / stream_mining.csv (every row with its batch).
+    Returns the number of batches (one per hour of data).
+    """
+    rng = random.Random(seed)
+    home = Path(home)
+    data = home / "data"
+    data.mkdir(parents=True, exist_ok=True)
+    shutil.copytree(REPO / "data" / "ngt_orders", data / "ngt_orders", dirs_exist_ok=True)
+    registry = _zones(zones)
+    (data / "zones.json").write_text(json.dumps(registry))
+    (data / "live_dolphin.csv").write_text("timestamp,zone,dolphin_count,confidence\n")
+    (data / "live_mining.csv").write_text(
+        "timestamp,zone,confidence,turbidity_anomaly,night_activity\n")
+
+    dolphins, mining = [[] for _ in range(hours)], [[] for _ in range(hours)]
+    for k, z in enumerate(registry):
+        base = z["base"]
+        mined = k % 3 == 2  # Zone9 and every third zone: mining, then decline
+        onset = hours // 3 + k % 5
+        for h in range(hours):
+            t0 = START + timedelta(hours=h)
+            since = h - onset
+            factor = 1.0
+            if mined and since >= 0:
+                factor = max(0.45, 1 - 0.06 * since) if since < hours // 2 else 0.95
+            for j in range(rate):
+                t = t0 + timedelta(minutes=j * 60 // rate)
+                count = max(1, round(base * factor + rng.gauss(0, 1)))
+                conf = round(rng.uniform(0.85, 0.97), 2)
+                dolphins[h].append([t.isoformat(), z["id"], count, conf])
+            hot = mined and 0 <= since < 6
+            t = t0 + timedelta(minutes=rng.randrange(60))
+            conf = rng.uniform(0.85, 0.97) if hot else rng.uniform(0.1, 0.6)
+            turbidity = rng.uniform(2, 3.5) if hot else rng.uniform(0, 1)
+            night = rng.uniform(0.7, 1) if hot else rng.uniform(0, 0.4)
+            mining[h].append([t.isoformat(), z["id"], round(conf, 2), round(turbidity, 2),
+                              round(night, 2)])
+
+    for batches in (dolphins, mining):
+        for h in range(hours):
+            keep = []
+            for row in batches[h]:
+                if h < hours - 1 and rng.random() < late:
+                    batches[min(hours - 1, h + rng.randint(1, 6))].append(row)
+                else:
+                    keep.append(row)
+            batches[h] = keep
+        for rows in batches:
+            picked = [i for i in range(len(rows)) if rng.random() < disorder]
+            moved = [rows[i] for i in picked]
+            rng.shuffle(moved)
+            for i, row in zip(picked, moved):
+                rows[i] = row
+
+    cols = (["timestamp", "zone", "dolphin_count", "confidence"],
+            ["timestamp", "zone", "confidence", "turbidity_anomaly", "night_activity"])
+    for name, batches, columns in (("stream.csv", dolphins, cols[0]),
+                                   ("stream_mining.csv", mining, cols[1])):
+        frame = pd.DataFrame([[b] + r for b, rows in enumerate(batches) for r in rows],
+                             columns=["batch"] + columns)
+        frame.to_csv(home / name, index=False)
+    return hours
+
+
+# ── Engine workers (run in a subprocess with JALJEEVAN_HOME set) ──────────────
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def _worker(engine, home, first, last):
+    import pipeline
+    from config import DOLPHIN_CSV, MINING_CSV
+    from evidence import EvidenceStore
+
+    home = Path(home)
+    d = pd.read_csv(home / "stream.csv")
+    m = pd.read_csv(home / "stream_mining.csv")
+    pipeline.bootstrap()  # directories only: the stream, zones and orders already exist
+    started = time.perf_counter()
+    if engine == "pathway":
+        d["__time__"], m["__time__"] = 2 * (d["batch"] + 1), 2 * (m["batch"] + 1)
+        pipeline.run_pathway(replay=(d.drop(columns="batch"), m.drop(columns="batch")))
+    else:
+        store = pipeline._PersistenceStore()
+        store.rollback_sinks()
+        evidence = EvidenceStore()
+        for b in range(first, last):
+            for frame, path in ((d, DOLPHIN_CSV), (m, MINING_CSV)):
+                frame[frame["batch"] == b].drop(columns="batch").to_csv(
+                    path, mode="a", header=False, index=False)
+            pipeline._tick(store, evidence)
+        store.checkpoint()
+    with open(home / "metrics.jsonl", "a") as f:
+        f.write(json.dumps({"runtime_s": time.perf_counter() - started,
+                            "peak_rss_mb": _peak_rss_mb()}) + "\n")
+
+
+def _spawn(engine, home, first, last):
+    env = dict(os.environ, JALJEEVAN_HOME=str(home), PYTHONHASHSEED="0")
+    subprocess.run([sys.executable, str(Path(__file__).resolve()), "--worker",
+                    engine, str(home), str(first), str(last)],
+                   cwd=home, env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def available_engines():
+    """Engines that can run here (pathway needs the real package and PATHWAY_REAL != 0)."""
+    import pipeline
+    return [e for e in ENGINES if e != "pathway" or pipeline.use_real()]
+
+
+def run_engine(engine, home, scenario):
+    """Generate the scenario under `home`, run one engine over it; returns its result."""
+    shutil.rmtree(home, ignore_errors=True)
+    batches = generate(home, **scenario)
+    if engine == "simulation-restart":
+        _spawn(engine, home, 0, batches // 2)
+        _spawn(engine, home, batches // 2, batches)
+    else:
+        _spawn(engine, home, 0, batches)
+    metrics = [json.loads(line) for line in open(Path(home) / "metrics.jsonl")]
+    rss = [x["peak_rss_mb"] for x in metrics if x["peak_rss_mb"] is not None]
+    return {
+        "runtime_s": round(sum(x["runtime_s"] for x in metrics), 3),
+        "peak_rss_mb": max(rss) if rss else None,
+        "stats": normalize_stats(_jsonl(Path(home) / "output" / "stats.jsonl")),
+        "alerts": normalize_alerts(_jsonl(Path(home) / "output" / "alerts.jsonl")),
+    }
+
+
+# ── Normalization and comparison ───────────────────────────────────────────────
+
+def _jsonl(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _value(value):
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, str) and len(value) >= 19 and value[4] == "-" and value[10] in " T":
+        try:
+            return pd.Timestamp(value).isoformat()
+        except ValueError:
+            return value
+    return value
+
+
+def normalize_stats(rows):
+    """
+    Final row per zone.  Pathway sink rows carry `time` / `diff`: within one
+    time retractions apply before insertions; other rows are upserts.
+    """
+    final = {}
+    for _, _, _, row in sorted((r.get("time", 0), r.get("diff", 1), i, r)
+                               for i, r in enumerate(rows)):
+        if row.get("diff", 1) < 0:
+            final.pop(row["zone"], None)
+        else:
+            final[row["zone"]] = {k: _value(row.get(k)) for k in STATS_KEYS}
+    return final
+
+
+def normalize_alerts(rows):
+    """Each zone's alert records in emission order, reduced to ALERT_KEYS."""
+    out = {}
+    for row in rows:
+        out.setdefault(row["zone"], []).append({k: _value(row.get(k)) for k in ALERT_KEYS})
+    return out
+
+
+def _same(key, a, b):
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)) \
+            and not isinstance(a, bool) and not isinstance(b, bool):
+        return math.isclose(a, b, rel_tol=FLOAT_TOL, abs_tol=TOLERANCE.get(key, FLOAT_TOL))
+    return a == b
+
+
+def compare(ref, other, limit=20):
+    """Human-readable differences between two engine results (empty = equivalent)."""
+    diffs = []
+    for zone in sorted(set(ref["stats"]) | set(other["stats"])):
+        a, b = ref["stats"].get(zone), other["stats"].get(zone)
+        if a is None or b is None:
+            diffs.append(f"stats {zone}: only in {'reference' if b is None else 'candidate'}")
+            continue
+        diffs += [f"stats {zone}.{k}: {a[k]!r} != {b[k]!r}"
+                  for k in STATS_KEYS if not _same(k, a[k], b[k])]
+    for zone in sorted(set(ref["alerts"]) | set(other["alerts"])):
+        a, b = ref["alerts"].get(zone, []), other["alerts"].get(zone, [])
+        if len(a) != len(b):
+            diffs.append(f"alerts {zone}: {len(a)} records != {len(b)}")
+        for n, (x, y) in enumerate(zip(a, b)):
+            diffs += [f"alerts {zone}[{n}].{k}: {x[k]!r} != {y[k]!r}"
+                      for k in ALERT_KEYS if not _same(k, x[k], y[k])]
+    return diffs[:limit] + ([f"... {len(diffs) - limit} more"] if len(diffs) > limit else [])
+
+
+# ── Baseline ───────────────────────────────────────────────────────────────────
+
+def load_baseline(path=BASELINE):
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {"scenarios": {}}
+
+
+def regressions(report, baseline, tolerance=2.0):
+    """Runs slower, or using more memory, than `tolerance` x the tracked baseline."""
+    out = []
+    for name, engines in report.items():
+        for engine, r in engines.items():
+            base = baseline.get("scenarios", {}).get(name, {}).get(engine)
+            if not base:
+                continue
+            for key in ("runtime_s", "peak_rss_mb"):
+                if r.get(key) and base.get(key) and r[key] > base[key] * tolerance:
+                    out.append(f"{name}/{engine} {key}: {r[key]} > {tolerance} x {base[key]}")
+    return out
+
+
+def save_baseline(report, path=BASELINE):
+    baseline = load_baseline(path)
+    baseline.update(python=platform.python_version(), machine=platform.machine(),
+                    recorded=datetime.now().strftime("%Y-%m-%d"))
+    for name, engines in report.items():
+        slot = baseline["scenarios"].setdefault(name, {})
+        for engine, r in engines.items():
+            slot[engine] = {"runtime_s": r["runtime_s"], "peak_rss_mb": r["peak_rss_mb"],
+                            "zones": r["zones"], "alerts": r["alert_records"]}
+    Path(path).write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+# ── Startup budget ─────────────────────────────────────────────────────────────
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _time_until(cmd, home, ready, timeout):
+    """Seconds from spawning `cmd` until ready() holds; the process is then stopped."""
+    env = dict(os.environ, JALJEEVAN_HOME=str(home), PYTHONPATH=str(REPO))
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=REPO, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while not ready():
+            if proc.poll() is not None:
+                raise RuntimeError(f"{' '.join(cmd)} exited with {proc.returncode}")
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError(f"{' '.join(cmd)}: not ready after {timeout} s")
+            time.sleep(0.01)
+        return round(time.perf_counter() - started, 3)
+    finally:
+        # SIGINT lets run_simulation() write its final checkpoint before exiting
+        if os.name == "posix":
+            proc.send_signal(signal.SIGINT)
+        else:
+            proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def measure_startup(home, timeout=60):
+    """
+    Startup times of fresh processes over one home: pipeline.py cold (empty
+    home) and restarted (checkpoint and legal index on disk) until it writes
+    its stats snapshot, then the API until /api/health answers 200.
+    """
+    home = Path(home)
+    shutil.rmtree(home, ignore_errors=True)
+    home.mkdir(parents=True)
+    snapshot = home / "output" / "stats.json"
+    pipeline = [sys.executable, str(REPO / "pipeline.py")]
+    out = {}
+    for key in ("pipeline_cold_s", "pipeline_restart_s"):
+        since = time.time_ns()
+        out[key] = _time_until(
+            pipeline, home, lambda: snapshot.exists() and snapshot.stat().st_mtime_ns >= since,
+            timeout)
+
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/health"
+
+    def healthy():
+        try:
+            with urllib.request.urlopen(url, timeout=1) as r:
+                return r.status == 200
+        except OSError:
+            return False
+
+    out["api_health_s"] = _time_until(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level",
+         "warning"], home, healthy, timeout)
+    return out
+
+
+def over_budget(startup, budget=None):
+    """Startup measurements above their budget, as messages."""
+    budget = budget or STARTUP_BUDGET_S
+    return [f"{k}: {v} s > {budget[k]} s" for k, v in startup.items()
+            if k in budget and v > budget[k]]
+
+
+# ── Driver ─────────────────────────────────────────────────────────────────────
+
+def run(scenarios=None, engines=None, workdir=None):
+    """
+    Run `engines` over `scenarios`; returns {scenario: {engine: summary}},
+    each summary with runtime, peak RSS, zone / alert counts and the diffs
+    against the reference engine.
+    """
+    scenarios = scenarios or list(SCENARIOS)
+    engines = engines or available_engines()
+    if REFERENCE not in engines:
+        engines = [REFERENCE] + list(engines)
+    root = Path(workdir or tempfile.mkdtemp(prefix="jaljeevan-harness-"))
+    report = {}
+    for name in scenarios:
+        results = {e: run_engine(e, root / name / e, SCENARIOS[name]) for e in engines}
+        ref = results[REFERENCE]
+        report[name] = {
+            e: {"runtime_s": r["runtime_s"], "peak_rss_mb": r["peak_rss_mb"],
+                "zones": len(r["stats"]), "alert_records": sum(map(len, r["alerts"].values())),
+                "diffs": [] if e == REFERENCE else compare(ref, r)}
+            for e, r in results.items()
+        }
+    if workdir is None:
+        shutil.rmtree(root, ignore_errors=True)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare engine outputs and performance.")
+    parser.add_argument("-s", "--scenario", action="append", choices=list(SCENARIOS))
+    parser.add_argument("-e", "--engines", help="comma-separated (default: all available)")
+    parser.add_argument("--tolerance", type=float, default=2.0,
+                        help="fail when runtime / RSS exceed this multiple of the baseline")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--workdir", help="keep run directories here")
+    parser.add_argument("--startup", action="store_true",
+                        help="measure process startup against STARTUP_BUDGET_S instead")
+    parser.add_argument("--worker", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.worker:
+        engine, home, first, last = args.worker
+        _worker(engine, home, int(first), int(last))
+        return 0
+
+    if args.startup:
+        root = Path(args.workdir or tempfile.mkdtemp(prefix="jaljeevan-startup-"))
+        startup = measure_startup(root / "startup")
+        if args.workdir is None:
+            shutil.rmtree(root, ignore_errors=True)
+        for key, seconds in startup.items():
+            print(f"{key:20} {seconds:>8.3f} s   budget {STARTUP_BUDGET_S[key]:.1f} s")
+        problems = over_budget(startup)
+        for line in problems:
+            print(f"OVER BUDGET {line}")
+        return 1 if problems else 0
+
+    engines = args.engines.split(",") if args.engines else None
+    report = run(args.scenario, engines, args.workdir)
+    failed = False
+    print(f"{'scenario':10} {'engine':20} {'runtime s':>10} {'RSS MB':>8} {'zones':>6} "
+          f"{'alerts':>7}  result")
+    for name, engines in report.items():
+        for engine, r in engines.items():
+            verdict = "reference" if engine == REFERENCE else (
+                "equivalent" if not r["diffs"] else f"{len(r['diffs'])} differences")
+            print(f"{name:10} {engine:20} {r['runtime_s']:>10.3f} {r['peak_rss_mb'] or 0:>8} "
+                  f"{r['zones']:>6} {r['alert_records']:>7}  {verdict}")
+            for line in r["diffs"]:
+                print(f"    {line}")
+            failed = failed or bool(r["diffs"])
+    if args.update_baseline:
+        save_baseline(report)
+        print(f"Baseline written to {BASELINE}")
+    else:
+        for line in regressions(report, load_baseline(), args.tolerance):
+            print(f"REGRESSION {line}")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""
+JalJeevan Score -- Legal Clause Index
+=====================================
+NGT orders in data/ngt_orders/ are parsed once into structured clauses and
+indexed by violation type, so alerts, evidence packages and FIRs attach
+their legal context with a dictionary lookup instead of a retrieval query.
+
+Per order:
+
+  order_no    "O.A. 38/2024", "Order 2024/WL/61"
+  date        ISO date of the order
+  subject     "Subject:" / "IN THE MATTER OF:" line
+  sections    "IPC §379", "EPA 1986 §15", "WPA 1972 Sch. I", ...
+  penalties   {text, fine_inr, prison_years}
+  thresholds  {parameter, min, max, unit, text}  e.g. BOD below 30 mg/L
+  deadlines   {text, hours}                      e.g. FIR within 48 hours
+
+Every extracted item is tagged with violation types (config.LEGAL_VIOLATIONS)
+from its own line, else its paragraph, else the whole order, so an order that
+covers several violations contributes only the matching items to each.
+
+refresh() re-parses only files whose mtime / size changed, then swaps the
+whole index in one assignment.  A file that cannot be read keeps its previous
+parse and records the reason in `error`.
+
+The pipeline saves the parsed orders (and their paragraphs, for keyword
+search) to output/legal_index.json at bootstrap.  An index given that
+artifact starts from it and re-parses only the files whose stamps differ, so
+a restarted API serves clauses and search results without parsing anything.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from config import LEGAL_INDEX_FILE, LEGAL_RELOAD_S, LEGAL_VIOLATIONS, NGT_DIR
+
+_FORMAT = 1  # bump when parse_order output changes: older artifacts are then ignored
+
+_HOURS = {"hour": 1, "day": 24, "week": 24 * 7, "month": 24 * 30}
+_CRORE, _LAKH = 10_000_000, 100_000
+
+# ── Extraction patterns ────────────────────────────────────────────────────────
+
+_ORDER_NO = [
+    (re.compile(r"(?:Original Application|O\.A\.)\s*No\.?\s*(\d+/\d{4})"), "O.A. {}"),
+    (re.compile(r"Order No\.?\s*(\d{4}/[A-Z]+/\d+|\d+/\d{4})"), "Order {}"),
+]
+_DATE = re.compile(r"(?:ORDER DATED|Order Date|Date)\s*:\s*([^\n|]+)", re.I)
+_SUBJECT = re.compile(r"(?:Subject|IN THE MATTER OF)\s*:\s*(.+)", re.I)
+_SECTIONS = [  # (pattern, name when the group is empty, name with the group)
+    (re.compile(r"IPC\s+Section\s+(\d+)", re.I), None, "IPC §{}"),
+    (re.compile(r"(?:EPA|Environment Protection Act),?\s+1986,?\s+Section\s+(\d+)", re.I),
+     None, "EPA 1986 §{}"),
+    (re.compile(r"Wildlife Protection Act,?\s+1972(?:,\s*Schedule\s+([IVX]+)\b)?", re.I),
+     "WPA 1972", "WPA 1972 Sch. {}"),
+    (re.compile(r"Biological Diversity Act,?\s+2002()", re.I), "BDA 2002", None),
+    (re.compile(r"(?:NGT|National Green Tribunal) Act,?\s+2010(?:,?\s+Section\s+(\d+))?", re.I),
+     "NGT Act 2010", "NGT Act 2010 §{}"),
+]
+_PARAM = re.compile(
+    r"(?P<param>\bBOD\b|\bDO\b|\bpH\b|(?i:biochemical oxygen demand|dissolved oxygen"
+    r"|total suspended solids|turbidity))[^\n\d]{0,30}?"
+    r"(?:(?P<op>(?i:below|under|maximum|above|over|minimum))\s+)?"
+    r"(?P<lo>\d+(?:\.\d+)?)(?:\s*(?:to|and|-)\s*(?P<hi>\d+(?:\.\d+)?))?"
+    r"\s*(?P<unit>mg/L|NTU)?"
+)
+_PARAM_NAMES = {"biochemical oxygen demand": "BOD", "dissolved oxygen": "DO",
+                "total suspended solids": "TSS", "turbidity": "turbidity", "ph": "pH"}
+_DEADLINE = re.compile(r"(?:within|deadline:)\s*(\d+)\s+(hour|day|week|month)s?\b", re.I)
+_MONEY = re.compile(r"(?:₹|\bRs\.?\s*)\s*([\d,]+(?:\.\d+)?)\s*(crore|lakh)?", re.I)
+_YEARS = re.compile(r"(\d+)(?:\s*(?:-|to)\s*(\d+))?\s*years?\b", re.I)
+_TAGS = {v: re.compile(r"\b(?:" + "|".join(re.escape(k) for k in kws) + r")s?\b", re.I)
+         for v, kws in LEGAL_VIOLATIONS.items()}
+
+
+def _tags(text):
+    return {v for v, rx in _TAGS.items() if rx.search(text)}
+
+
+def _date(raw):
+    raw = raw.strip()
+    for fmt in ("%Y-%m-%d", "%d %B %Y", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(raw, fmt).date().isoformat()
+        except ValueError:
+            pass
+    return raw
+
+
+def _fine(line):
+    amounts = [float(n.replace(",", "")) * (_CRORE if u.lower() == "crore" else
+                                            _LAKH if u.lower() == "lakh" else 1)
+               for n, u in _MONEY.findall(line)]
+    return int(max(amounts)) if amounts else None
+
+
+def _prison(line):
+    years = [int(n) for pair in _YEARS.findall(line) for n in pair if n]
+    return max(years) if years else None
+
+
+def _threshold(m):
+    name = m["param"]
+    param = _PARAM_NAMES.get(name.lower(), name)
+    op, lo, hi = (m["op"] or "").lower(), float(m["lo"]), m["hi"]
+    if hi is not None:
+        bounds = {"min": lo, "max": float(hi)}
+    elif op in ("below", "under", "maximum"):
+        bounds = {"max": lo}
+    elif op in ("above", "over", "minimum"):
+        bounds = {"min": lo}
+    else:
+        return None
+    return dict(parameter=param, unit=m["unit"], **bounds)
+
+
+def parse_order(text, source=""):
+    """Structured clauses of one order; items carry a `violations` tag list."""
+    head = {"source": source, "order_no": None, "date": None, "subject": None}
+    for rx, fmt in _ORDER_NO:
+        m = rx.search(text)
+        if m:
+            head["order_no"] = fmt.format(m[1])
+            break
+    m = _DATE.search(text)
+    head["date"] = _date(m[1]) if m else None
+    m = _SUBJECT.search(text)
+    head["subject"] = m[1].strip() if m else None
+
+    doc_tags = _tags(text)
+    items = {"sections": [], "penalties": [], "thresholds": [], "deadlines": []}
+    seen = set()
+    for para in text.split("\n\n"):
+        para_tags = _tags(para) or doc_tags
+        for line in para.splitlines():
+            line = line.strip().lstrip("-•").strip()
+            if not line:
+                continue
+            tags = sorted(_tags(line) or para_tags)
+            for rx, bare, specific in _SECTIONS:
+                for m in rx.finditer(line):
+                    sec = specific.format(m[1]) if m[1] else bare
+                    if (sec, tuple(tags)) not in seen:
+                        seen.add((sec, tuple(tags)))
+                        items["sections"].append({"section": sec, "violations": tags})
+            fine, prison = _fine(line), _prison(line)
+            if fine is not None or prison is not None:
+                items["penalties"].append({"text": line, "fine_inr": fine,
+                                           "prison_years": prison, "violations": tags})
+            for m in _PARAM.finditer(line):
+                t = _threshold(m)
+                if t is not None:
+                    items["thresholds"].append(dict(t, text=line, violations=tags))
+            for n, unit in _DEADLINE.findall(line):
+                items["deadlines"].append({"text": line, "hours": int(n) * _HOURS[unit.lower()],
+                                           "violations": tags})
+    return dict(head, violations=sorted(doc_tags), **items)
+
+
+def _clause(order, kinds):
+    """The order restricted to items tagged with any of `kinds` (None if none apply)."""
+    kinds = set(kinds)
+    out = {k: order[k] for k in ("source", "order_no", "date", "subject")}
+    out["violations"] = [v for v in order["violations"] if v in kinds]
+    out["sections"] = [s["section"] for s in order["sections"] if kinds & set(s["violations"])]
+    out["sections"] = list(dict.fromkeys(out["sections"]))
+    for key in ("penalties", "thresholds", "deadlines"):
+        out[key] = [{k: v for k, v in item.items() if k != "violations"}
+                    for item in order[key] if kinds & set(item["violations"])]
+    if not (out["violations"] or out["sections"] or out["penalties"]):
+        return None
+    return out
+
+
+def _paragraphs(text):
+    return [p.strip() for p in text.split("\n\n") if p.strip()]
+
+
+# ── Index ──────────────────────────────────────────────────────────────────────
+
+class ClauseIndex:
+    """Parsed NGT orders keyed by violation type, re-parsed per changed file."""
+
+    def __init__(self, root=NGT_DIR, check_s=LEGAL_RELOAD_S, artifact=None):
+        self.root = Path(root)
+        self.check_s = check_s
+        self._files = {}  # file name -> ((mtime_ns, size), parsed order, paragraphs)
+        self._view = ({}, {}, [])  # (violation -> [clause], lookup memo, search docs)
+        self.version = 0
+        self.error = None
+        self.parsed = 0  # files parsed by this process (0 when the artifact was current)
+        self._checked = None
+        self._lock = threading.Lock()
+        if artifact is not None:
+            self._load(Path(artifact))
+        self.refresh(force=True)
+
+    def _load(self, path):
+        try:
+            state = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if state.get("format") != _FORMAT or state.get("root") != str(self.root):
+            return
+        self._files = {name: (tuple(f["stamp"]), f["order"], f["paragraphs"])
+                       for name, f in state["files"].items()}
+
+    def save(self, path=LEGAL_INDEX_FILE):
+        """Write the parsed orders for other processes to start from (atomic)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        files = {name: {"stamp": list(stamp), "order": order, "paragraphs": paras}
+                 for name, (stamp, order, paras) in self._files.items()}
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps({"format": _FORMAT, "root": str(self.root), "files": files},
+                                  ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+    def refresh(self, force=False):
+        """Re-parse changed orders (checked at most every `check_s`); returns self."""
+        now = time.monotonic()
+        if not force and self._checked is not None and now - self._checked < self.check_s:
+            return self
+        self._checked = now
+        with self._lock:
+            try:
+                paths = sorted(self.root.glob("*.txt"))
+            except OSError:
+                paths = []
+            files, changed, error = {}, False, None
+            for path in paths:
+                try:
+                    st = path.stat()
+                    stamp = (st.st_mtime_ns, st.st_size)
+                    old = self._files.get(path.name)
+                    if old is not None and old[0] == stamp:
+                        files[path.name] = old
+                        continue
+                    text = path.read_text(encoding="utf-8")
+                    files[path.name] = (stamp, parse_order(text, path.name), _paragraphs(text))
+                    self.parsed += 1
+                    changed = True
+                except (OSError, UnicodeDecodeError) as e:
+                    error = f"{path.name}: {type(e).__name__}: {e}"
+                    if path.name in self._files:
+                        files[path.name] = self._files[path.name]
+            changed = changed or files.keys() != self._files.keys()
+            self.error = error
+            if changed or not self.version:
+                self._files = files
+                self._install(files)
+        return self
+
+    def _install(self, files):
+        orders = [order for _, order, _ in files.values()]
+        by_kind = {}
+        for kind in LEGAL_VIOLATIONS:
+            clauses = [_clause(o, (kind,)) for o in orders]
+            by_kind[kind] = [c for c in clauses if c is not None]
+        docs = [(name, [(p, p.lower()) for p in paras]) for name, (_, _, paras) in files.items()]
+        self._view = (by_kind, {}, docs)  # one assignment: readers never see a half-built index
+        self.version += 1
+
+    def __len__(self):
+        return len(self._files)
+
+    def orders(self):
+        """Every parsed order, all items, in file name order."""
+        return [order for _, order, _ in self._files.values()]
+
+    def lookup(self, kinds):
+        """Clauses for one violation type or several (merged per order, memoized)."""
+        kinds = (kinds,) if isinstance(kinds, str) else tuple(kinds)
+        by_kind, memo, _ = self._view
+        if len(kinds) == 1:
+            return by_kind.get(kinds[0], [])
+        if kinds not in memo:
+            clauses = (_clause(o, kinds) for o in self.orders())
+            memo[kinds] = [c for c in clauses if c is not None]
+        return memo[kinds]
+
+    def sections(self, kinds):
+        """
+        Distinct statutory sections for the violation type(s), in order of first
+        citation; a bare act is dropped when a specific section of it is cited.
+        """
+        cited = list(dict.fromkeys(s for c in self.lookup(kinds) for s in c["sections"]))
+        return [s for s in cited if not any(o != s and o.startswith(s + " ") for o in cited)]
+
+    def search(self, words):
+        """
+        Keyword search: (hits, file name, best paragraph) per order with any hit,
+        most hits first.  A hit is any occurrence of a word, as a substring.
+        """
+        words = [w.lower() for w in words]
+        ranked = []
+        for name, paras in self._view[2]:
+            counts = [sum(low.count(w) for w in words) for _, low in paras]
+            if sum(counts):
+                best = next(p for (p, _), n in zip(paras, counts) if n)
+                ranked.append((sum(counts), name, best))
+        return sorted(ranked, reverse=True)
+
+
+_index = None
+
+
+def clause_index():
+    """Process-wide clause index, started from the bootstrap artifact when present."""
+    global _index
+    if _index is None:
+        _index = ClauseIndex(artifact=LEGAL_INDEX_FILE)
+    return _index.refresh()
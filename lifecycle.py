@@ -0,0 +1,191 @@
+"""
+JalJeevan Score -- Alert Lifecycle
+==================================
+Per-zone incident tracking shared by both engines.  Instead of writing a new
+alert line whenever any field of the joined row changes, each zone moves
+through a small state machine and records are emitted only on transitions
+or when the decline moves by a significant amount:
+
+  (none) --decline > open--> opened --decline > escalate--> escalated
+     ^                          |                               |
+     +---- decline < resolve ---+-------------------------------+  (resolved)
+
+The open/resolve thresholds form a hysteresis band around
+DOLPHIN_DECLINE_THRESHOLD so a zone hovering at the threshold does not flap.
+Declines are measured against DECLINE_BASELINE (the sketched 48h median by
+default), so one bad sensor reading cannot drag the baseline around.
+Every record of one incident carries the same incident_id and case_id, and
+the NGT orders / statutory sections its violations fall under (legal.py).
+
+Streaming detector verdicts (detectors.DetectorBank.anomaly) can stand in for
+either static condition, so slow-onset mining whose confidence never crosses
+MINING_CONFIDENCE_THRESHOLD, or a decline the adapting 48h average hides,
+still opens an incident.
+"""
+
+import json
+import math
+import os
+from pathlib import Path
+
+from config import (
+    ALERT_DELTA_PCT, ALERT_VIOLATIONS, DECLINE_BASELINE, DOLPHIN_DECLINE_THRESHOLD,
+    DOLPHIN_ESCALATE_THRESHOLD, DOLPHIN_RESOLVE_THRESHOLD, FORECAST_CONFIG, ZONE_CRIT_PCT,
+    ZONE_WARN_PCT,
+)
+from evidence import case_id_for
+from legal import clause_index
+
+OPENED, ESCALATED, UPDATED, RESOLVED = "opened", "escalated", "updated", "resolved"
+
+
+def decline_pct(dolphin_count, avg_48h):
+    """Percentage drop of the latest count below the window average."""
+    if not avg_48h or avg_48h <= 0 or dolphin_count is None:
+        return 0.0
+    return round((1 - dolphin_count / avg_48h) * 100, 1)
+
+
+def _is_set(value):
+    return value is not None and not (isinstance(value, float) and math.isnan(value))
+
+
+def row_decline(row, baseline=DECLINE_BASELINE):
+    """decline_pct of a stats row against its `baseline` column (avg_48h if unset)."""
+    base = row.get(baseline)
+    if not _is_set(base):
+        base = row.get("avg_48h")
+    return decline_pct(row.get("dolphin_count"), base)
+
+
+def forecast_summary(row, horizons=FORECAST_CONFIG["horizons_h"]):
+    """The forecast_* columns of a stats row as one dict (None before the zone is forecast)."""
+    def num(key):
+        value = row.get(key)
+        return float(value) if _is_set(value) else None
+
+    if num(f"forecast_{horizons[0]}h") is None:
+        return None
+    return {
+        "horizons": [{"hours": h, "count": num(f"forecast_{h}h"),
+                      "lo": num(f"forecast_{h}h_lo"), "hi": num(f"forecast_{h}h_hi")}
+                     for h in horizons],
+        "decline_pct": num("forecast_decline_pct"),
+        "cross_h": num("forecast_cross_h"),
+        "warning": bool(row.get("forecast_warning")),
+    }
+
+
+def zone_status(decline, crit_pct=ZONE_CRIT_PCT, warn_pct=ZONE_WARN_PCT):
+    """Dashboard status class for a decline: crit / warn / good."""
+    if decline > crit_pct:
+        return "crit"
+    return "warn" if decline > warn_pct else "good"
+
+
+class AlertLifecycle:
+    """Opened -> escalated -> resolved tracking with hysteresis, one incident per zone."""
+
+    def __init__(self, path=None,
+                 open_pct=DOLPHIN_DECLINE_THRESHOLD * 100,
+                 resolve_pct=DOLPHIN_RESOLVE_THRESHOLD * 100,
+                 escalate_pct=DOLPHIN_ESCALATE_THRESHOLD * 100,
+                 delta_pct=ALERT_DELTA_PCT, baseline=DECLINE_BASELINE):
+        self.path = Path(path) if path else None
+        self.open_pct = open_pct
+        self.resolve_pct = resolve_pct
+        self.escalate_pct = escalate_pct
+        self.delta_pct = delta_pct
+        self.baseline = baseline
+        self.incidents = {}
+        if self.path is not None:
+            try:
+                self.incidents = json.loads(self.path.read_text())
+            except Exception:
+                self.incidents = {}
+
+    def active(self):
+        """Current open/escalated incidents keyed by zone."""
+        return dict(self.incidents)
+
+    def update(self, row, anomaly=None):
+        """
+        Feed one joined stats row; returns the alert record to emit, or None.
+
+        `row` needs zone, dolphin_count, avg_48h, mining_detected, mining_conf
+        and observed_at (the data time of the latest dolphin observation); the
+        `baseline` column is used instead of avg_48h when present.
+        `anomaly` is the zone's streaming-detector verdict, if any.
+        """
+        import pandas as pd
+        zone = row["zone"]
+        anomaly = anomaly or {}
+        dec = row_decline(row, self.baseline)
+        observed = pd.Timestamp(row["observed_at"]).isoformat()
+        inc = self.incidents.get(zone)
+        dolphin_anomaly = bool(anomaly.get("dolphin_anomaly"))
+
+        if inc is None:
+            mining = bool(row.get("mining_detected")) or bool(anomaly.get("mining_anomaly"))
+            if not (mining and (dec > self.open_pct or dolphin_anomaly)):
+                return None
+            threshold = bool(row.get("mining_detected")) and dec > self.open_pct
+            inc = {
+                "incident_id": f"INC-{zone}-{pd.Timestamp(observed):%Y%m%dT%H%M%S}",
+                "case_id": case_id_for(zone, observed),
+                "opened_at": observed,
+                "state": ESCALATED if dec > self.escalate_pct else OPENED,
+                "decline_pct": dec,
+                "trigger": "threshold" if threshold else "detector",
+            }
+            self.incidents[zone] = inc
+            return self._record(OPENED, inc, row, dec, observed, anomaly)
+
+        if dec < self.resolve_pct and not dolphin_anomaly:
+            del self.incidents[zone]
+            inc = dict(inc, state=RESOLVED)
+            return self._record(RESOLVED, inc, row, dec, observed, anomaly)
+
+        if inc["state"] == OPENED and dec > self.escalate_pct:
+            inc["state"] = ESCALATED
+            return self._record(ESCALATED, inc, row, dec, observed, anomaly)
+
+        if abs(dec - inc["decline_pct"]) >= self.delta_pct:
+            return self._record(UPDATED, inc, row, dec, observed, anomaly)
+        return None
+
+    def _record(self, event, inc, row, dec, observed, anomaly):
+        inc["decline_pct"] = dec
+        count, avg, p50 = row.get("dolphin_count"), row.get("avg_48h"), row.get("p50_48h")
+        mining_conf = row.get("mining_conf")
+        lag, strength = row.get("causal_lag_h"), row.get("causal_strength")
+        legal = clause_index()
+        return {
+            "zone": row["zone"],
+            "incident_id": inc["incident_id"],
+            "case_id": inc["case_id"],
+            "event": event,
+            "state": inc["state"],
+            "opened_at": inc["opened_at"],
+            "observed_at": observed,
+            "dolphin_count": int(count) if _is_set(count) else None,
+            "avg_48h": float(avg) if _is_set(avg) else None,
+            "p50_48h": float(p50) if _is_set(p50) else None,
+            "decline_pct": dec,
+            "mining_conf": float(mining_conf) if _is_set(mining_conf) else None,
+            "trigger": inc.get("trigger", "threshold"),
+            "mining_score": anomaly.get("mining_score"),
+            "dolphin_score": anomaly.get("dolphin_score"),
+            "causal_lag_h": float(lag) if _is_set(lag) else None,
+            "causal_strength": float(strength) if _is_set(strength) else None,
+            "forecast": forecast_summary(row),
+            "ngt_orders": [c["order_no"] for c in legal.lookup(ALERT_VIOLATIONS)],
+            "legal_sections": legal.sections(ALERT_VIOLATIONS),
+        }
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp = Path(f"{self.path}.tmp")
+        tmp.write_text(json.dumps(self.incidents, sort_keys=True))
+        os.replace(tmp, self.path)
@@ -0,0 +1,232 @@
+"""
+JalJeevan Score -- Row Lineage and Latency
+==========================================
+Traces input rows from the moment they are appended to a sensor CSV to the
+moment the API can first serve the stats / alert rows they produced, so the
+"outputs within 2s" claim is measured per row instead of asserted.
+
+  ingested   writers stamp rows with INGEST_COLUMN (epoch seconds; simulator.py
+             does when the CSV header has the column, other writers may)
+  read       the engine picked the rows up (simulation: the tick's tail read)
+  emitted    the stats / alert row was appended to its sink
+  visible    an API process applied that row to its view (views.ZoneView)
+
+The engine side (Lineage) folds the rows read per zone into a pending entry
+and stamps the next stats row of that zone with it:
+
+  "lineage": {"trace_id": "Zone9@1772323200.125", "rows": 3,
+              "ingested": [oldest, newest] | null, "read": t, "emitted": t}
+
+Alerts carry the lineage of the stats row that triggered them.  The API side
+(LatencyTracker) turns each newly visible row into stage latencies
+
+  poll      read - oldest ingested       process   emitted - read
+  serve     visible - emitted            total     visible - oldest ingested
+                                                   (- read when unstamped)
+
+kept in fixed log-spaced histograms per sink, weighted by the input rows a
+record carries (the oldest row bounds all of them), plus sampled traces per
+zone: every trace over the SLO and one in LATENCY_CONFIG["sample_every"].
+Rows emitted before the tracker started (the sink backlog read at API start)
+are skipped.  All times are wall-clock epoch seconds on one host.
+"""
+
+import bisect
+import math
+import time
+from collections import OrderedDict, deque
+
+from config import LATENCY_CONFIG
+
+STAGES = ("poll", "process", "serve", "total")
+
+
+def _ms(seconds):
+    return round(max(seconds, 0.0) * 1000, 1)
+
+
+def _finite(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _fold(pick, a, b):
+    return b if a is None else a if b is None else pick(a, b)
+
+
+# ── Engine side ────────────────────────────────────────────────────────────────
+
+class Lineage:
+    """Input rows read per zone since that zone's last stats row was stamped."""
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.pending = {}  # zone -> [rows, oldest ingested, newest ingested, first read]
+        self.read_at = None
+
+    def read(self, zones, ingested=None, read_at=None):
+        """Record rows just read: their zones and ingest stamps (None / NaN when unstamped)."""
+        read_at = self.clock() if read_at is None else read_at
+        self.read_at = read_at
+        if len(zones) == 0:
+            return
+        import pandas as pd
+        stamps = float("nan") if ingested is None else \
+            pd.to_numeric(pd.Series(list(ingested), dtype=object), errors="coerce").to_numpy()
+        frame = pd.DataFrame({"zone": list(zones), "t": stamps})
+        for zone, n, lo, hi in frame.groupby("zone", sort=False)["t"].agg(
+                ["size", "min", "max"]).itertuples():
+            lo, hi = _finite(lo), _finite(hi)
+            entry = self.pending.get(zone)
+            if entry is None:
+                self.pending[zone] = [int(n), lo, hi, read_at]
+                continue
+            entry[0] += int(n)
+            entry[1] = _fold(min, entry[1], lo)
+            entry[2] = _fold(max, entry[2], hi)
+
+    def stamp(self, zone, emitted_at=None):
+        """The lineage of `zone`'s next output row; clears its pending rows."""
+        rows, lo, hi, read = self.pending.pop(zone, None) or (0, None, None, self.read_at)
+        ingested = [lo, hi] if lo is not None else None
+        emitted_at = self.clock() if emitted_at is None else emitted_at
+        return record(zone, rows, ingested, read, emitted_at)
+
+
+def record(zone, rows, ingested, read, emitted_at):
+    """One lineage record (times rounded to the millisecond; unknowns are None)."""
+    return {
+        "trace_id": f"{zone}@{emitted_at:.3f}",
+        "rows": rows,
+        "ingested": [round(t, 3) for t in ingested] if ingested else None,
+        "read": round(read, 3) if read is not None else None,
+        "emitted": round(emitted_at, 3),
+    }
+
+
+# ── API side ───────────────────────────────────────────────────────────────────
+
+class LatencyHistogram:
+    """Weighted counts in fixed millisecond buckets; quantiles are bucket upper bounds."""
+
+    def __init__(self, bounds_ms=LATENCY_CONFIG["buckets_ms"], slo_ms=LATENCY_CONFIG["slo_ms"]):
+        self.bounds = tuple(bounds_ms)
+        self.slo_ms = slo_ms
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket: above the largest bound
+        self.count = self.over = 0
+        self.sum_ms = self.max_ms = 0.0
+
+    def observe(self, ms, weight=1):
+        self.counts[bisect.bisect_left(self.bounds, ms)] += weight
+        self.count += weight
+        self.sum_ms += ms * weight
+        self.max_ms = max(self.max_ms, ms)
+        if ms > self.slo_ms:
+            self.over += weight
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        target, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                return self.bounds[i] if i < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self):
+        return {
+            "rows": self.count,
+            "mean_ms": round(self.sum_ms / self.count, 1) if self.count else None,
+            "p50_ms": self.quantile(0.5),
+            "p90_ms": self.quantile(0.9),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": self.max_ms,
+            "over_slo": self.over,
+            "buckets": {**{f"le_{b}": n for b, n in zip(self.bounds, self.counts)},
+                        "inf": self.counts[-1]},
+        }
+
+
+def stages(lineage, visible_at):
+    """Stage latencies (ms) of one lineage record that became visible at `visible_at`."""
+    ingested = (lineage.get("ingested") or [None])[0]
+    read, emitted = lineage.get("read"), lineage["emitted"]
+    out = {"serve": _ms(visible_at - emitted)}
+    if ingested is not None and read is not None:
+        out["poll"] = _ms(read - ingested)
+    if read is not None:
+        out["process"] = _ms(emitted - read)
+    start = next((t for t in (ingested, read, emitted) if t is not None))
+    out["total"] = _ms(visible_at - start)
+    return out
+
+
+class LatencyTracker:
+    """Stage histograms per sink and sampled per-zone traces, fed by ZoneView refreshes."""
+
+    def __init__(self, cfg=LATENCY_CONFIG, clock=time.time):
+        self.cfg = dict(cfg)
+        self.clock = clock
+        self.started = clock()
+        self.histograms = {}  # sink -> stage -> LatencyHistogram
+        self.traces = OrderedDict()  # zone -> deque of recent kept traces
+        self.seen = self.backlog = 0
+
+    def observer(self, sink):
+        """A ZoneView `visible` callback for `sink` ("stats" / "alerts")."""
+        return lambda rows: self.visible(sink, rows)
+
+    def visible(self, sink, rows, at=None):
+        at = self.clock() if at is None else at
+        hists = self.histograms.setdefault(sink, {})
+        for row in rows:
+            lineage = row.get("lineage")
+            if not isinstance(lineage, dict) or _finite(lineage.get("emitted")) is None:
+                continue
+            if lineage["emitted"] < self.started:
+                self.backlog += 1
+                continue
+            spans = stages(lineage, at)
+            weight = max(lineage.get("rows") or 0, 1)
+            for stage, ms in spans.items():
+                if stage not in hists:
+                    hists[stage] = LatencyHistogram(self.cfg["buckets_ms"], self.cfg["slo_ms"])
+                hists[stage].observe(ms, weight)
+            self.seen += 1
+            slow = spans["total"] > self.cfg["slo_ms"]
+            if slow or self.seen % self.cfg["sample_every"] == 0:
+                self._keep(row.get("zone", "?"), dict(
+                    lineage, sink=sink, visible=round(at, 3), stages_ms=spans, over_slo=slow))
+
+    def _keep(self, zone, trace):
+        kept = self.traces.pop(zone, None) or deque(maxlen=self.cfg["traces_per_zone"])
+        kept.append(trace)
+        self.traces[zone] = kept  # most recently traced last
+        while len(self.traces) > self.cfg["max_zones"]:
+            self.traces.popitem(last=False)
+
+    def snapshot(self, zone=None, limit=50):
+        """Stage histograms and the newest kept traces (of one zone when given)."""
+        kept = self.traces.get(zone, ()) if zone is not None else \
+            [t for z in self.traces.values() for t in z]
+        newest = sorted(kept, key=lambda t: t["visible"], reverse=True)[:limit]
+        return {
+            "slo_ms": self.cfg["slo_ms"],
+            "since": round(self.started, 3),
+            "records": self.seen,
+            "backlog_skipped": self.backlog,
+            "stages": {sink: {s: h[s].snapshot() for s in STAGES if s in h}
+                       for sink, h in self.histograms.items()},
+            "traces": newest,
+        }
+
+    def summary(self):
+        """Ingest-to-visible totals of the stats sink, for /api/health."""
+        total = self.histograms.get("stats", {}).get("total")
+        snap = total.snapshot() if total is not None else {}
+        return {"slo_ms": self.cfg["slo_ms"], "rows": snap.get("rows", 0),
+                "p99_ms": snap.get("p99_ms"), "over_slo": snap.get("over_slo", 0)}
@@ -5,11 +5,26 @@ Every hackathon requirement implemented and verified:
 
   Live streaming ingestion       pw.io.csv.read(..., mode="streaming", autocommit_duration_ms=2000)
   Stateful aggregations          .groupby(zone).reduce(avg, min, max, latest, count)
-  Causal chain join              dolphin_stats.join_left(mining_events, left.zone == right.zone)
+  Causal chain join              interval_join_left(stats, mining, t, [t - lag_max, t - lag_min])
+  River topology fan-out         mining.join(reach_index, zone == source) -> downstream zones
+  Streaming anomaly detectors    EWMA / CUSUM / Page-Hinkley per zone, feeding the alert stage
+  Lagged cross-correlation       mining intensity vs dolphin change, lags 0-48h (causality.py)
+  Quantile sketches              per-zone KLL p10 / p50 / p90 over the 48h window (quantiles.py)
+  Count forecasts                per-zone Holt-Winters 6-24h ahead + early warning (forecast.py)
+  Multi-resolution rollups       1m / 1h / 1d per-zone buckets, finalized to output/rollups/
   Event-driven (auto-update)     outputs update within 2s of new CSV row -- proven by simulator.py
-  Document Store live indexing   pw.io.fs.read(ngt_orders/, mode="streaming") + DocumentStore
+  Document Store live indexing   pw.io.fs.read(ngt_orders/, mode="streaming") + DocumentStore,
+                                 served to every API worker over REST (docstore.py)
   Exactly-once output            pw.io.jsonlines.write (Pathway deduplicates internally)
   Persistence                    pw.run(persistence_config=pw.persistence.Config(...))
+  Warm restart (simulation)      periodic atomic checkpoint of offsets + windows + operator state
+  Zone registry                  data/zones.json (or .csv / .geojson), hot-reloaded (zones.py)
+  Legal clause index             ngt_orders/ -> sections / penalties by violation type (legal.py)
+  On-demand profiling            SIGUSR1 stack samples, SIGUSR2 memory diffs (profiling.py)
+  Row validation                 bad CSV lines -> output/deadletter.jsonl (validation.py)
+  Input archival (simulation)    old consumed rows -> data/archive/<stream>/*.csv.gz (archive.py)
+  Row lineage                    ingest / read / emit stamps on every stats + alert row,
+                                 timed to API visibility per stage (lineage.py)
 
 Dual-engine architecture:
   Linux/WSL  -> real Pathway binary (pw.io.csv.read, pw.run, etc.)
@@ -23,64 +38,94 @@ so getattr returns the default "0.post1" which contains "post".  Real versions
 like "0.29.1" don't contain "post".
 """
 
-import os, sys, json, time, random, hashlib
+import os, sys, json, time, random, hashlib, traceback
 import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Optional
 
 from config import (
-    AUTOCOMMIT_MS, DOLPHIN_DECLINE_THRESHOLD, MINING_CONFIDENCE_THRESHOLD,
-    ZONES, DATA_DIR, OUTPUT_DIR, NGT_DIR, PERSISTENCE_DIR,
-    DOLPHIN_CSV, MINING_CSV, STATS_JSONL, ALERTS_JSONL,
+    AUTOCOMMIT_MS, CHECKPOINT_INTERVAL_S, MINING_CONFIDENCE_THRESHOLD,
+    MINING_LAG_MIN_HOURS, MINING_LAG_MAX_HOURS, DECLINE_BASELINE,
+    DATA_DIR, OUTPUT_DIR, NGT_DIR, PERSISTENCE_DIR, DOCSTORE_CONFIG, RAG_CONFIG,
+    DOLPHIN_CSV, MINING_CSV, STATS_JSONL, ALERTS_JSONL, EVIDENCE_DIR, ROLLUP_DIR, ZONES_FILE,
+    ARCHIVE_CONFIG, FORECAST_CONFIG, INGEST_COLUMN,
 )
+from archive import Archive
+from causality import LaggedXCorr
+from evidence import EvidenceStore
+from forecast import HoltWinters
+from legal import clause_index
+from detectors import DetectorBank
+from checkpoint import read_checkpoint, write_checkpoint
+from lifecycle import AlertLifecycle, row_decline, zone_status
+from lineage import Lineage, record as lineage_record
+from profiling import MEMORY, install as install_profiling
+from quantiles import WindowedQuantiles
+from rollups import RollupWriter
+from validation import Quarantine, validate
+from river import network
+from zones import registry, write_default
 
 
 # ── Detect real Pathway vs Windows stub ─────────────────────────────────────
 # The stub package (pathway==0.post1) raises AttributeError for __version__,
 # so getattr falls back to "0.post1".  Real builds return e.g. "0.29.1".
-_REAL = False
-try:
-    import pathway as pw
-    _v = getattr(pw, "__version__", "0.post1")
-    if "post" not in _v:
-        _REAL = True
-except Exception:
-    pass
+# Probed on first use rather than at import: importing pathway takes seconds,
+# and the simulation engine, simulator.py, harness.py and the tests never need it.
+_REAL = None
 
-USE_REAL = _REAL and os.environ.get("PATHWAY_REAL", "1") != "0"
+
+def use_real():
+    """True when the real Pathway engine is installed and PATHWAY_REAL != "0"."""
+    global _REAL
+    if os.environ.get("PATHWAY_REAL", "1") == "0":
+        return False
+    if _REAL is None:
+        try:
+            import pathway as pw
+            _REAL = "post" not in getattr(pw, "__version__", "0.post1")
+        except Exception:
+            _REAL = False
+    return _REAL
 
 
 # ── Bootstrap seed data ─────────────────────────────────────────────────────
 
 def bootstrap():
     """Create directories and seed CSV / NGT documents if they don't exist."""
-    for d in (DATA_DIR, OUTPUT_DIR, NGT_DIR, PERSISTENCE_DIR):
+    for d in (DATA_DIR, OUTPUT_DIR, NGT_DIR, PERSISTENCE_DIR, EVIDENCE_DIR, ROLLUP_DIR):
         os.makedirs(d, exist_ok=True)
 
+    if not os.path.exists(ZONES_FILE):
+        write_default(ZONES_FILE)
+        print(f"  Seeded {ZONES_FILE}")
+
     if not os.path.exists(DOLPHIN_CSV):
-        rows = ["timestamp,zone,dolphin_count,confidence"]
+        rows = [f"timestamp,zone,dolphin_count,confidence,{INGEST_COLUMN}"]
         base = datetime.now()
         for h in range(48, 0, -1):
             t = (base - timedelta(hours=h)).strftime("%Y-%m-%d %H:%M:%S")
-            for z in ZONES:
-                c = max(1, z["base"] + random.randint(-3, 3))
-                rows.append(f"{t},{z['id']},{c},0.{random.randint(88,97)}")
+            for z in registry():
+                c = max(1, (z.get("base") or 30) + random.randint(-3, 3))
+                rows.append(f"{t},{z['id']},{c},0.{random.randint(88,97)},")
         # Zone9 recent decline (simulates upstream mining impact)
         for h in range(6, 0, -1):
             t = (base - timedelta(hours=h)).strftime("%Y-%m-%d %H:%M:%S")
-            rows.append(f"{t},Zone9,{random.randint(14,20)},0.85")
+            rows.append(f"{t},Zone9,{random.randint(14,20)},0.85,")
         open(DOLPHIN_CSV, "w").write("\n".join(rows) + "\n")
         print(f"  Seeded {DOLPHIN_CSV} -- {len(rows)-1} rows")
 
     if not os.path.exists(MINING_CSV):
         t = (datetime.now() - timedelta(hours=8)).strftime("%Y-%m-%d %H:%M:%S")
         open(MINING_CSV, "w").write(
-            "timestamp,zone,confidence,turbidity_anomaly,night_activity\n"
-            f"{t},Zone9,0.94,2.8,0.91\n"
+            f"timestamp,zone,confidence,turbidity_anomaly,night_activity,{INGEST_COLUMN}\n"
+            f"{t},Zone9,0.94,2.8,0.91,\n"
         )
         print(f"  Seeded {MINING_CSV}")
 
     _seed_ngt()
+    clause_index().save()  # parsed once here; a (re)starting API loads instead of parsing
 
 
 def _seed_ngt():
@@ -138,12 +183,16 @@ def _seed_ngt():
 #  REAL PATHWAY ENGINE  (Linux / WSL / macOS -- requires pathway>=0.18)
 # ═════════════════════════════════════════════════════════════════════════════
 
-def run_pathway():
+def run_pathway(replay=None):
     """
     Wire up the full Pathway streaming DAG and call pw.run():
       CSV ingest -> groupby/reduce -> join -> filter alerts -> jsonlines output
     All Pathway symbols are accessed inside this function so the module can be
     imported safely on Windows where only the stub is installed.
+
+    `replay` = (dolphin frame, mining frame) with a `__time__` column replaces
+    the CSV readers with a timed replay; pw.run() then returns once it is
+    drained (used by harness.py to compare the engines).
     """
     import pathway as pw
 
@@ -153,6 +202,7 @@ def run_pathway():
         zone: str
         dolphin_count: int
         confidence: float
+        ingested_at: Optional[float] = pw.column_definition(default_value=None)
 
     class MiningSchema(pw.Schema):
         timestamp: str
@@ -160,16 +210,50 @@ def run_pathway():
         confidence: float
         turbidity_anomaly: float
         night_activity: float
+        ingested_at: Optional[float] = pw.column_definition(default_value=None)
 
     # 1. Ingest CSV streams
-    dolphins = pw.io.csv.read(
-        DOLPHIN_CSV, schema=DolphinSchema,
-        mode="streaming", autocommit_duration_ms=AUTOCOMMIT_MS,
-    )
-    mining = pw.io.csv.read(
-        MINING_CSV, schema=MiningSchema,
-        mode="streaming", autocommit_duration_ms=AUTOCOMMIT_MS,
-    )
+    if replay is None:
+        dolphins = pw.io.csv.read(
+            DOLPHIN_CSV, schema=DolphinSchema,
+            mode="streaming", autocommit_duration_ms=AUTOCOMMIT_MS,
+        )
+        mining = pw.io.csv.read(
+            MINING_CSV, schema=MiningSchema,
+            mode="streaming", autocommit_duration_ms=AUTOCOMMIT_MS,
+        )
+    else:
+        replay = [f if INGEST_COLUMN in f else f.assign(**{INGEST_COLUMN: None})
+                  for f in replay]
+        dolphins = pw.debug.table_from_pandas(replay[0], schema=DolphinSchema)
+        mining = pw.debug.table_from_pandas(replay[1], schema=MiningSchema)
+
+    # Operator state shared with the simulation engine (lifecycle, detectors,
+    # lagged cross-correlation, quantile sketches, rollups), fed from the raw
+    # tables in step 7
+    store = _PersistenceStore()
+
+    def _causal(index):
+        def lookup(zone):
+            value = float(store.xcorr.estimate([zone])[index][0])
+            return value if value == value else None
+        return lookup
+
+    def _quantile(index):
+        def lookup(zone):
+            value = float(store.quantiles.quantiles([zone])[0, index])
+            return value if value == value else None
+        return lookup
+
+    def _lineage(zone, ingested):
+        return pw.Json(lineage_record(zone, None, [ingested] * 2 if ingested else None, None,
+                                      time.time()))
+
+    def _forecast(zone, count, baseline, avg):
+        base = baseline if baseline is not None else avg
+        columns = store.forecaster.columns([zone], [count], [base])
+        return pw.Json({column: None if value[0] != value[0] else value[0].item()
+                        for column, value in columns.items()})
 
     # 2. Stateful dolphin aggregation (48-hour window)
     stats = dolphins.groupby(pw.this.zone).reduce(
@@ -179,20 +263,56 @@ def run_pathway():
         min_48h       = pw.reducers.min(pw.this.dolphin_count),
         max_48h       = pw.reducers.max(pw.this.dolphin_count),
         total_samples = pw.reducers.count(),
+        observed_at   = pw.reducers.max(pw.this.timestamp),
+        ingested_at   = pw.reducers.max(pw.coalesce(pw.this.ingested_at, 0.0)),
     )
 
-    # 3. Mining event detection (confidence > threshold)
-    mining_events = (
-        mining.filter(pw.this.confidence > MINING_CONFIDENCE_THRESHOLD)
-        .groupby(pw.this.zone)
-        .reduce(
-            zone        = pw.this.zone,
-            max_conf    = pw.reducers.max(pw.this.confidence),
-            event_count = pw.reducers.count(),
-        )
+    # 3. Mining event detection (confidence > threshold), event-time stamped
+    mining_hits = mining.filter(
+        pw.this.confidence > MINING_CONFIDENCE_THRESHOLD
+    ).select(
+        zone       = pw.this.zone,
+        confidence = pw.this.confidence,
+        t          = pw.apply_with_type(_parse_ts, pw.DateTimeNaive, pw.this.timestamp),
+    )
+
+    # 4. River fan-out: each mining event is propagated to the zones
+    #    downstream of it (precomputed reachability index), arriving after
+    #    the reach travel time.  A new event only touches those zones.
+    reach = pw.debug.table_from_pandas(network().reach_table())
+    mining_hits = mining_hits.join(
+        reach, mining_hits.zone == reach.source
+    ).select(
+        zone       = reach.target,
+        confidence = mining_hits.confidence,
+        t          = mining_hits.t + pw.apply_with_type(
+            lambda h: timedelta(hours=h), pw.Duration, reach.travel_hours,
+        ),
+    )
+
+    # 5. Causal chain: event-time interval join.  Each zone's latest dolphin
+    #    observation is matched only with mining in [t - lag_max, t - lag_min];
+    #    the cutoff lets Pathway drop state older than the lag horizon.
+    stats_t = stats.with_columns(
+        t = pw.apply_with_type(_parse_ts, pw.DateTimeNaive, pw.this.observed_at),
+    )
+    matched = pw.temporal.interval_join_left(
+        stats_t, mining_hits, stats_t.t, mining_hits.t,
+        pw.temporal.interval(
+            -timedelta(hours=MINING_LAG_MAX_HOURS), -timedelta(hours=MINING_LAG_MIN_HOURS),
+        ),
+        stats_t.zone == mining_hits.zone,
+        behavior=pw.temporal.common_behavior(cutoff=timedelta(hours=MINING_LAG_MAX_HOURS)),
+    ).select(
+        zone = pw.left.zone,
+        conf = pw.right.confidence,
+    )
+    mining_events = matched.groupby(pw.this.zone).reduce(
+        zone        = pw.this.zone,
+        max_conf    = pw.reducers.max(pw.this.conf),
+        event_count = pw.reducers.sum(pw.if_else(pw.this.conf.is_not_none(), 1, 0)),
     )
 
-    # 4. Causal chain join: dolphin stats <-> mining events
     result = stats.join_left(
         mining_events, pw.left.zone == pw.right.zone
     ).select(
@@ -202,51 +322,164 @@ def run_pathway():
         min_48h         = pw.left.min_48h,
         max_48h         = pw.left.max_48h,
         total_samples   = pw.left.total_samples,
+        observed_at     = pw.left.observed_at,
         mining_detected = pw.right.max_conf.is_not_none(),
         mining_conf     = pw.right.max_conf,
-        mining_events   = pw.right.event_count,
+        mining_events   = pw.coalesce(pw.right.event_count, 0),
+        p10_48h         = pw.apply_with_type(_quantile(0), Optional[float], pw.left.zone),
+        p50_48h         = pw.apply_with_type(_quantile(1), Optional[float], pw.left.zone),
+        p90_48h         = pw.apply_with_type(_quantile(2), Optional[float], pw.left.zone),
+        causal_lag_h    = pw.apply_with_type(_causal(0), Optional[float], pw.left.zone),
+        causal_strength = pw.apply_with_type(_causal(1), Optional[float], pw.left.zone),
+        ingested_at     = pw.left.ingested_at,
     )
-
-    # 5. Alert generation (mining detected zones)
-    alerts = result.filter(
-        pw.this.mining_detected == True
-    ).select(
-        zone          = pw.this.zone,
-        dolphin_count = pw.this.dolphin_count,
-        avg_48h       = pw.this.avg_48h,
-        mining_conf   = pw.this.mining_conf,
-        decline_pct   = pw.apply(
-            lambda c, a: round((1 - c / a) * 100, 1) if a > 0 else 0.0,
-            pw.this.dolphin_count, pw.this.avg_48h,
-        ),
-        case_id = pw.apply(
-            lambda z: f"NGT-{datetime.now().strftime('%Y%m%d')}-{z}",
-            pw.this.zone,
+    # Decline and status on every row, so the API's status / decline indexes
+    # are maintained from the sink instead of recomputed per request
+    result = result.with_columns(
+        decline_pct = pw.apply_with_type(
+            lambda c, b, a: row_decline({"dolphin_count": c, DECLINE_BASELINE: b, "avg_48h": a}),
+            float, pw.this.dolphin_count, pw.this[DECLINE_BASELINE], pw.this.avg_48h,
         ),
     )
-
-    # 6. Exactly-once output to JSONL
+    result = result.with_columns(
+        status = pw.apply_with_type(zone_status, str, pw.this.decline_pct),
+    )
+    # Short-horizon forecasts and the early warning, from the Holt-Winters state:
+    # one forecaster call per row, unpacked into the stats columns
+    forecast_columns = [f"forecast_{h}h{band}" for h in FORECAST_CONFIG["horizons_h"]
+                        for band in ("", "_lo", "_hi")]
+    forecast_columns += ["forecast_decline_pct", "forecast_cross_h"]
+    result = result.with_columns(
+        forecast = pw.apply_with_type(_forecast, pw.Json, pw.this.zone, pw.this.dolphin_count,
+                                      pw.this[DECLINE_BASELINE], pw.this.avg_48h),
+    )
+    result = result.with_columns(
+        **{column: pw.this.forecast[column].as_float() for column in forecast_columns},
+        forecast_warning = pw.this.forecast["forecast_warning"].as_bool(),
+    ).without(pw.this.forecast)
+    # Lineage (lineage.py): the newest input row's ingest stamp.  The connector
+    # does not expose its read time, so Pathway rows trace ingest -> emit -> visible
+    result = result.with_columns(
+        lineage = pw.apply_with_type(_lineage, pw.Json, pw.this.zone, pw.this.ingested_at),
+    ).without(pw.this.ingested_at)
+
+    # 6. Exactly-once stats output to JSONL
     # Note: Try jsonlines first (official), fall back to json if not available
     try:
         pw.io.jsonlines.write(result, STATS_JSONL)
-        pw.io.jsonlines.write(alerts, ALERTS_JSONL)
     except (AttributeError, TypeError):
         # Fallback for versions without jsonlines support
         pw.io.json.write(result, STATS_JSONL)
-        pw.io.json.write(alerts, ALERTS_JSONL)
 
-    # 7. Optional: DocumentStore for live NGT order indexing
+    # 7. Alert lifecycle (opened -> escalated -> resolved), the same state
+    #    machine the simulation engine uses; records only on transitions.
+    #    Streaming detectors see every raw row (O(1) each) and feed it too,
+    #    as does the cross-correlation (mining fanned out downstream).
+    #    Raw rows are buffered and folded into the windows and rollups once
+    #    per engine tick.
+    lifecycle = store.lifecycle
+    tick_rows = {"dolphins": [], "mining": []}
+
+    def _on_dolphin(key, row, time, is_addition):
+        if is_addition:
+            store.detectors.observe_dolphin(row["zone"], row["dolphin_count"])
+            t = _parse_ts(row["timestamp"])
+            store.xcorr.observe_dolphin(row["zone"], t, row["dolphin_count"])
+            store.quantiles.observe([row["zone"]], [t], [row["dolphin_count"]])
+            store.forecaster.observe([row["zone"]], [t], [row["dolphin_count"]])
+            tick_rows["dolphins"].append((t, row["zone"], row["dolphin_count"],
+                                          row["confidence"]))
+
+    def _on_mining(key, row, time, is_addition):
+        if is_addition:
+            store.detectors.observe_mining(
+                row["zone"], row["turbidity_anomaly"], row["night_activity"],
+            )
+            t = _parse_ts(row["timestamp"])
+            tick_rows["mining"].append((t, row["zone"], row["confidence"],
+                                        row["turbidity_anomaly"], row["night_activity"]))
+            reach = network().downstream_of(row["zone"])
+            store.xcorr.observe(mining={
+                "zone":       [z for z, _, _ in reach],
+                "timestamp":  [t + timedelta(hours=h) for _, _, h in reach],
+                "event_time": [t] * len(reach),
+                "confidence": [row["confidence"]] * len(reach),
+            })
+
+    def _fold_tick(_time):
+        """The tick's rows: one window extend, one rollup observe and open.json snapshot."""
+        if not tick_rows["dolphins"] and not tick_rows["mining"]:
+            return
+        d = pd.DataFrame(tick_rows["dolphins"],
+                         columns=["timestamp", "zone", "dolphin_count", "confidence"])
+        m = pd.DataFrame(tick_rows["mining"], columns=["timestamp", "zone", "confidence",
+                                                       "turbidity_anomaly", "night_activity"])
+        tick_rows["dolphins"], tick_rows["mining"] = [], []
+        for frame in (d, m):
+            frame["timestamp"] = pd.to_datetime(frame["timestamp"])
+        store.extend_windows(d, m)
+        store.rollups.observe(dolphins=d, mining=m[m["confidence"] > MINING_CONFIDENCE_THRESHOLD])
+        store.rollups.write_open()
+
+    pw.io.subscribe(dolphins, on_change=_on_dolphin, on_time_end=_fold_tick)
+    pw.io.subscribe(mining, on_change=_on_mining, on_time_end=_fold_tick)
+
+    # 8. Evidence packages, built once per alert state change (not per API request)
+    #    at the end of its tick, from the same 48h / lag windows the simulation
+    #    engine keeps
+    evidence = EvidenceStore()
+    transitions = []
+
+    def _on_result(key, row, time, is_addition):
+        if not is_addition:
+            return
+        record = lifecycle.update(row, store.detectors.anomaly(row["zone"]))
+        store.maybe_checkpoint()
+        if record is None:
+            return
+        record["lineage"] = getattr(row["lineage"], "value", row["lineage"])
+        _append_jsonl(ALERTS_JSONL, record)
+        transitions.append(record)
+
+    def _on_result_time_end(time):
+        _fold_tick(time)
+        if transitions and store.dolphins is not None:
+            mining = store.mining[store.mining["confidence"] > MINING_CONFIDENCE_THRESHOLD]
+            for record in transitions:
+                try:
+                    evidence.record(record, store.dolphins, mining)
+                except Exception:  # one bad package must not stop the engine
+                    print(f"  Evidence: {record.get('case_id')} not recorded")
+                    traceback.print_exc()
+            transitions.clear()
+        MEMORY.tick("pipeline")
+
+    pw.io.subscribe(result, on_change=_on_result, on_time_end=_on_result_time_end)
+
+    if replay is not None:
+        pw.run()
+        return
+
+    # 9. DocumentStore over the NGT orders, served to app.py (docstore.py).  The
+    #    server's REST connectors join this graph, so the pw.run() below serves them
     try:
-        from pathway.xpacks.llm import DocumentStore
+        from pathway.stdlib.indexing import TantivyBM25Factory
+        from pathway.xpacks.llm.document_store import DocumentStore
+        from pathway.xpacks.llm.servers import DocumentStoreServer
         from pathway.xpacks.llm.splitters import TokenCountSplitter
-        ngt_docs = pw.io.fs.read(NGT_DIR, mode="streaming", format="plaintext")
-        splitter = TokenCountSplitter(min_tokens=50, max_tokens=500)
-        DocumentStore(ngt_docs, splitter=splitter)
-        print(f"  DocumentStore: indexing {NGT_DIR}/ (live)")
     except ImportError:
-        print("  DocumentStore: xpacks not available -- app.py uses BM25 fallback")
-
-    # 8. Run the pipeline with persistence
+        print("  DocumentStore: xpacks not available -- app.py answers from its clause index")
+    else:
+        ngt_docs = pw.io.fs.read(NGT_DIR, mode="streaming", format="binary", with_metadata=True)
+        splitter = TokenCountSplitter(min_tokens=50, max_tokens=RAG_CONFIG["chunk_size"])
+        doc_store = DocumentStore(ngt_docs, retriever_factory=TantivyBM25Factory(),
+                                  splitter=splitter)
+        DocumentStoreServer(DOCSTORE_CONFIG["host"], DOCSTORE_CONFIG["port"], doc_store)
+        print(f"  DocumentStore: indexing {NGT_DIR}/ (live), serving "
+              f"http://{DOCSTORE_CONFIG['host']}:{DOCSTORE_CONFIG['port']}/v1/retrieve")
+
+    # 10. Run the pipeline with persistence
+    install_profiling("pipeline")
     print("\n  Pipeline configured.  Running with REAL Pathway engine...\n")
     pw.run(
         persistence_config=pw.persistence.Config(
@@ -264,33 +497,267 @@ def _row_hash(row):
     return hashlib.sha256(json.dumps(row, sort_keys=True, default=str).encode()).hexdigest()[:16]
 
 
-class _PersistenceStore:
-    """Simple file-backed set for exactly-once output (mirrors Pathway's persistence)."""
-    def __init__(self):
-        self.path = Path(PERSISTENCE_DIR) / "state.json"
-        try:
-            self.seen = set(json.loads(self.path.read_text()))
-        except Exception:
-            self.seen = set()
+def _upstream_zones(zone):
+    return [z for z, _, _ in network().upstream_of(zone)]
+
+
+def _feed_operators(store, d, m):
+    """
+    Push the CSV rows read this tick (`d`, `m` are only the new tail) through
+    the streaming operators: detectors, quantile sketches, forecasts, rollups
+    and the lagged cross-correlation (mining fanned out downstream first).
+    """
+    bank = store.detectors
+    for zone, count in zip(d["zone"], d["dolphin_count"]):
+        bank.observe_dolphin(zone, count)
+    store.quantiles.observe(d["zone"].tolist(), d["timestamp"], d["dolphin_count"].tolist())
+    store.forecaster.observe(d["zone"].tolist(), d["timestamp"], d["dolphin_count"].tolist())
+    for zone, turb, night in zip(m["zone"], m["turbidity_anomaly"], m["night_activity"]):
+        bank.observe_mining(zone, turb, night)
+    store.rollups.observe(d, m[m["confidence"] > MINING_CONFIDENCE_THRESHOLD])
+    store.xcorr.observe(d, network().fanout(m))
 
-    def is_new(self, h):
-        return h not in self.seen
 
-    def add(self, h):
-        self.seen.add(h)
+def _append_jsonl(path, row):
+    with open(path, "a") as f:
+        f.write(json.dumps(row, default=str, allow_nan=False) + "\n")
+
+
+def _json_nulls(frame):
+    """
+    Float columns with gaps (quantiles, causal lag, forecasts while a zone
+    warms up) as object columns holding None: bare NaN is not valid JSON.
+    """
+    gaps = [c for c in frame.select_dtypes("float").columns if frame[c].isna().any()]
+    out = frame.astype({c: object for c in gaps})
+    for c in gaps:
+        out[c] = out[c].where(frame[c].notna(), None)
+    return out
+
+
+class _PersistenceStore:
+    """
+    All engine state, checkpointed periodically as one atomic binary file
+    (mirrors Pathway's persistence):
+
+      offsets        bytes of each CSV consumed, so a restart reads only the tail
+                     (logical: bytes since archived into data/archive count too)
+      windows        dolphin / mining rows still inside the 48h + lag horizon
+      emitted        last row hash written per (sink, zone), for exactly-once output
+      sinks          output file sizes at the checkpoint; longer files are rolled
+                     back on restart because their tail is about to be replayed
+      operators      alert lifecycle, detectors, quantiles, forecaster, rollups, xcorr
+      quarantine     accepted / rejected row counters (rejected lines are in
+                     the dead-letter sink, rolled back like the other sinks)
+
+    Row lineage (rows read per zone but not yet in a stats row) is not
+    checkpointed: rows replayed after a restart are traced from their new read.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path or Path(PERSISTENCE_DIR) / "checkpoint.bin")
+        self.offsets, self.emitted, self.sinks = {}, {}, {}
+        self.dolphins = self.mining = None
+        self.lifecycle = AlertLifecycle()
+        self.detectors = DetectorBank(upstream=_upstream_zones)
+        self.quantiles = WindowedQuantiles()
+        self.forecaster = HoltWinters()
+        self.rollups = RollupWriter()
+        self.xcorr = LaggedXCorr()
+        self.quarantine = Quarantine()
+        self.archive = Archive()
+        self.lineage = Lineage()
+        self.rows_read = 0
+        self.checkpointed_at = time.monotonic()
+
+        state = read_checkpoint(self.path)
+        self.restored = state is not None
+        if state is None:
+            return
+        self.offsets, self.emitted, self.sinks = state["offsets"], state["emitted"], state["sinks"]
+        self.dolphins, self.mining = state["dolphins"], state["mining"]
+        self.lifecycle.incidents = state["lifecycle"]
+        self.detectors.load(state["detectors"])
+        self.quantiles.load(state["quantiles"])
+        self.forecaster.load(state.get("forecaster"))
+        self.rollups.load(state["rollups"])
+        self.xcorr.load(state["xcorr"])
+        self.quarantine.load(state.get("quarantine"))
+
+    # ── input ────────────────────────────────────────────────────────────
+
+    def read_tail(self, path, name):
+        """
+        Complete CSV lines appended since the last call, validated: the valid
+        rows as a typed frame; invalid ones go to the dead-letter sink.
+        `name` is the stream ("dolphins" / "mining") whose window it feeds.
+        """
+        size = os.path.getsize(path)
+        base = self.archive.base(name, path)  # bytes compacted out of the front of the file
+        offset = self.offsets.get(name, 0) - base
+        if not 0 <= offset <= size:  # file truncated or replaced: start over
+            offset = 0
+            setattr(self, name, None)
+        with open(path, "rb") as f:
+            header = f.readline()
+            start = max(offset, len(header))
+            f.seek(start)
+            chunk = f.read(size - start)
+        end = chunk.rfind(b"\n") + 1  # a half-written last line waits for the next tick
+        self.offsets[name] = base + start + end
+        frame, rejected = validate(header + chunk[:end], name)
+        self.quarantine.record(name, len(frame), rejected)
+        self.rows_read += len(frame) + len(rejected)
+        self.lineage.read(frame["zone"], frame.get(INGEST_COLUMN))
+        return frame.drop(columns=INGEST_COLUMN, errors="ignore")
+
+    def extend_windows(self, d, m):
+        """Append the new rows and drop those past the 48h / lag horizon."""
+        for name, new in (("dolphins", d), ("mining", m)):
+            old = getattr(self, name)
+            if old is None or old.empty:
+                setattr(self, name, new.reset_index(drop=True))
+            elif len(new):
+                setattr(self, name, pd.concat([old, new], ignore_index=True))
+        latest = self.latest()
+        if latest is not None:
+            for name, horizon in self.horizons().items():
+                frame = getattr(self, name)
+                setattr(self, name, frame[frame["timestamp"] >= latest - horizon])
+        return self.dolphins, self.mining
+
+    def latest(self):
+        """Newest event time in the windows (None before any row)."""
+        return max(
+            (f["timestamp"].max() for f in (self.dolphins, self.mining)
+             if f is not None and len(f)),
+            default=None,
+        )
 
-    def save(self):
-        self.path.write_text(json.dumps(list(self.seen)))
+    @staticmethod
+    def horizons():
+        """How far behind the newest event each window keeps rows."""
+        dolphins = pd.Timedelta(hours=48)
+        lag = pd.Timedelta(hours=MINING_LAG_MAX_HOURS + network().max_travel_hours)
+        return {"dolphins": dolphins, "mining": dolphins + lag}
+
+    def archive_inputs(self, paths):
+        """
+        Compact consumed CSV rows older than their window horizon plus slack
+        into data/archive (archive.py); returns the bytes moved.
+        """
+        latest = self.latest()
+        self.archive.compacted_at = time.monotonic()
+        if latest is None:
+            return 0
+        slack = pd.Timedelta(hours=ARCHIVE_CONFIG["slack_hours"])
+        return sum(self.archive.compact(name, path, self.offsets.get(name, 0),
+                                        latest - self.horizons()[name] - slack)
+                   for name, path in paths.items())
+
+    # ── output ───────────────────────────────────────────────────────────
+
+    def _sink_paths(self):
+        return ([Path(STATS_JSONL), Path(ALERTS_JSONL), self.quarantine.path]
+                + sorted(self.rollups.root.glob("*.jsonl")))
+
+    def emit(self, path, zone, row):
+        """Append `row` unless it repeats the last row written for this zone (lineage aside)."""
+        lineage = row.pop("lineage", None)
+        h = _row_hash(row)
+        if lineage is not None:
+            row["lineage"] = lineage
+        key = (str(path), zone)
+        if self.emitted.get(key) == h:
+            return False
+        _append_jsonl(path, row)
+        self.emitted[key] = h
+        return True
+
+    def rollback_sinks(self):
+        """Cut outputs back to their checkpointed size before the tail is replayed."""
+        for path, size in self.sinks.items():
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+
+    # ── checkpoint ───────────────────────────────────────────────────────
+
+    def checkpoint(self):
+        """Write all state atomically; returns the checkpoint size in bytes."""
+        self.sinks = {str(p): p.stat().st_size if p.exists() else 0 for p in self._sink_paths()}
+        size = write_checkpoint(self.path, {
+            "offsets": self.offsets,
+            "emitted": self.emitted,
+            "sinks": self.sinks,
+            "dolphins": self.dolphins,
+            "mining": self.mining,
+            "lifecycle": self.lifecycle.incidents,
+            "detectors": self.detectors.to_dict(),
+            "quantiles": self.quantiles.to_dict(),
+            "forecaster": self.forecaster.to_dict(),
+            "rollups": self.rollups.to_dict(),
+            "xcorr": self.xcorr.to_dict(),
+            "quarantine": self.quarantine.to_dict(),
+        })
+        self.checkpointed_at = time.monotonic()
+        return size
+
+    def maybe_checkpoint(self, interval=CHECKPOINT_INTERVAL_S):
+        """Checkpoint when the last one is older than `interval` seconds."""
+        if time.monotonic() - self.checkpointed_at >= interval:
+            self.checkpoint()
+
+
+def _parse_ts(value):
+    """Event time of a CSV timestamp (ISO, with or without microseconds)."""
+    return datetime.fromisoformat(str(value))
+
+
+def _interval_join(stats, mining):
+    """
+    Match each zone's latest observation t with mining events in
+    [t - lag_max, t - lag_min], after fanning each event out to the zones
+    downstream of it (timestamps shifted by river travel time).  Events older
+    than the earliest lower bound are dropped first, so the join never carries
+    more than the lag horizon.
+    """
+    lag_max = pd.Timedelta(hours=MINING_LAG_MAX_HOURS)
+    lag_min = pd.Timedelta(hours=MINING_LAG_MIN_HOURS)
+    river = network()
+    if not stats.empty:
+        horizon = stats["observed_at"].min() - lag_max
+        mining = mining[mining["timestamp"] >= horizon - pd.Timedelta(hours=river.max_travel_hours)]
+        mining = river.fanout(mining)
+        mining = mining[mining["timestamp"] >= horizon]
+    pairs = stats[["zone", "observed_at"]].merge(
+        mining[["zone", "timestamp", "confidence"]], on="zone",
+    )
+    pairs = pairs[
+        (pairs["timestamp"] >= pairs["observed_at"] - lag_max)
+        & (pairs["timestamp"] <= pairs["observed_at"] - lag_min)
+    ]
+    me = pairs.groupby("zone", as_index=False).agg(
+        mining_conf=("confidence", "max"),
+        mining_events=("confidence", "count"),
+    )
+    result = stats.merge(me, on="zone", how="left")
+    result["mining_events"] = result["mining_events"].fillna(0).astype(int)
+    return result
 
 
-def _tick(store):
-    """One simulation tick: read CSVs, aggregate, join, write output."""
+def _tick(store, evidence=None):
+    """One simulation tick: read the CSV tails, aggregate, join, write output."""
     try:
-        d = pd.read_csv(DOLPHIN_CSV, parse_dates=["timestamp"])
-        m = pd.read_csv(MINING_CSV, parse_dates=["timestamp"])
-    except Exception:
+        new_d = store.read_tail(DOLPHIN_CSV, "dolphins")
+        new_m = store.read_tail(MINING_CSV, "mining")
+    except OSError:  # a CSV is missing: nothing to read this tick
         return None
 
+    # Streaming operators (mirrors the pw.io.subscribe feeds on the raw tables)
+    _feed_operators(store, new_d, new_m)
+    d, m = store.extend_windows(new_d, new_m)
+
     # 48-hour window (same as Pathway groupby)
     cutoff = pd.Timestamp.now() - pd.Timedelta(hours=48)
     w = d[d["timestamp"] >= cutoff]
@@ -304,76 +771,88 @@ def _tick(store):
         min_48h=("dolphin_count", "min"),
         max_48h=("dolphin_count", "max"),
         total_samples=("dolphin_count", "count"),
+        observed_at=("timestamp", "max"),
     )
 
-    # Mining event detection (mirrors pw.filter + groupby)
+    # Mining event detection + event-time interval join (mirrors pw.temporal.interval_join_left)
     mining = m[m["confidence"] > MINING_CONFIDENCE_THRESHOLD]
-    if not mining.empty:
-        me = mining.groupby("zone", as_index=False).agg(
-            mining_conf=("confidence", "max"),
-            mining_events=("confidence", "count"),
-        )
-        result = stats.merge(me, on="zone", how="left")
-    else:
-        result = stats.copy()
-        result["mining_conf"] = None
-        result["mining_events"] = 0
+    result = _interval_join(stats, mining)
 
     result["mining_detected"] = result["mining_conf"].notna()
+    q = store.quantiles.quantiles(result["zone"].tolist())
+    result["p10_48h"], result["p50_48h"], result["p90_48h"] = q[:, 0], q[:, 1], q[:, 2]
+    result["causal_lag_h"], result["causal_strength"] = store.xcorr.estimate(
+        result["zone"].tolist()
+    )
     result["avg_48h"] = result["avg_48h"].round(2)
+    baseline = result[DECLINE_BASELINE] if DECLINE_BASELINE in result else result["avg_48h"]
+    result = result.assign(**store.forecaster.columns(
+        result["zone"].tolist(), result["dolphin_count"], baseline.fillna(result["avg_48h"]),
+    ))
 
-    rows = result.to_dict("records")
-
-    # Alert generation (mirrors Pathway filter on mining_detected)
-    alerts = []
+    rows = _json_nulls(result).to_dict("records")
     for r in rows:
-        if r.get("mining_detected") and r["avg_48h"] and r["avg_48h"] > 0:
-            dec = round((1 - r["dolphin_count"] / r["avg_48h"]) * 100, 1)
-            if dec > DOLPHIN_DECLINE_THRESHOLD * 100:
-                a = dict(r)
-                a["decline_pct"] = dec
-                a["case_id"] = f"NGT-{datetime.now().strftime('%Y%m%d')}-{r['zone']}"
-                alerts.append(a)
-
-    # Exactly-once JSONL output (mirrors Pathway deduplication)
+        r["decline_pct"] = row_decline(r)
+        r["status"] = zone_status(r["decline_pct"])
+
+    # Alert lifecycle (same state machine as the Pathway subscriber)
+    alerts = [(r, store.lifecycle.update(r, store.detectors.anomaly(r["zone"]))) for r in rows]
+    alerts = [(r, a) for r, a in alerts if a is not None]
+
+    # Exactly-once JSONL output (mirrors Pathway deduplication), each row
+    # stamped with the lineage of the input rows it is the first to reflect
+    emitted_at = time.time()
     for r in rows:
-        h = _row_hash(r)
-        if store.is_new(h):
-            with open(STATS_JSONL, "a") as f:
-                f.write(json.dumps(r, default=str) + "\n")
-            store.add(h)
-
-    for a in alerts:
-        h = _row_hash(a)
-        if store.is_new(h):
-            with open(ALERTS_JSONL, "a") as f:
-                f.write(json.dumps(a, default=str) + "\n")
-            store.add(h)
+        r["lineage"] = store.lineage.stamp(r["zone"], emitted_at)
+        store.emit(STATS_JSONL, r["zone"], r)
 
-    # Snapshot for dashboard API (JSON array format)
-    with open("output/stats.json", "w") as f:
-        json.dump(rows, f, default=str)
-    with open("output/alerts.json", "w") as f:
-        json.dump(alerts, f, default=str)
+    for r, a in alerts:
+        a["lineage"] = r["lineage"]
+        if store.emit(ALERTS_JSONL, a["zone"], a) and evidence is not None:
+            evidence.record(a, d, mining)
 
-    store.save()
+    # Snapshot for dashboard API (JSON array format)
+    with open(Path(OUTPUT_DIR) / "stats.json", "w") as f:
+        json.dump(rows, f, default=str, allow_nan=False)
+    with open(Path(OUTPUT_DIR) / "alerts.json", "w") as f:
+        active = store.lifecycle.active()
+        json.dump([dict(inc, zone=z) for z, inc in sorted(active.items())], f, default=str,
+                  allow_nan=False)
+    store.quarantine.write_snapshot()
+    store.rollups.write_open()
+
+    store.maybe_checkpoint()
+    if store.archive.due():
+        store.archive_inputs({"dolphins": DOLPHIN_CSV, "mining": MINING_CSV})
+    MEMORY.tick("pipeline")
     return rows
 
 
 def run_simulation():
     """Poll CSVs every 2 seconds, identical to Pathway's autocommit loop."""
+    started = time.perf_counter()
     store = _PersistenceStore()
+    store.rollback_sinks()
+    evidence = EvidenceStore()
+    install_profiling("pipeline")
     tick = 0
-    while True:
-        tick += 1
-        data = _tick(store)
-        if data and tick % 15 == 0:
-            try:
-                sm = ", ".join(f"{x['zone']}:{x['dolphin_count']}" for x in data)
-                print(f"  [{datetime.now():%H:%M:%S}] {sm}")
-            except Exception:
-                pass
-        time.sleep(AUTOCOMMIT_MS / 1000)
+    try:
+        while True:
+            tick += 1
+            data = _tick(store, evidence)
+            if tick == 1:
+                print(f"  {'Warm' if store.restored else 'Cold'} start: first output in "
+                      f"{(time.perf_counter() - started) * 1000:.0f} ms "
+                      f"({store.rows_read} rows replayed)")
+            if data and tick % 15 == 0:
+                try:
+                    sm = ", ".join(f"{x['zone']}:{x['dolphin_count']}" for x in data)
+                    print(f"  [{datetime.now():%H:%M:%S}] {sm}")
+                except Exception:
+                    pass
+            time.sleep(AUTOCOMMIT_MS / 1000)
+    finally:
+        store.checkpoint()
 
 
 # ═════════════════════════════════════════════════════════════════════════════
@@ -388,7 +867,8 @@ if __name__ == "__main__":
 
     bootstrap()
 
-    if USE_REAL:
+    real = use_real()
+    if real:
         print("  Engine:     REAL Pathway (Linux/WSL)")
     else:
         print("  ⚠️  Engine:     Python fallback (Windows)")
@@ -404,7 +884,7 @@ if __name__ == "__main__":
     print("=" * 55)
     print()
 
-    if USE_REAL:
+    if real:
         run_pathway()
     else:
         run_simulation()
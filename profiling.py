@@ -0,0 +1,199 @@
+"""
+JalJeevan Score -- Runtime Profiling
+====================================
+Profiling a running pipeline or API without restarting it under a profiler:
+
+  sampler     SIGUSR1 (or POST /api/admin/profile) starts a thread that
+              samples every other thread's stack each `interval_ms` for
+              `duration_s`, then writes PROFILE_DIR/<name>-<time>.collapsed
+              in the folded format flamegraph.pl and speedscope read
+              ("thread;outer (file:line);...;inner (file:line) count")
+  memory      SIGUSR2 (or POST /api/admin/memory) toggles tracemalloc; while
+              on, every tick() diffs a snapshot against the previous one and
+              appends the top growth lines to PROFILE_DIR/memory-<name>.log,
+              so state that grows without bound shows up as the same line
+              growing tick after tick
+
+Nothing runs while both are off: no sampler thread, no tracemalloc, no
+profile hook, and tick() is one attribute test.  Only Python frames are
+visible, so under the real Pathway engine the sampler sees the subscriber
+callbacks, not the Rust dataflow.
+"""
+
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from config import PROFILE_CONFIG, PROFILE_DIR
+
+
+def _atomic_write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+# ── Stack sampler ──────────────────────────────────────────────────────────────
+
+class SamplingProfiler:
+    """Samples all other threads' stacks on a timer thread for a bounded time."""
+
+    def __init__(self, name="pipeline", root=PROFILE_DIR, cfg=PROFILE_CONFIG):
+        self.name = name
+        self.root = Path(root)
+        self.cfg = cfg
+        self.interval_s = cfg["interval_ms"] / 1000
+        self.samples = 0
+        self.last_path = None
+        self.until = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds=None):
+        """Profile for `seconds` (clamped); False if a profile is already running."""
+        seconds = min(float(seconds or self.cfg["duration_s"]), self.cfg["max_duration_s"])
+        with self._lock:
+            if self.running:
+                return False
+            self._stop.clear()
+            self.until = time.time() + seconds
+            self._thread = threading.Thread(target=self._run, args=(seconds,),
+                                            name="jaljeevan-profiler", daemon=True)
+            self._thread.start()
+        return True
+
+    def stop(self):
+        """End the running profile early; returns the written file (or None)."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+        return self.last_path
+
+    def _run(self, seconds):
+        me = threading.get_ident()
+        names = {}
+        counts = Counter()
+        self.samples = 0
+        deadline = time.monotonic() + seconds
+        while not self._stop.wait(self.interval_s):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                if ident not in names:
+                    names.update((t.ident, t.name) for t in threading.enumerate())
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}"
+                                 f":{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+            if time.monotonic() >= deadline:
+                break
+        path = self.root / f"{self.name}-{datetime.now():%Y%m%dT%H%M%S}.collapsed"
+        _atomic_write(path, "".join(f"{s} {n}\n" for s, n in counts.most_common()))
+        self.last_path = path
+        self.until = None
+
+
+# ── Memory growth ──────────────────────────────────────────────────────────────
+
+class MemoryTracer:
+    """tracemalloc snapshots diffed between ticks, only while switched on."""
+
+    def __init__(self, name="pipeline", root=PROFILE_DIR, cfg=PROFILE_CONFIG):
+        self.name = name
+        self.root = Path(root)
+        self.cfg = cfg
+        self.active = False
+        self.ticks = 0
+        self._previous = None
+        self._owns_tracing = False
+
+    def enable(self):
+        if self.active:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.cfg["memory_frames"])
+            self._owns_tracing = True
+        self._previous = self._snapshot()
+        self.ticks = 0
+        self.active = True
+
+    def disable(self):
+        self.active = False
+        self._previous = None
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def toggle(self):
+        self.disable() if self.active else self.enable()
+        return self.active
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+    def diff(self, top=None):
+        """Largest growth since the previous call, as dicts (largest first)."""
+        current = self._snapshot()
+        stats = current.compare_to(self._previous, "lineno")
+        self._previous = current
+        self.ticks += 1
+        out = []
+        for s in stats[:top or self.cfg["memory_top"]]:
+            frame = s.traceback[0]
+            out.append({"where": f"{frame.filename}:{frame.lineno}",
+                        "size_kb": round(s.size / 1024, 1),
+                        "size_diff_kb": round(s.size_diff / 1024, 1),
+                        "count_diff": s.count_diff})
+        return out
+
+    def tick(self, label=""):
+        """Per-tick hook: free when off; when on, diff and append to the log."""
+        if not self.active:
+            return None
+        growth = self.diff()
+        lines = [f"# {datetime.now():%Y-%m-%d %H:%M:%S} tick {self.ticks} {label}".rstrip()]
+        lines += [f"{g['size_diff_kb']:+10.1f} KiB {g['count_diff']:+8d} {g['where']}"
+                  for g in growth]
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / f"memory-{self.name}.log", "a") as f:
+            f.write("\n".join(lines) + "\n")
+        return growth
+
+
+SAMPLER = SamplingProfiler()
+MEMORY = MemoryTracer()
+
+
+def install(name):
+    """
+    Name the process's profiles and hook SIGUSR1 (profile) / SIGUSR2 (memory
+    diffs).  Returns False where that is impossible: platforms without the
+    signals, or when not called from the main thread.
+    """
+    SAMPLER.name = MEMORY.name = name
+    if not hasattr(signal, "SIGUSR1") or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(signal.SIGUSR1, lambda *_: SAMPLER.start())
+    signal.signal(signal.SIGUSR2, lambda *_: MEMORY.toggle())
+    return True
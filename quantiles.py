@@ -0,0 +1,175 @@
+"""
+JalJeevan Score -- Quantile Sketches
+====================================
+min/max over the 48h window are one bad sensor reading away from garbage,
+and exact percentiles would need every raw sample.  Each zone instead keeps
+KLL sketches (Karnin, Lang & Liberty 2016):
+
+  KLLSketch          O(k) floats whatever the sample rate, rank error ~1/k,
+                     mergeable -- two sketches combine into one of the union
+  WindowedQuantiles  one sketch per zone per time bucket; the 48h window is
+                     the merge of the buckets it covers, and buckets that fall
+                     out of it are dropped whole
+
+Compaction alternates its keep-odd/keep-even choice instead of flipping a
+coin, so the same input always produces the same sketch (and the same stats
+rows after a restart).  Sketch state is a plain list, so shards can ship it
+to each other and merge.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from config import QUANTILE_CONFIG
+from zones import registry
+
+_DECAY = 2 / 3
+
+
+class KLLSketch:
+    """Mergeable streaming quantile sketch with O(k) memory."""
+
+    __slots__ = ("k", "n", "flip", "levels")
+
+    def __init__(self, k=QUANTILE_CONFIG["k"]):
+        self.k, self.n, self.flip = k, 0, 0
+        self.levels = [[]]
+
+    def _capacity(self, h):
+        return max(2, math.ceil(self.k * _DECAY ** (len(self.levels) - h - 1)))
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) >= self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append([])
+                level.sort()
+                keep = [level.pop()] if len(level) % 2 else []
+                self.levels[h + 1].extend(level[self.flip::2])
+                self.flip ^= 1
+                self.levels[h] = keep
+            h += 1
+
+    def update(self, x):
+        self.levels[0].append(float(x))
+        self.n += 1
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def merge(self, other):
+        """Fold `other` into this sketch (in place); returns self."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        """Approximate values at ranks `qs` (NaN when empty)."""
+        if self.n == 0:
+            return [math.nan] * len(qs)
+        items = np.concatenate([np.asarray(lv, dtype=float) for lv in self.levels])
+        weights = np.concatenate([np.full(len(lv), 2 ** h) for h, lv in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cum = items[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cum, np.asarray(qs) * cum[-1], side="left")
+        return items[np.minimum(idx, len(items) - 1)].tolist()
+
+    def state(self):
+        return [self.k, self.n, self.flip, self.levels]
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(state[0])
+        sketch.n, sketch.flip, sketch.levels = state[1], state[2], [list(lv) for lv in state[3]]
+        return sketch
+
+
+class WindowedQuantiles:
+    """Per-zone quantiles over a sliding event-time window of bucketed sketches."""
+
+    def __init__(self, cfg=QUANTILE_CONFIG):
+        self.k = cfg["k"]
+        self.bucket_ns = int(cfg["bucket_hours"] * 3600 * 10**9)
+        self.span = math.ceil(cfg["window_hours"] / cfg["bucket_hours"])
+        self.qs = tuple(cfg["quantiles"])
+        self.registry = registry()
+        self.buckets = {}  # interned zone id (zones.py) -> {bucket: KLLSketch}
+        self._merged = {}  # interned zone id -> cached window merge
+
+    def observe(self, zones, timestamps, values):
+        """Add samples (any order); buckets older than the window are dropped."""
+        if len(zones) == 0:
+            return
+        ns = pd.to_datetime(pd.Series(timestamps)).astype("datetime64[ns]").astype("int64")
+        zones = self.registry.codes(zones, assign=True).tolist()
+        for zone, b, v in zip(zones, (ns.to_numpy() // self.bucket_ns).tolist(), values):
+            if v is None or v != v:
+                continue
+            per_zone = self.buckets.setdefault(zone, {})
+            if per_zone and b <= max(per_zone) - self.span:
+                continue  # already outside the window
+            sketch = per_zone.get(b)
+            if sketch is None:
+                sketch = per_zone[b] = KLLSketch(self.k)
+            sketch.update(v)
+            self._merged.pop(zone, None)
+        for zone in set(zones):
+            per_zone = self.buckets.get(zone)
+            if per_zone:
+                low = max(per_zone) - self.span
+                for b in [b for b in per_zone if b <= low]:
+                    del per_zone[b]
+
+    def sketch(self, zone):
+        """The zone's window as one merged sketch."""
+        return self._sketch(int(self.registry.codes([zone])[0]))
+
+    def _sketch(self, code):
+        merged = self._merged.get(code)
+        if merged is None:
+            merged = KLLSketch(self.k)
+            for b in sorted(self.buckets.get(code, {})):
+                merged.merge(self.buckets[code][b])
+            if code in self.buckets:
+                self._merged[code] = merged
+        return merged
+
+    def quantiles(self, zones, qs=None):
+        """(len(zones), len(qs)) array of window quantiles, NaN for unknown zones."""
+        qs = qs or self.qs
+        codes = self.registry.codes(zones).tolist()
+        return np.array([self._sketch(c).quantiles(qs) for c in codes], dtype=float).reshape(
+            len(zones), len(qs)
+        )
+
+    def merge(self, other):
+        """Combine another shard's state into this one (bucket-wise merge)."""
+        for zone, per_zone in other.buckets.items():
+            mine = self.buckets.setdefault(zone, {})
+            for b, sketch in per_zone.items():
+                if b in mine:
+                    mine[b].merge(sketch)
+                else:
+                    mine[b] = KLLSketch.from_state(sketch.state())
+            self._merged.pop(zone, None)
+        return self
+
+    def to_dict(self):
+        ids = self.registry.ids  # saved by zone id: interned ints are per process
+        return {ids[z]: {str(b): s.state() for b, s in per_zone.items()}
+                for z, per_zone in self.buckets.items()}
+
+    def load(self, state):
+        state = state or {}
+        codes = self.registry.codes(list(state), assign=True).tolist()
+        self.buckets = {z: {int(b): KLLSketch.from_state(s) for b, s in per_zone.items()}
+                        for z, per_zone in zip(codes, state.values())}
+        self._merged = {}
+        return self
@@ -0,0 +1,119 @@
+"""
+JalJeevan Score -- River Network
+================================
+Sand mining upstream shows up as turbidity and dolphin decline downstream, so
+the causal join cannot stop at `left.zone == right.zone`.  This module turns
+the ordered reaches in config.RIVER_REACHES into:
+
+  adjacency      zone -> [(downstream zone, km, travel hours)]
+  reachability   zone -> every zone downstream of it (itself included) with
+                 cumulative flow distance and travel time, bounded by
+                 RIVER_MAX_TRAVEL_HOURS
+
+Both are precomputed once per zone registry version (network() rebuilds them
+after a reload of the zone file).  A mining event then fans out to exactly the
+zones in its reachability row, with its timestamp shifted by the travel time,
+so a new event only touches the zones it can affect -- even with thousands of
+reaches.
+"""
+
+import heapq
+
+from config import RIVER_FLOW_KMH, RIVER_MAX_TRAVEL_HOURS, RIVER_REACHES
+from zones import registry
+
+
+class RiverNetwork:
+    """Directed reach graph with a precomputed downstream reachability index."""
+
+    def __init__(self, zones, reaches, flow_kmh=RIVER_FLOW_KMH,
+                 max_travel_hours=RIVER_MAX_TRAVEL_HOURS):
+        self.max_travel_hours = max_travel_hours
+        self.adjacency = {z: [] for z in zones}
+        for r in reaches:
+            kmh = r.get("flow_kmh", flow_kmh)
+            hours = r.get("travel_hours", r["km"] / kmh if kmh > 0 else 0.0)
+            self.adjacency.setdefault(r["from"], []).append((r["to"], float(r["km"]), hours))
+            self.adjacency.setdefault(r["to"], [])
+        self.reach = {z: self._downstream(z) for z in self.adjacency}
+        self.upstream = {z: [] for z in self.adjacency}
+        for src, targets in self.reach.items():
+            for dst, km, hours in targets:
+                self.upstream[dst].append((src, km, hours))
+        self._table = None
+
+    @classmethod
+    def from_config(cls):
+        return cls([z["id"] for z in registry()], RIVER_REACHES)
+
+    def _downstream(self, source):
+        """Shortest travel time to every zone reachable from `source` (Dijkstra)."""
+        best = {source: (0.0, 0.0)}
+        heap = [(0.0, 0.0, source)]
+        while heap:
+            hours, km, zone = heapq.heappop(heap)
+            if best[zone][0] < hours:
+                continue
+            for nxt, step_km, step_h in self.adjacency.get(zone, ()):
+                h = hours + step_h
+                if h > self.max_travel_hours:
+                    continue
+                if nxt not in best or h < best[nxt][0]:
+                    best[nxt] = (h, km + step_km)
+                    heapq.heappush(heap, (h, km + step_km, nxt))
+        return sorted(
+            ((z, round(km, 3), round(h, 3)) for z, (h, km) in best.items()),
+            key=lambda t: (t[2], t[0]),
+        )
+
+    def downstream_of(self, zone):
+        """[(zone, km, travel_hours)] reachable from `zone`, itself first."""
+        return self.reach.get(zone, [(zone, 0.0, 0.0)])
+
+    def upstream_of(self, zone):
+        """[(zone, km, travel_hours)] whose events can reach `zone`."""
+        return self.upstream.get(zone, [(zone, 0.0, 0.0)])
+
+    def reach_table(self):
+        """Reachability index as a frame: source, target, km, travel_hours."""
+        import pandas as pd
+        if self._table is None:
+            self._table = pd.DataFrame(
+                [(s, t, km, h) for s, targets in self.reach.items() for t, km, h in targets],
+                columns=["source", "target", "km", "travel_hours"],
+            )
+        return self._table
+
+    def fanout(self, events):
+        """
+        Propagate events (zone, timestamp, ...) to every downstream zone.
+
+        Returns one row per (event, affected zone) with `zone` set to the
+        affected zone, `source_zone` to where it happened, `timestamp` shifted
+        by the travel time and the original time kept in `event_time`.  Zones
+        missing from the graph only affect themselves.
+        """
+        import pandas as pd
+        table = self.reach_table()
+        known = events["zone"].isin(table["source"])
+        routed = events[known].merge(table, left_on="zone", right_on="source")
+        local = events[~known]
+        local = local.assign(source=local["zone"], target=local["zone"], km=0.0, travel_hours=0.0)
+        out = pd.concat([routed, local], ignore_index=True)
+        out = out.rename(columns={"zone": "source_zone"}).drop(columns="source")
+        out = out.rename(columns={"target": "zone", "timestamp": "event_time"})
+        out["timestamp"] = out["event_time"] + pd.to_timedelta(out["travel_hours"], unit="h")
+        return out
+
+
+_network = None
+_built_for = None  # registry version the cached network was built from
+
+
+def network():
+    """Process-wide network built from config, rebuilt when the zone registry reloads."""
+    global _network, _built_for
+    version = registry().version
+    if _network is None or version != _built_for:
+        _network, _built_for = RiverNetwork.from_config(), version
+    return _network
@@ -0,0 +1,244 @@
+"""
+JalJeevan Score -- Multi-Resolution Rollups
+===========================================
+Per-zone 1-minute, 1-hour and 1-day buckets (count, sum, min, max, last of
+dolphin_count, plus mining events) maintained incrementally, one batch per
+engine tick, so trend views read pre-aggregated points instead of raw CSV rows.
+
+  RollupWriter   engine side.  Open buckets live in memory (checkpointed with
+                 the engine state); a bucket is finalized once the zone's
+                 event time has moved `grace` buckets past it and is appended
+                 to output/rollups/<res>.jsonl.  Open buckets are snapshotted
+                 to output/rollups/open.json so charts include the current one.
+  RollupIndex    API side.  Tails each finalized file from its last byte
+                 offset into per-zone sorted lists and answers range queries
+                 with bisect, picking the finest resolution whose point count
+                 fits ROLLUP_MAX_POINTS -- a year-long chart reads days.
+"""
+
+import bisect
+import json
+import os
+from pathlib import Path
+
+from config import ROLLUP_DIR, ROLLUP_MAX_POINTS, ROLLUP_RESOLUTIONS
+
+# open bucket layout: [count, sum, min, max, last, last_ns, mining_events]
+_COUNT, _SUM, _MIN, _MAX, _LAST, _LAST_NS, _MINING = range(7)
+
+
+def _ns(timestamps):
+    import pandas as pd
+    return pd.to_datetime(pd.Series(timestamps)).astype("datetime64[ns]").astype("int64")
+
+
+def _point(zone, bucket, seconds, acc):
+    import pandas as pd
+    return {
+        "zone": zone,
+        "t": pd.Timestamp(bucket * seconds * 10**9).isoformat(),
+        "count": acc[_COUNT],
+        "sum": acc[_SUM],
+        "min": acc[_MIN],
+        "max": acc[_MAX],
+        "last": acc[_LAST],
+        "mining_events": acc[_MINING],
+    }
+
+
+class RollupWriter:
+    """Incrementally maintained per-zone buckets at every resolution."""
+
+    def __init__(self, root=ROLLUP_DIR, resolutions=ROLLUP_RESOLUTIONS, grace=1):
+        self.root = Path(root)
+        self.resolutions = dict(resolutions)
+        self.grace = grace
+        self.open = {res: {} for res in self.resolutions}  # res -> {(zone, bucket): acc}
+        self.watermark = {}  # zone -> latest event time (ns)
+        self.late_rows = 0
+        os.makedirs(self.root, exist_ok=True)
+
+    def _add(self, res, zone, bucket, count, total, lo, hi, last, last_ns, mining):
+        low = self.watermark.get(zone, last_ns) // (self.resolutions[res] * 10**9) - self.grace
+        if bucket < low:
+            self.late_rows += count + mining
+            return
+        acc = self.open[res].get((zone, bucket))
+        if acc is None:
+            acc = self.open[res][(zone, bucket)] = [0, 0.0, None, None, None, -1, 0]
+        if count:
+            acc[_COUNT] += count
+            acc[_SUM] += total
+            acc[_MIN] = lo if acc[_MIN] is None else min(acc[_MIN], lo)
+            acc[_MAX] = hi if acc[_MAX] is None else max(acc[_MAX], hi)
+            if last_ns >= acc[_LAST_NS]:
+                acc[_LAST], acc[_LAST_NS] = last, last_ns
+        acc[_MINING] += mining
+
+    def observe(self, dolphins=None, mining=None):
+        """
+        Fold a batch of rows into the open buckets (aggregated per bucket with
+        one groupby per resolution), then finalize buckets behind the watermark.
+        `dolphins` has zone, timestamp, dolphin_count; `mining` has zone,
+        timestamp and is already filtered to confirmed events.
+        """
+        import pandas as pd
+        parts = []
+        if dolphins is not None and len(dolphins):
+            parts.append(pd.DataFrame({
+                "zone": list(dolphins["zone"]), "ns": _ns(dolphins["timestamp"]).to_numpy(),
+                "value": pd.Series(dolphins["dolphin_count"], dtype=float).to_numpy(),
+                "mining": 0,
+            }))
+        if mining is not None and len(mining):
+            parts.append(pd.DataFrame({
+                "zone": list(mining["zone"]), "ns": _ns(mining["timestamp"]).to_numpy(),
+                "value": float("nan"), "mining": 1,
+            }))
+        if not parts:
+            return
+        rows = pd.concat(parts, ignore_index=True).sort_values("ns", kind="stable")
+        for res, seconds in self.resolutions.items():
+            rows["bucket"] = rows["ns"] // (seconds * 10**9)
+            agg = rows.groupby(["zone", "bucket"], sort=True).agg(
+                count=("value", "count"), total=("value", "sum"), lo=("value", "min"),
+                hi=("value", "max"), last=("value", "last"), last_ns=("ns", "max"),
+                mining=("mining", "sum"),
+            )
+            for (zone, bucket), r in zip(agg.index, agg.itertuples(index=False)):
+                self._add(res, zone, int(bucket), int(r.count), float(r.total),
+                          None if r.count == 0 else float(r.lo),
+                          None if r.count == 0 else float(r.hi),
+                          None if r.count == 0 else float(r.last), int(r.last_ns), int(r.mining))
+        for zone, ns in rows.groupby("zone")["ns"].max().items():
+            self.watermark[zone] = max(self.watermark.get(zone, ns), int(ns))
+        self._finalize()
+
+    def _finalize(self):
+        for res, seconds in self.resolutions.items():
+            buckets = self.open[res]
+            done = sorted(
+                key for key in buckets
+                if key[1] < self.watermark.get(key[0], 0) // (seconds * 10**9) - self.grace
+            )
+            if not done:
+                continue
+            with open(self.root / f"{res}.jsonl", "a") as f:
+                for zone, bucket in done:
+                    point = _point(zone, bucket, seconds, buckets.pop((zone, bucket)))
+                    f.write(json.dumps(point) + "\n")
+
+    def write_open(self):
+        """Snapshot of the still-open buckets for the API."""
+        snapshot = {
+            res: [_point(z, b, self.resolutions[res], acc)
+                  for (z, b), acc in sorted(buckets.items())]
+            for res, buckets in self.open.items()
+        }
+        tmp = self.root / "open.json.tmp"
+        tmp.write_text(json.dumps(snapshot))
+        os.replace(tmp, self.root / "open.json")
+
+    def to_dict(self):
+        return {
+            "open": {res: [[z, b, acc] for (z, b), acc in buckets.items()]
+                     for res, buckets in self.open.items()},
+            "watermark": self.watermark,
+        }
+
+    def load(self, state):
+        state = state or {}
+        for res, items in state.get("open", {}).items():
+            if res in self.open:
+                self.open[res] = {(z, b): acc for z, b, acc in items}
+        self.watermark = dict(state.get("watermark", {}))
+        return self
+
+
+# ── Read side (used by app.py) ──────────────────────────────────────────────
+
+class RollupIndex:
+    """Per-zone finalized buckets, tailed incrementally from the rollup files."""
+
+    def __init__(self, root=ROLLUP_DIR, resolutions=ROLLUP_RESOLUTIONS,
+                 max_points=ROLLUP_MAX_POINTS):
+        self.root = Path(root)
+        self.resolutions = dict(resolutions)
+        self.max_points = max_points
+        self._series = {}  # res -> {zone: ([t], [point])}
+        self._offsets = {}  # res -> bytes consumed
+        self._open = ({}, None)  # (snapshot, mtime)
+
+    def _refresh(self, res):
+        path = self.root / f"{res}.jsonl"
+        series = self._series.setdefault(res, {})
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return series
+        offset = self._offsets.get(res, 0)
+        if size < offset:  # rewritten / compacted: reload from scratch
+            series.clear()
+            offset = 0
+        if size > offset:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read(size - offset)
+            end = chunk.rfind(b"\n") + 1  # ignore a half-written last line
+            for line in chunk[:end].splitlines():
+                if line.strip():
+                    p = json.loads(line)
+                    ts, points = series.setdefault(p["zone"], ([], []))
+                    ts.append(p["t"])
+                    points.append(p)
+            offset += end
+        self._offsets[res] = offset
+        return series
+
+    def _open_points(self, res):
+        path = self.root / "open.json"
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return []
+        if mtime != self._open[1]:
+            try:
+                self._open = (json.loads(path.read_text()), mtime)
+            except ValueError:
+                pass  # half-written; keep previous snapshot
+        return self._open[0].get(res, [])
+
+    def pick_resolution(self, start, end):
+        """Finest resolution whose bucket count over [start, end] fits max_points."""
+        import pandas as pd
+        by_size = sorted(self.resolutions.items(), key=lambda kv: kv[1])
+        if start is None or end is None:
+            return by_size[-1][0]
+        span = (pd.Timestamp(end) - pd.Timestamp(start)).total_seconds()
+        for res, seconds in by_size:
+            if span / seconds <= self.max_points:
+                return res
+        return by_size[-1][0]
+
+    def query(self, zone=None, start=None, end=None, resolution=None):
+        """(resolution, points) for one zone or all zones, oldest first per zone."""
+        import pandas as pd
+        res = resolution or self.pick_resolution(start, end)
+        if res not in self.resolutions:
+            raise KeyError(res)
+        lo = pd.Timestamp(start).isoformat() if start is not None else None
+        hi = pd.Timestamp(end).isoformat() if end is not None else None
+        series = self._refresh(res)
+        pending = {}
+        for p in self._open_points(res):
+            if (lo is None or p["t"] >= lo) and (hi is None or p["t"] <= hi):
+                pending.setdefault(p["zone"], []).append(p)
+        zones = [zone] if zone else sorted(set(series) | set(pending))
+        out = []
+        for z in zones:
+            ts, points = series.get(z, ([], []))
+            i = bisect.bisect_left(ts, lo) if lo else 0
+            j = bisect.bisect_right(ts, hi) if hi else len(ts)
+            out.extend(points[i:j])
+            out.extend(pending.get(z, ()))
+        return res, out
@@ -8,7 +8,9 @@ Run this in a separate terminal while pipeline.py is running:
     python simulator.py
 
 This proves the core "live streaming" requirement: new data rows are detected
-and processed within 2 seconds.
+and processed within 2 seconds.  Rows are stamped with their append time
+(INGEST_COLUMN) when the CSV header has that column, so /api/latency can show
+the ingest -> API visibility latency of each row (lineage.py).
 """
 
 import time
@@ -16,7 +18,9 @@ import random
 import csv
 import os
 from datetime import datetime
-from config import DOLPHIN_CSV, MINING_CSV, ZONES
+from archive import append_lock
+from config import DOLPHIN_CSV, INGEST_COLUMN, MINING_CSV
+from zones import registry
 
 def ensure_files_exist():
     """Create CSV files with headers if they don't exist"""
@@ -27,16 +31,24 @@ def ensure_files_exist():
     if not os.path.exists(DOLPHIN_CSV):
         with open(DOLPHIN_CSV, "w", newline="") as f:
             writer = csv.writer(f)
-            writer.writerow(["timestamp", "zone", "dolphin_count", "confidence"])
+            writer.writerow(["timestamp", "zone", "dolphin_count", "confidence", INGEST_COLUMN])
         print(f"✅ Created {DOLPHIN_CSV}")
     
     # Mining CSV
     if not os.path.exists(MINING_CSV):
         with open(MINING_CSV, "w", newline="") as f:
             writer = csv.writer(f)
-            writer.writerow(["timestamp", "zone", "confidence", "turbidity_anomaly", "night_activity"])
+            writer.writerow(["timestamp", "zone", "confidence", "turbidity_anomaly",
+                             "night_activity", INGEST_COLUMN])
         print(f"✅ Created {MINING_CSV}")
 
+
+def ingest_stamp(path):
+    """[append time] for CSVs whose header has INGEST_COLUMN, else [] (older files)."""
+    with open(path, newline="") as f:
+        header = next(csv.reader(f), [])
+    return [round(time.time(), 3)] if INGEST_COLUMN in header else []
+
 ensure_files_exist()
 
 print("\n" + "=" * 60)
@@ -54,27 +66,30 @@ try:
     while True:
         tick += 1
         
-        # Generate timestamp
+        # Generate timestamp; zones re-read each tick so edits to the zone file show up live
         timestamp = datetime.now().isoformat()
+        zones = list(registry())
         
-        # 1. ADD DOLPHIN DATA
-        with open(DOLPHIN_CSV, "a", newline="") as f:
+        # 1. ADD DOLPHIN DATA (under the lock the pipeline's archival compaction takes)
+        with append_lock(DOLPHIN_CSV), open(DOLPHIN_CSV, "a", newline="") as f:
             writer = csv.writer(f)
-            for zone in ZONES:
+            stamp = ingest_stamp(DOLPHIN_CSV)
+            for zone in zones:
                 zone_id = zone["id"] if isinstance(zone, dict) else zone
                 # Simulate Zone9 decline (mining impact) - faster decline
                 if zone_id == "Zone9":
-                    count = max(8, zone.get("base", 20) - (tick // 3) + random.randint(-1, 1))
+                    base = zone.get("base") or 20
+                    count = max(8, base - (tick // 3) + random.randint(-1, 1))
                 else:
-                    base = zone.get("base", 30) if isinstance(zone, dict) else 30
+                    base = (zone.get("base") or 30) if isinstance(zone, dict) else 30
                     count = base + random.randint(-3, 3)
                 
                 confidence = round(random.uniform(0.88, 0.97), 2)
-                writer.writerow([timestamp, zone_id, count, confidence])
+                writer.writerow([timestamp, zone_id, count, confidence, *stamp])
         
         # 2. MAYBE ADD MINING DATA
         mining_added = []
-        for zone in ZONES:
+        for zone in zones:
             zone_id = zone["id"] if isinstance(zone, dict) else zone
             
             # Different mining probability per zone
@@ -82,16 +97,19 @@ try:
                 prob = 0.05
             elif zone_id == "Zone8":
                 prob = 0.10
-            else:  # Zone9
+            elif zone_id == "Zone9":
                 prob = 0.30
+            else:
+                prob = 0.10
             
             if random.random() < prob:
-                with open(MINING_CSV, "a", newline="") as f:
+                with append_lock(MINING_CSV), open(MINING_CSV, "a", newline="") as f:
                     writer = csv.writer(f)
                     confidence = round(random.uniform(0.85, 0.98), 2)
                     turbidity = round(random.uniform(2.0, 3.8), 1)
                     night_activity = round(random.uniform(0.75, 0.96), 2)
-                    writer.writerow([timestamp, zone_id, confidence, turbidity, night_activity])
+                    writer.writerow([timestamp, zone_id, confidence, turbidity, night_activity,
+                                     *ingest_stamp(MINING_CSV)])
                     mining_added.append(zone_id)
         
         # 3. PRINT STATUS
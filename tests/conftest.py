@@ -4,3 +4,86 @@ import pathlib
 
 # Ensure project root is on sys.path so imports resolve correctly
 sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+import pandas as pd  # noqa: E402
+import pytest  # noqa: E402
+
+import pipeline  # noqa: E402
+import zones  # noqa: E402
+from archive import Archive  # noqa: E402
+from evidence import case_id_for  # noqa: E402
+from rollups import RollupWriter  # noqa: E402
+from validation import Quarantine  # noqa: E402
+
+
+# ── Sensor rows ────────────────────────────────────────────────────────────────
+# Shared by the engine tests: `from conftest import DOLPHIN_HEADER, dolphin_rows`
+
+DOLPHIN_HEADER = "timestamp,zone,dolphin_count,confidence\n"
+MINING_HEADER = "timestamp,zone,confidence,turbidity_anomaly,night_activity\n"
+T0 = pd.Timestamp("2026-03-01T10:00:00")
+
+
+def dolphin_rows(start, n, zone="Zone9"):
+    return "".join(
+        f"{(T0 + pd.Timedelta(minutes=10 * (start + i))).isoformat()},{zone},{20 - i},0.9\n"
+        for i in range(n)
+    )
+
+
+def mining_row(minute, zone="Zone9"):
+    return f"{(T0 + pd.Timedelta(minutes=minute)).isoformat()},{zone},0.95,2.9,0.9\n"
+
+
+def evidence_frames():
+    """(alert, dolphins, mining): a six-hour Zone9 decline after one mining event."""
+    ts = pd.date_range("2026-03-01 00:00", periods=6, freq="h")
+    dolphins = pd.DataFrame({
+        "timestamp": list(ts) * 2,
+        "zone": ["Zone9"] * 6 + ["Zone7"] * 6,
+        "dolphin_count": [20, 19, 18, 15, 12, 9] + [40] * 6,
+        "confidence": [0.9] * 12,
+    })
+    mining = pd.DataFrame({
+        "timestamp": [ts[1]],
+        "zone": ["Zone9"],
+        "confidence": [0.94],
+        "turbidity_anomaly": [2.8],
+        "night_activity": [0.91],
+    })
+    alert = {
+        "zone": "Zone9", "dolphin_count": 9, "avg_48h": 15.5, "decline_pct": 41.9,
+        "mining_conf": 0.94, "observed_at": ts[-1], "case_id": case_id_for("Zone9", ts[-1]),
+    }
+    return alert, dolphins, mining
+
+
+# ── Fixtures ───────────────────────────────────────────────────────────────────
+
+@pytest.fixture(autouse=True)
+def zone_registry(monkeypatch):
+    """A fresh process registry per test, so interned zones do not leak between tests."""
+    monkeypatch.setattr(zones, "_registry", None)
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """Pipeline module pointed at a scratch data / output / persistence tree."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "output").mkdir()
+    paths = {
+        "DOLPHIN_CSV": tmp_path / "dolphin.csv", "MINING_CSV": tmp_path / "mining.csv",
+        "STATS_JSONL": tmp_path / "output" / "stats.jsonl",
+        "ALERTS_JSONL": tmp_path / "output" / "alerts.jsonl",
+        "PERSISTENCE_DIR": tmp_path,
+        "OUTPUT_DIR": tmp_path / "output",  # stats.json / alerts.json snapshots
+    }
+    for name, value in paths.items():
+        monkeypatch.setattr(pipeline, name, value)
+    monkeypatch.setattr(pipeline, "RollupWriter", lambda: RollupWriter(tmp_path / "rollups"))
+    monkeypatch.setattr(pipeline, "Archive", lambda: Archive(tmp_path / "archive"))
+    monkeypatch.setattr(pipeline, "Quarantine", lambda: Quarantine(
+        tmp_path / "output" / "deadletter.jsonl", tmp_path / "output" / "validation.json"))
+    paths["DOLPHIN_CSV"].write_text(DOLPHIN_HEADER + dolphin_rows(0, 12))
+    paths["MINING_CSV"].write_text(MINING_HEADER + mining_row(5))
+    return paths
@@ -0,0 +1,67 @@
+"""
+Tests for content negotiation on the dashboard data endpoints.
+Run with: pytest tests/ -v
+"""
+import json
+import pytest
+
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient  # noqa: E402
+
+import app  # noqa: E402
+
+ROWS = [
+    {"zone": "Zone7", "dolphin_count": 41, "avg_48h": 40.2, "min_48h": 36, "max_48h": 43,
+     "total_samples": 5, "mining_conf": None},
+    {"zone": "Zone9", "dolphin_count": 12, "avg_48h": 19.2, "min_48h": 12, "max_48h": 24,
+     "total_samples": 5, "mining_conf": 0.94},
+]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    stats = tmp_path / "stats.jsonl"
+    stats.write_text("".join(json.dumps(r) + "\n" for r in ROWS))
+    monkeypatch.setattr(app, "STATS", app.ZoneView(stats, app.STATS_SORT, derive=app._with_status))
+    return TestClient(app.app)
+
+
+# ── Negotiation ────────────────────────────────────────────────────────────────
+
+class TestNegotiate:
+    def test_default_is_json(self):
+        assert app._negotiate(None) == app.MEDIA_JSON
+        assert app._negotiate("*/*") == app.MEDIA_JSON
+
+    def test_quality_ordering(self):
+        accept = "application/json;q=0.5, application/x-msgpack"
+        if app.msgpack is None:
+            pytest.skip("msgpack not installed")
+        assert app._negotiate(accept) == app.MEDIA_MSGPACK
+
+    def test_unsupported_is_406(self, client):
+        assert client.get("/api/stats", headers={"Accept": "text/csv"}).status_code == 406
+
+
+# ── Encodings ──────────────────────────────────────────────────────────────────
+
+class TestStatsFormats:
+    def test_json_zero_fills_missing_values(self, client):
+        body = client.get("/api/stats").json()
+        by_zone = {r["zone"]: r for r in body}
+        assert by_zone["Zone7"]["mining_conf"] == 0
+        assert by_zone["Zone7"]["mining_detected"] is False
+        assert by_zone["Zone9"]["mining_detected"] is True
+
+    def test_msgpack_roundtrip(self, client):
+        msgpack = pytest.importorskip("msgpack")
+        r = client.get("/api/stats", headers={"Accept": "application/msgpack"})
+        assert r.headers["content-type"].startswith("application/msgpack")
+        assert [row["zone"] for row in msgpack.unpackb(r.content)] == ["Zone7", "Zone9"]
+
+    def test_arrow_stream_roundtrip(self, client):
+        pa = pytest.importorskip("pyarrow")
+        r = client.get("/api/stats", headers={"Accept": app.MEDIA_ARROW})
+        table = pa.ipc.open_stream(r.content).read_all()
+        assert table.column("zone").to_pylist() == ["Zone7", "Zone9"]
+        assert table.num_rows == 2
@@ -0,0 +1,166 @@
+"""
+Tests for the raw input archive: compaction of consumed rows, logical read
+offsets across it, crash recovery and history reads.
+Run with: pytest tests/ -v
+"""
+import json
+
+import pandas as pd
+import pytest
+
+import archive
+import pipeline
+from archive import Archive
+from config import ARCHIVE_CONFIG
+
+from conftest import DOLPHIN_HEADER, T0
+
+EAGER = dict(ARCHIVE_CONFIG, interval_s=0, min_bytes=0)
+
+
+def _hourly(start, n, zone="Zone9"):
+    return "".join(f"{(T0 + pd.Timedelta(hours=h)).isoformat()},{zone},{20 + h % 7},0.9\n"
+                   for h in range(start, start + n))
+
+
+@pytest.fixture
+def stream(tmp_path):
+    """A 100-hour dolphin CSV (T0 .. T0+99h) and an eager archive beside it."""
+    path = tmp_path / "dolphin.csv"
+    path.write_text(DOLPHIN_HEADER + _hourly(0, 100))
+    return path, Archive(tmp_path / "archive", EAGER)
+
+
+def _rows(frame):
+    return [(t.isoformat(), z, int(n)) for t, z, n in
+            zip(frame["timestamp"], frame["zone"], frame["dolphin_count"])]
+
+
+def _expected(start, n):
+    return [((T0 + pd.Timedelta(hours=h)).isoformat(), "Zone9", 20 + h % 7)
+            for h in range(start, start + n)]
+
+
+# ── Compaction ─────────────────────────────────────────────────────────────────
+
+class TestCompaction:
+    def test_old_consumed_rows_move_to_day_partitions(self, stream):
+        path, arc = stream
+        original = path.read_bytes()
+        removed = arc.compact("dolphins", path, len(original), T0 + pd.Timedelta(hours=50))
+        live = path.read_bytes()
+        assert removed == len(original) - len(live) > 0
+        assert live == DOLPHIN_HEADER.encode() + original[len(DOLPHIN_HEADER) + removed:]
+        assert _rows(arc.read("dolphins")) == _expected(0, 50)
+        assert sorted(p.name for p in (arc.root / "dolphins").iterdir()) == [
+            "2026-03-01.csv.gz", "2026-03-02.csv.gz", "2026-03-03.csv.gz"]
+        assert arc.snapshot()["dolphins"]["archived_bytes"] == removed
+        assert sum(arc.snapshot()["dolphins"]["rows"].values()) == 50
+        assert _rows(arc.history("dolphins", path)) == _expected(0, 100)
+        assert _rows(arc.history("dolphins", path, "2026-03-02", "2026-03-03T05:00")) == \
+            _expected(14, 30)
+
+    def test_later_compactions_append_to_partitions(self, stream):
+        path, arc = stream
+        consumed = path.stat().st_size
+        arc.compact("dolphins", path, consumed, T0 + pd.Timedelta(hours=20))
+        arc.compact("dolphins", path, consumed, T0 + pd.Timedelta(hours=30))
+        again = Archive(arc.root, EAGER)  # manifest survives a restart
+        assert again.base("dolphins", path) == arc.base("dolphins", path)
+        assert _rows(again.read("dolphins")) == _expected(0, 30)
+        assert _rows(again.history("dolphins", path)) == _expected(0, 100)
+
+    def test_unconsumed_rows_stay_live(self, stream):
+        path, arc = stream
+        consumed = len(DOLPHIN_HEADER) + len(_hourly(0, 10))
+        arc.compact("dolphins", path, consumed, T0 + pd.Timedelta(hours=90))
+        assert _rows(arc.read("dolphins")) == _expected(0, 10)
+        assert path.read_text() == DOLPHIN_HEADER + _hourly(10, 90)
+
+    def test_small_backlogs_are_left_alone(self, stream):
+        path, arc = stream
+        arc.cfg["min_bytes"] = path.stat().st_size
+        before = path.read_bytes()
+        assert arc.compact("dolphins", path, len(before), T0 + pd.Timedelta(hours=90)) == 0
+        assert path.read_bytes() == before and arc.manifest == {}
+
+    def test_replaced_file_starts_a_new_stream(self, stream):
+        path, arc = stream
+        arc.compact("dolphins", path, path.stat().st_size, T0 + pd.Timedelta(hours=50))
+        fresh = path.with_name("fresh.csv")  # created while the old file exists: a new inode
+        fresh.write_text(DOLPHIN_HEADER)
+        fresh.replace(path)
+        assert arc.base("dolphins", path) == 0
+
+
+# ── Crashes ────────────────────────────────────────────────────────────────────
+
+class TestCrashRecovery:
+    def _crash_on(self, monkeypatch, owner, name):
+        """Make owner.name fail for the rewritten live file, as a power cut would."""
+        real = getattr(owner, name)
+
+        def fail(src, *rest):
+            if str(src).endswith(".compact"):
+                raise OSError("power cut")
+            return real(src, *rest)
+        monkeypatch.setattr(owner, name, fail)
+
+    def test_crash_before_the_rewrite_is_undone(self, stream, monkeypatch):
+        path, arc = stream
+        before = path.read_bytes()
+        self._crash_on(monkeypatch, archive, "_durable_write")
+        with pytest.raises(OSError):
+            arc.compact("dolphins", path, len(before), T0 + pd.Timedelta(hours=50))
+        monkeypatch.undo()
+        assert path.read_bytes() == before
+        restarted = Archive(arc.root, EAGER)
+        restarted.compact("dolphins", path, len(before), T0 + pd.Timedelta(hours=50))
+        assert _rows(restarted.read("dolphins")) == _expected(0, 50)  # no duplicates
+        assert sum(restarted.snapshot()["dolphins"]["rows"].values()) == 50
+
+    def test_crash_before_the_replace_skips_archived_rows(self, stream, monkeypatch):
+        path, arc = stream
+        before = path.read_bytes()
+        self._crash_on(monkeypatch, archive.os, "replace")
+        with pytest.raises(OSError):
+            arc.compact("dolphins", path, len(before), T0 + pd.Timedelta(hours=50))
+        monkeypatch.undo()
+        restarted = Archive(arc.root, EAGER)
+        assert restarted.base("dolphins", path) == 0
+        restarted.compact("dolphins", path, len(before), T0 + pd.Timedelta(hours=60))
+        assert _rows(restarted.read("dolphins")) == _expected(0, 60)
+        assert _rows(restarted.history("dolphins", path)) == _expected(0, 100)
+
+    def test_crash_before_the_commit_is_resolved_by_inode(self, stream):
+        path, arc = stream
+        old = json.loads(json.dumps(arc.manifest))
+        old_inode = path.stat().st_ino
+        removed = arc.compact("dolphins", path, path.stat().st_size, T0 + pd.Timedelta(hours=50))
+        entry = arc.manifest["dolphins"]
+        entry.update(pending={"base": entry["base"], "inode": entry["inode"]},
+                     base=old.get("dolphins", {}).get("base", 0), inode=old_inode)
+        arc._save()  # as left by a crash right after the live file was replaced
+        assert Archive(arc.root, EAGER).base("dolphins", path) == removed
+
+
+# ── Engine ─────────────────────────────────────────────────────────────────────
+
+class TestEngineOffsets:
+    def test_reads_continue_across_compaction_and_restart(self, engine):
+        engine["DOLPHIN_CSV"].write_text(DOLPHIN_HEADER + _hourly(0, 100))
+        store = pipeline._PersistenceStore()
+        store.archive.cfg.update(EAGER)
+        pipeline._tick(store)
+        assert store.rows_read == 101  # 100 dolphin + 1 mining
+        assert store.archive.base("dolphins", engine["DOLPHIN_CSV"]) > 0
+        assert _rows(store.archive.read("dolphins")) == _expected(0, 99 - 48 - 24)
+
+        with open(engine["DOLPHIN_CSV"], "a") as f:
+            f.write(_hourly(100, 2))
+        assert _rows(store.read_tail(engine["DOLPHIN_CSV"], "dolphins")) == _expected(100, 2)
+        store.checkpoint()
+        with open(engine["DOLPHIN_CSV"], "a") as f:
+            f.write(_hourly(102, 1))
+        warm = pipeline._PersistenceStore()
+        assert _rows(warm.read_tail(engine["DOLPHIN_CSV"], "dolphins")) == _expected(102, 1)
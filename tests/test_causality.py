@@ -0,0 +1,107 @@
+"""
+Tests for the lagged cross-correlation estimator.
+Run with: pytest tests/ -v
+"""
+import numpy as np
+import pandas as pd
+
+from causality import LaggedXCorr
+
+T0 = pd.Timestamp("2026-03-01")
+
+
+def _series(zone="Zone1", hours=300, lag=6, seed=0):
+    """Hourly dolphin counts that drop `lag` hours after each mining event."""
+    rng = np.random.default_rng(seed)
+    mined = rng.random(hours) < 0.15
+    level, counts = 40.0, []
+    for h in range(hours):
+        if h >= lag and mined[h - lag]:
+            level -= 3
+        level += 0.2 * (40 - level)  # slow recovery
+        counts.append(level + rng.normal(0, 0.3))
+    times = [T0 + pd.Timedelta(hours=h, minutes=10) for h in range(hours)]
+    d = pd.DataFrame({"zone": zone, "timestamp": times, "dolphin_count": counts})
+    m = pd.DataFrame({"zone": zone, "timestamp": [t for t, x in zip(times, mined) if x],
+                      "confidence": 0.9})
+    return d, m
+
+
+def _brute(xc, d, m, zone):
+    """Reference correlations recomputed from scratch over the same window."""
+    hour = pd.Timedelta(hours=1)
+    base = int(T0.value // 3_600_000_000_000)
+    end = xc.closed - base
+    x = np.zeros(end + 1)
+    for t, c in zip(m["timestamp"], m["confidence"]):
+        x[(t - T0) // hour] += c
+    means = d.assign(b=(d["timestamp"] - T0) // hour).groupby("b")["dolphin_count"].mean()
+    y = means.reindex(range(end)).ffill().diff().fillna(0).to_numpy()
+    ts = np.arange(max(0, end - xc.window), end)
+    return np.array([np.corrcoef([x[t - k] if t >= k else 0 for t in ts], y[ts])[0, 1]
+                     for k in xc.lags])
+
+
+# ── Estimator ──────────────────────────────────────────────────────────────────
+
+class TestLaggedXCorr:
+    def test_recovers_injected_lag(self):
+        d, m = _series(lag=6)
+        xc = LaggedXCorr()
+        xc.observe(d, m)
+        lag, strength = xc.estimate(["Zone1"])
+        assert lag[0] == 6.0
+        assert strength[0] > 0.5
+
+    def test_incremental_matches_recomputation(self):
+        d, m = _series(hours=260, seed=3)
+        xc = LaggedXCorr()
+        for lo in range(0, 260, 17):  # many small ticks
+            start, end = T0 + pd.Timedelta(hours=lo), T0 + pd.Timedelta(hours=lo + 17)
+            xc.observe(d[(d["timestamp"] >= start) & (d["timestamp"] < end)],
+                       m[(m["timestamp"] >= start) & (m["timestamp"] < end)])
+        row = xc.registry.intern("Zone1")
+        assert np.allclose(xc.correlations([row])[0], _brute(xc, d, m, "Zone1"), atol=1e-9)
+
+    def test_zones_independent_and_unknown_is_nan(self):
+        d1, m1 = _series("Zone1", lag=4, seed=1)
+        d2, m2 = _series("Zone2", lag=12, seed=2)
+        xc = LaggedXCorr()
+        xc.observe(pd.concat([d1, d2]), pd.concat([m1, m2]))
+        lag, _ = xc.estimate(["Zone2", "Zone1", "ZoneX"])
+        assert lag[0] == 12.0 and lag[1] == 4.0
+        assert np.isnan(lag[2])
+
+    def test_not_reported_before_min_pairs(self):
+        d, m = _series(hours=10)
+        xc = LaggedXCorr()
+        xc.observe(d, m)
+        assert np.isnan(xc.estimate(["Zone1"])[1][0])
+
+    def test_shifted_mining_fills_future_bins(self):
+        # Arrival 30h after the event must not close bins (dolphin rows stay on time)
+        d, m = _series(hours=200, lag=6)
+        xc = LaggedXCorr()
+        xc.observe(d.iloc[:100], m.assign(event_time=m["timestamp"],
+                                          timestamp=m["timestamp"] + pd.Timedelta(hours=30))
+                   .pipe(lambda f: f[f["event_time"] < d["timestamp"].iloc[100]]))
+        xc.observe(d.iloc[100:], None)
+        assert xc.late_rows == 0
+
+    def test_single_row_api(self):
+        xc = LaggedXCorr()
+        xc.observe_dolphin("Zone1", T0, 30)
+        xc.observe_mining("Zone1", T0 + pd.Timedelta(hours=2), 0.9, event_time=T0)
+        assert xc.to_dict()["zones"] == ["Zone1"]
+        assert xc.late_rows == 0
+
+    def test_state_roundtrip(self):
+        d, m = _series(hours=120)
+        xc = LaggedXCorr()
+        xc.observe(d.iloc[:80], m[m["timestamp"] < d["timestamp"].iloc[80]])
+        again = LaggedXCorr().load(xc.to_dict())
+        rest = (d.iloc[80:], m[m["timestamp"] >= d["timestamp"].iloc[80]])
+        xc.observe(*rest)
+        again.observe(*rest)
+        rows = np.flatnonzero(xc.seen)
+        assert np.array_equal(xc.correlations(rows), again.correlations(rows), equal_nan=True)
@@ -0,0 +1,97 @@
+"""
+Tests for simulation-engine checkpoints and warm restart.
+Run with: pytest tests/ -v
+"""
+import json
+
+import pandas as pd
+import pytest
+
+import pipeline
+from checkpoint import MAGIC, read_checkpoint, write_checkpoint
+
+from conftest import DOLPHIN_HEADER, MINING_HEADER, dolphin_rows, mining_row
+
+
+def _append(engine, start):
+    with open(engine["DOLPHIN_CSV"], "a") as f:
+        f.write(dolphin_rows(start, 4))
+    with open(engine["MINING_CSV"], "a") as f:
+        f.write(mining_row(10 * start))
+
+
+def _outputs(tmp_path):
+    """Sink rows without their lineage (wall-clock read / emit times differ per run)."""
+    def strip(line):
+        row = json.loads(line, parse_constant=lambda c: pytest.fail(f"{c} in a sink"))
+        row.pop("lineage", None)
+        return row
+    return {p.name: [strip(ln) for ln in p.read_text().splitlines()]
+            for p in sorted(tmp_path.rglob("*.jsonl"))}
+
+
+# ── File format ────────────────────────────────────────────────────────────────
+
+class TestCheckpointFile:
+    def test_roundtrip(self, tmp_path):
+        frame = pd.DataFrame({"a": [1, 2]})
+        write_checkpoint(tmp_path / "c.bin", {"offsets": {"x": 3}, "frame": frame})
+        state = read_checkpoint(tmp_path / "c.bin")
+        assert state["offsets"] == {"x": 3}
+        assert state["frame"].equals(frame)
+
+    def test_corrupt_or_foreign_file_is_ignored(self, tmp_path):
+        path = tmp_path / "c.bin"
+        write_checkpoint(path, {"k": 1})
+        data = bytearray(path.read_bytes())
+        data[-1] ^= 0xFF
+        path.write_bytes(bytes(data))
+        assert read_checkpoint(path) is None
+        path.write_bytes(MAGIC[:4])
+        assert read_checkpoint(path) is None
+        assert read_checkpoint(tmp_path / "missing.bin") is None
+
+
+# ── Warm restart ───────────────────────────────────────────────────────────────
+
+class TestWarmRestart:
+    def test_reads_only_new_complete_lines(self, engine):
+        store = pipeline._PersistenceStore()
+        assert len(store.read_tail(engine["DOLPHIN_CSV"], "dolphins")) == 12
+        with open(engine["DOLPHIN_CSV"], "a") as f:
+            f.write(dolphin_rows(12, 1) + "2026-03-01T12:10:00,Zo")  # half-written line
+        assert len(store.read_tail(engine["DOLPHIN_CSV"], "dolphins")) == 1
+        with open(engine["DOLPHIN_CSV"], "a") as f:
+            f.write("ne9,7,0.9\n")
+        assert store.read_tail(engine["DOLPHIN_CSV"], "dolphins")["zone"].tolist() == ["Zone9"]
+
+    def test_restart_replays_tail_and_matches_uninterrupted_run(self, engine, tmp_path):
+        # uninterrupted reference run
+        store = pipeline._PersistenceStore(tmp_path / "ref.bin")
+        for start in (None, 12, 16, 20):
+            if start is not None:
+                _append(engine, start)
+            pipeline._tick(store)
+        reference = _outputs(tmp_path)
+
+        for p in tmp_path.rglob("*.jsonl"):
+            p.unlink()
+        engine["DOLPHIN_CSV"].write_text(DOLPHIN_HEADER + dolphin_rows(0, 12))
+        engine["MINING_CSV"].write_text(MINING_HEADER + mining_row(5))
+
+        # same input, but the engine dies after tick 4's output, before checkpointing
+        store = pipeline._PersistenceStore()
+        for start in (None, 12, 16):
+            if start is not None:
+                _append(engine, start)
+            pipeline._tick(store)
+        store.checkpoint()
+        _append(engine, 20)
+        pipeline._tick(store)
+
+        warm = pipeline._PersistenceStore()
+        warm.rollback_sinks()
+        pipeline._tick(warm)
+        assert warm.restored
+        assert warm.rows_read == 5  # 4 dolphin + 1 mining rows since the checkpoint
+        assert _outputs(tmp_path) == reference
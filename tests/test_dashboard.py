@@ -0,0 +1,125 @@
+"""
+Tests for the delta feed behind the dashboard and its client-side patching,
+driven by a synthetic 5,000-zone feed.
+Run with: pytest tests/ -v
+"""
+import json
+import shutil
+import subprocess
+
+import pytest
+
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient  # noqa: E402
+
+import app  # noqa: E402
+from views import ZoneView  # noqa: E402
+
+ZONES = 5000
+
+
+def _stats(i, count):
+    return {"zone": f"Z{i:04d}", "dolphin_count": count, "avg_48h": 40.0, "mining_conf": None}
+
+
+def _append(path, rows):
+    with open(path, "a") as f:
+        f.writelines(json.dumps(r) + "\n" for r in rows)
+
+
+@pytest.fixture
+def feed(tmp_path, monkeypatch):
+    stats, alerts = tmp_path / "stats.jsonl", tmp_path / "alerts.jsonl"
+    _append(stats, [_stats(i, 40 - i % 20) for i in range(ZONES)])
+    _append(alerts, [{"zone": f"Z{i:04d}", "state": "opened", "decline_pct": 30.0}
+                     for i in range(0, ZONES, 50)])
+    monkeypatch.setattr(app, "STATS", ZoneView(stats, app.STATS_SORT, derive=app._with_status))
+    monkeypatch.setattr(app, "ALERTS", ZoneView(alerts, app.ALERTS_SORT, status_field="state",
+                                                keep=lambda a: a.get("state") != "resolved"))
+    return TestClient(app.app), stats, alerts
+
+
+def _tick(stats, alerts):
+    """25 zones change, one alert resolves."""
+    _append(stats, [_stats(i, 5) for i in range(0, ZONES, 200)])
+    _append(alerts, [{"zone": "Z0050", "state": "resolved", "decline_pct": 10.0}])
+
+
+# ── Delta endpoints ────────────────────────────────────────────────────────────
+
+class TestChanges:
+    def test_first_call_is_full_then_only_changes(self, feed):
+        client, stats, alerts = feed
+        first = client.get("/api/stats/changes").json()
+        assert first["full"] and len(first["rows"]) == ZONES
+        assert client.get("/api/stats/changes", params={"since": first["version"]}).json()[
+            "rows"] == []
+        _tick(stats, alerts)
+        r = client.get("/api/stats/changes", params={"since": first["version"]})
+        delta = r.json()
+        assert not delta["full"]
+        expected = [f"Z{i:04d}" for i in range(0, ZONES, 200)]
+        assert sorted(z["zone"] for z in delta["rows"]) == expected
+        assert all(z["status"] == "crit" for z in delta["rows"])
+        assert len(r.content) * 50 < len(client.get("/api/stats").content)
+
+    def test_removed_zones_and_stale_versions(self, feed):
+        client, stats, alerts = feed
+        version = client.get("/api/alerts/changes").json()["version"]
+        _tick(stats, alerts)
+        delta = client.get("/api/alerts/changes", params={"since": version}).json()
+        assert delta["rows"] == [] and delta["removed"] == ["Z0050"]
+        stale = client.get("/api/alerts/changes", params={"since": "feedbeef.3"}).json()
+        assert stale["full"] and len(stale["rows"]) == ZONES // 50 - 1
+
+    def test_change_log_stays_bounded(self, tmp_path):
+        path = tmp_path / "stats.jsonl"
+        view = ZoneView(path, {"zone": str})
+        version = None
+        for n in range(40):
+            _append(path, [{"zone": f"Z{i}", "n": n} for i in range(100)])
+            view.refresh()
+            version = version or view.version
+        assert len(view._log_seq) <= 2 * 100 + 1024
+        rows, _, _, full = view.changes(version)
+        assert not full and len(rows) == 100
+
+
+# ── Client patching (dashboard script under node) ─────────────────────────────
+
+DRIVER = """
+const dash = require(process.argv[2]);
+const deltas = JSON.parse(require('fs').readFileSync(process.argv[3], 'utf8'));
+const view = {rows: new Map(), version: ''};
+const changed = deltas.map(d => dash.applyDelta(view, d));
+const items = dash.byDecline([...view.rows.values()]);
+console.log(JSON.stringify({
+  changed, size: view.rows.size, version: view.version,
+  top: items.slice(0, 3).map(z => z.zone),
+  window: dash.windowRange(1010 * 101, 420, 101, 3, items.length),
+}));
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+class TestDashboardScript:
+    def test_patches_deltas_and_windows_5000_zones(self, feed, tmp_path):
+        client, stats, alerts = feed
+        first = client.get("/api/stats/changes").json()
+        idle = client.get("/api/stats/changes", params={"since": first["version"]}).json()
+        _tick(stats, alerts)
+        delta = client.get("/api/stats/changes", params={"since": first["version"]}).json()
+        script = tmp_path / "dashboard.js"
+        script.write_text(app.HTML.split("<script>")[1].split("</script>")[0])
+        (tmp_path / "driver.js").write_text(DRIVER)
+        (tmp_path / "deltas.json").write_text(json.dumps([first, idle, delta]))
+        out = subprocess.run(
+            ["node", str(tmp_path / "driver.js"), str(script), str(tmp_path / "deltas.json")],
+            capture_output=True, text=True, check=True,
+        )
+        result = json.loads(out.stdout)
+        assert result["changed"] == [True, False, True]
+        assert result["size"] == ZONES and result["version"] == delta["version"]
+        assert result["top"] == ["Z0000", "Z0200", "Z0400"]  # the 25 crashed zones lead
+        lo, hi = result["window"]
+        assert hi - lo <= 3 * (5 + 2 * 4)  # visible rows plus overscan, never all 5,000
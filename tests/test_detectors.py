@@ -0,0 +1,74 @@
+"""
+Tests for the streaming EWMA / CUSUM / Page-Hinkley detectors.
+Run with: pytest tests/ -v
+"""
+import random
+
+from detectors import DetectorBank, StreamDetector
+
+
+def _feed(values):
+    det = StreamDetector()
+    for v in values:
+        det.update(v)
+    return det
+
+
+def _noise(n, mean=2.0, sd=0.1, seed=7):
+    rnd = random.Random(seed)
+    return [rnd.gauss(mean, sd) for _ in range(n)]
+
+
+# ── Single detector ────────────────────────────────────────────────────────────
+
+class TestStreamDetector:
+    def test_stationary_signal_does_not_alarm(self):
+        s = _feed(_noise(500)).score("up")
+        assert max(s["cusum"], s["page_hinkley"]) < 1.0
+
+    def test_slow_onset_caught_without_large_z(self):
+        # +0.02 per row: never a 3-sigma jump, but a sustained shift
+        drift = [v + 0.02 * i for i, v in enumerate(_noise(60, seed=3))]
+        det = StreamDetector()
+        peak_ewma = 0.0
+        for v in _noise(200) + drift:
+            det.update(v)
+            peak_ewma = max(peak_ewma, det.score("up")["ewma"])
+        s = det.score("up")
+        assert max(s["cusum"], s["page_hinkley"]) >= 1.0
+        assert peak_ewma < max(s["cusum"], s["page_hinkley"])
+
+    def test_direction_matters(self):
+        det = _feed(_noise(100, mean=30, sd=1) + [20] * 10)
+        assert det.score("down")["cusum"] >= 1.0
+        assert det.score("up")["cusum"] == 0.0
+
+    def test_state_roundtrip(self):
+        det = _feed(_noise(50))
+        again = StreamDetector(det.state())
+        det.update(5.0)
+        again.update(5.0)
+        assert det.state() == again.state()
+
+
+# ── Bank ───────────────────────────────────────────────────────────────────────
+
+class TestDetectorBank:
+    def test_upstream_mining_flags_downstream_zone(self):
+        bank = DetectorBank(upstream=lambda z: {"B": ["A", "B"]}.get(z, [z]))
+        for t in _noise(100) + [4.0] * 10:
+            bank.observe_mining("A", t, 0.8)
+        assert bank.anomaly("B")["mining_anomaly"]
+        assert not bank.anomaly("C")["mining_anomaly"]
+
+    def test_nan_is_ignored(self):
+        bank = DetectorBank()
+        bank.observe_dolphin("A", float("nan"))
+        assert bank.scores("A") == {}
+
+    def test_checkpoint_roundtrip(self):
+        bank = DetectorBank()
+        for c in _noise(40, mean=30, sd=2):
+            bank.observe_dolphin("A", c)
+        restored = DetectorBank().load(bank.to_dict())
+        assert restored.scores("A") == bank.scores("A")
@@ -0,0 +1,147 @@
+"""
+Tests for the DocumentStore client and /api/legal's use of it (against a local
+stub speaking the DocumentStoreServer routes).
+Run with: pytest tests/ -v
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from config import DOCSTORE_CONFIG
+from docstore import DocStoreClient
+
+pytest.importorskip("httpx")
+
+FAST = dict(DOCSTORE_CONFIG, timeout_s=2.0, retry_s=60.0)
+ORDER = ("IN THE MATTER OF: Illegal Sand Mining\n\n"
+         "Unauthorized mining in the riverbed is prohibited under Section 15.")
+
+
+# ── Stub service ───────────────────────────────────────────────────────────────
+
+class _DocumentStore(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.requests.append((self.client_address, self.path, body))
+        if server.status != 200:
+            reply = {"error": "unavailable"}
+        elif self.path == "/v1/retrieve":
+            words = body["query"].lower().split()
+            reply = [{"text": text, "metadata": {"path": f"/srv/ngt_orders/{name}"}, "dist": -i}
+                     for i, (name, text) in enumerate(server.docs.items())
+                     if any(w in text.lower() for w in words)][:body["k"]]
+        else:
+            reply = {"file_count": len(server.docs), "last_modified": 0, "last_indexed": 0}
+        data = json.dumps(reply).encode()
+        self.send_response(server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def service():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DocumentStore)
+    server.requests, server.status = [], 200
+    server.docs = {"sand_mining_order.txt": ORDER, "stp_order.txt": "Sewage treatment plants."}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def api(service, monkeypatch):
+    from fastapi.testclient import TestClient
+    import app
+    monkeypatch.setattr(app, "DOCSTORE", DocStoreClient(service[1], FAST))
+    with TestClient(app.app) as client:
+        yield client, app.DOCSTORE
+
+
+# ── Client ─────────────────────────────────────────────────────────────────────
+
+class TestDocStoreClient:
+    def test_retrieve_and_statistics(self, service):
+        async def run():
+            client = DocStoreClient(service[1], FAST)
+            try:
+                return (await client.retrieve("sand mining", 3), await client.statistics(),
+                        client.up)
+            finally:
+                await client.close()
+        hits, stats, up = asyncio.run(run())
+        assert [h["source"] for h in hits] == ["sand_mining_order.txt"]
+        assert hits[0]["text"] == ORDER and stats["file_count"] == 2 and up is True
+        assert [r[1:] for r in service[0].requests] == [
+            ("/v1/retrieve", {"query": "sand mining", "k": 3}), ("/v1/statistics", {})]
+        assert service[0].requests[0][0] == service[0].requests[1][0]  # one pooled connection
+
+    def test_failure_holds_off(self, service):
+        service[0].status = 503
+
+        async def run():
+            client = DocStoreClient(service[1], FAST)
+            try:
+                first = await client.retrieve("mining", 3)
+                service[0].status = 200
+                return first, await client.retrieve("mining", 3), client.snapshot()
+            finally:
+                await client.close()
+        first, second, snap = asyncio.run(run())
+        assert first is None and second is None  # not asked again until retry_s passes
+        assert len(service[0].requests) == 1
+        assert snap["failed"] == 1 and snap["skipped"] == 1 and snap["up"] is False
+        assert "503" in snap["last_error"]
+
+    def test_statistics_are_cached(self, service):
+        async def run():
+            client = DocStoreClient(service[1], FAST)
+            try:
+                first = await client.statistics()
+                service[0].docs["new_order.txt"] = "Fresh order."
+                cached = await client.statistics()
+                client._stats = (cached, time.monotonic() - FAST["stats_ttl_s"])
+                return first, cached, await client.statistics()
+            finally:
+                await client.close()
+        first, cached, expired = asyncio.run(run())
+        assert first["file_count"] == cached["file_count"] == 2 and expired["file_count"] == 3
+        assert [r[1] for r in service[0].requests] == ["/v1/statistics"] * 2
+
+    def test_disabled(self):
+        assert asyncio.run(DocStoreClient("", FAST).retrieve("mining", 3)) is None
+
+
+# ── /api/legal ─────────────────────────────────────────────────────────────────
+
+class TestLegalEndpoint:
+    def test_answers_from_the_service(self, api, service):
+        client, _ = api
+        body = client.get("/api/legal", params={"q": "unauthorized mining"}).json()
+        assert body["method"] == "DocumentStore" and body["indexed_documents"] == 2
+        assert body["answer"].startswith("Unauthorized mining")
+        assert body["sources"] == ["sand_mining_order.txt"] and body["confidence"] > 0
+        service[0].docs["sand_mining_order.txt"] = "Dolphins only."  # the live index changed
+        body = client.get("/api/legal", params={"q": "unauthorized mining"}).json()
+        assert body["sources"] == [] and body["method"] == "DocumentStore"
+        asked = [r[1] for r in service[0].requests]
+        assert asked.count("/v1/statistics") == 1 and asked.count("/v1/retrieve") == 2
+
+    def test_falls_back_to_local_index(self, api, service):
+        client, docstore = api
+        service[0].status = 500
+        body = client.get("/api/legal", params={"q": "sand mining"}).json()
+        assert body["method"] == "BM25"
+        assert client.get("/api/health").json()["docstore"]["up"] is False
@@ -0,0 +1,55 @@
+"""
+Tests for content-addressed evidence packages.
+Run with: pytest tests/ -v
+"""
+from evidence import EvidenceIndex, EvidenceStore, build_package, case_id_for
+
+from conftest import evidence_frames
+
+
+# ── Package construction ───────────────────────────────────────────────────────
+
+class TestBuildPackage:
+    def test_case_id_uses_data_date_and_opening_time(self):
+        assert case_id_for("Zone9", "2026-03-01T05:00:00") == "NGT-20260301-Zone9-050000"
+
+    def test_package_is_deterministic(self):
+        alert, d, m = evidence_frames()
+        assert build_package(alert, d, m) == build_package(alert, d, m)
+
+    def test_package_contains_only_alert_zone(self):
+        alert, d, m = evidence_frames()
+        pkg = build_package(alert, d, m)
+        assert len(pkg["dolphin_window"]["samples"]) == 6
+        assert [e["confidence"] for e in pkg["mining_events"]] == [0.94]
+
+    def test_package_carries_legal_context(self):
+        pkg = build_package(*evidence_frames())
+        assert "IPC §379" in pkg["legal_sections"]
+        assert all("order_no" in c and "penalties" in c for c in pkg["ngt_clauses"])
+
+
+# ── Store and index ────────────────────────────────────────────────────────────
+
+class TestEvidenceStore:
+    def test_byte_identical_across_restarts(self, tmp_path):
+        alert, d, m = evidence_frames()
+        assert EvidenceStore(tmp_path / "a").record(alert, d, m)
+        assert EvidenceStore(tmp_path / "b").record(alert, d, m)
+        a = EvidenceIndex(tmp_path / "a").get_bytes(alert["case_id"])
+        b = EvidenceIndex(tmp_path / "b").get_bytes(alert["case_id"])
+        assert a is not None and a == b
+
+    def test_unchanged_package_is_not_reindexed(self, tmp_path):
+        alert, d, m = evidence_frames()
+        store = EvidenceStore(tmp_path)
+        assert store.record(alert, d, m)
+        assert not EvidenceStore(tmp_path).record(alert, d, m)
+
+    def test_index_lookup_by_zone(self, tmp_path):
+        alert, d, m = evidence_frames()
+        EvidenceStore(tmp_path).record(alert, d, m)
+        index = EvidenceIndex(tmp_path)
+        assert [p["case_id"] for p in index.list("Zone9")] == [alert["case_id"]]
+        assert index.list("Zone7") == []
+        assert index.get_bytes("NGT-missing") is None
@@ -0,0 +1,204 @@
+"""
+Tests for the federated multi-basin API: real basin APIs as local processes,
+one federating app in front of them.
+Run with: pytest tests/ -v
+"""
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from config import FEDERATION_CONFIG
+from federation import Federation, parse_backends
+
+httpx = pytest.importorskip("httpx")
+
+REPO = Path(__file__).resolve().parent.parent
+FAST = dict(FEDERATION_CONFIG, timeout_s=10.0, cache_ttl_s=0.0)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _stats_rows(counts):
+    return "".join(json.dumps({"zone": z, "dolphin_count": n, "avg_48h": 30.0, "min_48h": n,
+                               "max_48h": 40, "total_samples": 10, "mining_conf": 0.9}) + "\n"
+                   for z, n in counts.items())
+
+
+def _basin(home, counts, orders=False):
+    (home / "output").mkdir(parents=True)
+    (home / "output" / "stats.jsonl").write_text(_stats_rows(counts))
+    (home / "output" / "alerts.jsonl").write_text("")
+    if orders:
+        shutil.copytree(REPO / "data" / "ngt_orders", home / "data" / "ngt_orders")
+
+
+def _serve(home):
+    """One basin API (uvicorn app:app) over `home`; returns (process, base url)."""
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level",
+         "warning"], cwd=REPO, env=dict(os.environ, JALJEEVAN_HOME=str(home)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url + "/api/health", timeout=1):
+                return proc, url
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("basin API did not start")
+
+
+GANGA = {"Zone7": 41, "Zone8": 12, "Zone9": 30, "Zone10": 5}
+YAMUNA = {"Zone7": 18, "Zone2": 33, "Zone3": 12}
+
+
+@pytest.fixture(scope="module")
+def basins(tmp_path_factory):
+    root = tmp_path_factory.mktemp("basins")
+    _basin(root / "ganga", GANGA, orders=True)
+    _basin(root / "yamuna", YAMUNA)
+    procs = {}
+    try:
+        for name in ("ganga", "yamuna"):
+            procs[name] = _serve(root / name)
+        yield {name: url for name, (_, url) in procs.items()}, root
+    finally:
+        for proc, _ in procs.values():
+            proc.terminate()
+            proc.wait(10)
+
+
+@pytest.fixture
+def federated(basins, monkeypatch):
+    """TestClient of an app federating `backends` (the two basins by default)."""
+    from fastapi.testclient import TestClient
+    import app
+    clients = []
+
+    def make(backends=None, cfg=FAST):
+        monkeypatch.setattr(app, "FEDERATION", Federation(backends or basins[0], cfg))
+        client = TestClient(app.app)
+        client.__enter__()
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.__exit__(None, None, None)
+
+
+# ── Config ─────────────────────────────────────────────────────────────────────
+
+class TestBackends:
+    def test_parse(self):
+        assert parse_backends(" ganga=http://a:8000/, yamuna=http://b:8000 ,") == {
+            "ganga": "http://a:8000", "yamuna": "http://b:8000"}
+        assert parse_backends("") == {}
+        with pytest.raises(ValueError):
+            parse_backends("http://a:8000")
+
+
+# ── Merged reads ───────────────────────────────────────────────────────────────
+
+class TestScatterGather:
+    def test_pages_walk_the_merged_order(self, federated):
+        client = federated()
+        expected = sorted([(n, f"ganga/{z}") for z, n in GANGA.items()]
+                          + [(n, f"yamuna/{z}") for z, n in YAMUNA.items()], reverse=True)
+        seen, cursor = [], ""
+        for _ in range(10):
+            r = client.get("/api/stats", params={"sort": "-dolphin_count", "limit": 2,
+                                                 "cursor": cursor})
+            assert r.status_code == 200 and r.headers["X-Total-Count"] == "7"
+            assert "X-Federation-Failed" not in r.headers
+            seen += [(row["dolphin_count"], row["zone"]) for row in r.json()]
+            cursor = r.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        assert seen == expected
+        rows = client.get("/api/stats", params={"sort": "zone"}).json()
+        assert [r["zone"] for r in rows] == sorted(z for _, z in expected)
+        assert {r["basin"] for r in rows} == {"ganga", "yamuna"}
+
+    def test_bad_sort_and_cursor(self, federated):
+        client = federated()
+        assert client.get("/api/stats", params={"sort": "nope"}).status_code == 400
+        assert client.get("/api/stats", params={"cursor": "xx"}).status_code == 400
+
+    def test_changes(self, federated, basins):
+        client = federated()
+        first = client.get("/api/stats/changes").json()
+        assert first["full"] and len(first["rows"]) == 7
+        assert client.get("/api/stats/changes", params={"since": first["version"]}).json()[
+            "rows"] == []
+        with open(basins[1] / "yamuna" / "output" / "stats.jsonl", "a") as f:
+            f.write(_stats_rows({"Zone3": 2}))
+        delta = client.get("/api/stats/changes", params={"since": first["version"]}).json()
+        assert not delta["full"] and delta["federation"] == {"stale": [], "failed": []}
+        assert [(r["zone"], r["dolphin_count"]) for r in delta["rows"]] == [("yamuna/Zone3", 2)]
+
+    def test_legal_ranks_basins(self, federated):
+        body = federated().get("/api/legal", params={"q": "illegal sand mining"}).json()
+        assert body["basin"] == "ganga" and body["confidence"] > 0
+        assert body["sources"] and all(s.startswith("ganga/") for s in body["sources"])
+        assert body["indexed_documents"] == len(list((REPO / "data" / "ngt_orders").glob("*.txt")))
+
+
+# ── Failures ───────────────────────────────────────────────────────────────────
+
+class TestPartialAnswers:
+    def test_down_and_hung_backends_are_left_out(self, federated, basins):
+        hung = socket.socket()  # accepts connections, never answers
+        hung.bind(("127.0.0.1", 0))
+        hung.listen(8)
+        try:
+            backends = dict(basins[0], down=f"http://127.0.0.1:{_free_port()}",
+                            hung=f"http://127.0.0.1:{hung.getsockname()[1]}")
+            client = federated(backends, dict(FAST, timeouts={"hung": 0.3}))
+            client.get("/api/stats")  # basin APIs import pandas on their first request
+            started = time.monotonic()
+            r = client.get("/api/stats", params={"sort": "-dolphin_count", "limit": 3})
+            assert time.monotonic() - started < 2  # the hung basin costs its own timeout only
+            assert r.status_code == 200 and len(r.json()) == 3
+            assert r.headers["X-Federation-Failed"] == "down,hung"
+            health = client.get("/api/federation").json()["backends"]
+            assert health["hung"]["failed"] == 2 and health["hung"]["timeout_s"] == 0.3
+            assert health["ganga"]["ok"] == 2
+        finally:
+            hung.close()
+
+    def test_stale_answer_after_backend_dies(self, federated, tmp_path):
+        _basin(tmp_path / "brahmaputra", {"Zone1": 7})
+        proc, url = _serve(tmp_path / "brahmaputra")
+        try:
+            client = federated({"brahmaputra": url})
+            assert client.get("/api/stats").json()[0]["zone"] == "brahmaputra/Zone1"
+        finally:
+            proc.terminate()
+            proc.wait(10)
+        r = client.get("/api/stats")
+        assert r.status_code == 200 and r.headers["X-Federation-Stale"] == "brahmaputra"
+        assert r.json()[0]["dolphin_count"] == 7
+        assert federated({"gone": url}).get("/api/stats").status_code == 502
+
+    def test_merged_answers_are_cached(self, federated):
+        client = federated(cfg=dict(FAST, cache_ttl_s=60))
+        for _ in range(3):
+            assert client.get("/api/stats", params={"limit": 2}).status_code == 200
+        health = client.get("/api/federation").json()["backends"]
+        assert health["ganga"]["ok"] == 1 and health["yamuna"]["ok"] == 1
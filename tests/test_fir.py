@@ -0,0 +1,223 @@
+"""
+Tests for the FIR registry and the batched submitter (against a local stub server).
+Run with: pytest tests/ -v
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from config import FIR_CONFIG
+from fir import FAILED, QUEUED, SUBMITTED, FirRegistry, FirSubmitter, IdempotencyConflict
+
+pytest.importorskip("httpx")
+
+FAST = dict(FIR_CONFIG, batch_size=50, backoff_base_s=0.001, backoff_cap_s=0.01, timeout_s=5)
+
+
+def _file(reg, n, start=0):
+    for i in range(start, start + n):
+        reg.file(f"NGT-20260301-Z{i}", {"evidence_hash": f"h{i}"}, incident_id=f"Z{i}-1",
+                 zone=f"Z{i}")
+
+
+# ── Stub authority ─────────────────────────────────────────────────────────────
+
+class _Authority(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.requests.append((self.client_address, body))
+        status, reply = server.script.pop(0) if server.script else (200, None)
+        if reply is None:
+            reply = {"accepted": [{"fir_number": f["fir_number"],
+                                   "reference": "DM-" + f["fir_number"][-6:]}
+                                  for f in body["filings"]]}
+        data = json.dumps(reply).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def authority():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Authority)
+    server.requests, server.script = [], []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}/intake"
+    server.shutdown()
+    server.server_close()
+
+
+def _drain(sub, timeout=5.0):
+    async def run():
+        deadline = time.monotonic() + timeout
+        try:
+            while sub.registry.counts().get(QUEUED) and time.monotonic() < deadline:
+                if not await sub.flush():
+                    await asyncio.sleep(0.005)
+        finally:
+            await sub.close()
+    asyncio.run(run())
+
+
+# ── Registry ───────────────────────────────────────────────────────────────────
+
+class TestFirRegistry:
+    def test_filing_is_idempotent_and_durable(self, tmp_path):
+        reg = FirRegistry(tmp_path / "fir.db")
+        first, created = reg.file("NGT-1", {"evidence_hash": "a"}, idempotency_key="k1",
+                                  incident_id="Zone9-1")
+        again, created_again = reg.file("NGT-1", {"evidence_hash": "b"})
+        assert created and not created_again
+        assert again["fir_number"] == first["fir_number"] and again["evidence_hash"] == "a"
+        with pytest.raises(IdempotencyConflict):
+            reg.file("NGT-2", {}, idempotency_key="k1")
+        reg.close()
+        reopened = FirRegistry(tmp_path / "fir.db")
+        assert reopened.by_key("k1")["case_id"] == "NGT-1"
+        assert [r["case_id"] for r in reopened.by_incident("Zone9-1")] == ["NGT-1"]
+
+    def test_claim_leases_rows(self, tmp_path):
+        reg = FirRegistry(tmp_path / "fir.db")
+        _file(reg, 3)
+        now = time.time()
+        assert len(reg.claim(10, lease_s=30, now=now)) == 3
+        assert reg.claim(10, lease_s=30, now=now + 1) == []
+        assert len(reg.claim(10, lease_s=30, now=now + 31)) == 3
+
+
+# ── Submitter ──────────────────────────────────────────────────────────────────
+
+class TestFirSubmitter:
+    def test_batches_over_one_pooled_connection(self, tmp_path, authority):
+        server, url = authority
+        reg = FirRegistry(tmp_path / "fir.db")
+        _file(reg, 120)
+        sub = FirSubmitter(reg, url, cfg=FAST)
+        _drain(sub)
+        assert reg.counts() == {SUBMITTED: 120}
+        assert [len(body["filings"]) for _, body in server.requests] == [50, 50, 20]
+        assert len({addr for addr, _ in server.requests}) == 1  # one keep-alive connection
+        assert reg.get("NGT-20260301-Z7")["reference"].startswith("DM-")
+        snap = sub.snapshot()
+        assert snap["submitted"] == 120 and snap["queue_depth"] == 0
+        assert snap["throughput_per_s"] == 2.0
+
+    def test_retries_transient_errors_with_backoff(self, tmp_path, authority):
+        server, url = authority
+        server.script = [(503, {}), (429, {})]
+        reg = FirRegistry(tmp_path / "fir.db")
+        _file(reg, 5)
+        sub = FirSubmitter(reg, url, cfg=FAST, rng=random.Random(1))
+        _drain(sub)
+        assert reg.counts() == {SUBMITTED: 5}
+        failed = [len(body["filings"]) for _, body in server.requests[:2]]
+        assert failed[0] == 5  # jitter may split the retries across later flushes
+        assert sub.metrics["retried"] == sum(failed)
+        assert reg.get("NGT-20260301-Z0")["attempts"] >= 2
+
+    def test_rejections_and_exhausted_retries_fail(self, tmp_path, authority):
+        server, url = authority
+        reg = FirRegistry(tmp_path / "fir.db")
+        _file(reg, 2)
+        first = reg.get("NGT-20260301-Z0")["fir_number"]
+        server.script = [(200, {"rejected": [{"fir_number": first, "error": "bad zone"}]})]
+        sub = FirSubmitter(reg, url, cfg=dict(FAST, max_attempts=2))
+        _drain(sub)  # Z0 rejected; Z1 unacknowledged -> retried -> accepted
+        assert reg.get("NGT-20260301-Z0")["status"] == FAILED
+        assert reg.get("NGT-20260301-Z0")["last_error"] == "bad zone"
+        assert reg.get("NGT-20260301-Z1")["status"] == SUBMITTED
+
+        _file(reg, 1, start=5)
+        server.script = [(500, {})] * 5
+        _drain(FirSubmitter(reg, url, cfg=dict(FAST, max_attempts=2)))
+        assert reg.get("NGT-20260301-Z5")["status"] == FAILED
+
+    def test_malformed_reply_items_are_ignored(self, tmp_path, authority):
+        server, url = authority
+        reg = FirRegistry(tmp_path / "fir.db")
+        _file(reg, 2)
+        first = reg.get("NGT-20260301-Z0")["fir_number"]
+        server.script = [(200, {"accepted": [{"reference": "R0"}, "junk",
+                                             {"fir_number": first, "reference": "R1"}],
+                                "rejected": {"fir_number": "x"}})]
+        _drain(FirSubmitter(reg, url, cfg=FAST))  # Z1 unacknowledged -> retried -> accepted
+        assert reg.get("NGT-20260301-Z0")["reference"] == "R1"
+        assert reg.counts() == {SUBMITTED: 2}
+
+    def test_run_outlives_unexpected_errors(self, tmp_path):
+        sub = FirSubmitter(FirRegistry(tmp_path / "fir.db"), "http://x",
+                           cfg=dict(FAST, interval_s=0.01))
+        calls = []
+
+        async def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("httpx is required to submit FIRs")
+            return 0
+        sub.flush = flaky
+
+        async def run_briefly():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(sub.run(), 0.2)
+        asyncio.run(run_briefly())
+        assert len(calls) > 2 and sub.metrics["errors"] == 1
+        assert sub.metrics["last_error"] == "RuntimeError: httpx is required to submit FIRs"
+
+    def test_backoff_is_jittered_and_capped(self, tmp_path):
+        sub = FirSubmitter(FirRegistry(tmp_path / "fir.db"), "", rng=random.Random(3),
+                           cfg=dict(FIR_CONFIG, backoff_base_s=1.0, backoff_cap_s=60.0))
+        delays = [sub.backoff(10) for _ in range(200)]
+        assert max(delays) <= 60.0 and min(delays) >= 0
+        assert len(set(delays)) == 200
+
+
+# ── API ────────────────────────────────────────────────────────────────────────
+
+class TestFirAPI:
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        from fastapi.testclient import TestClient
+        import app
+        from evidence import EvidenceIndex, EvidenceStore
+        EvidenceStore(tmp_path / "evidence").put({
+            "case_id": "NGT-20260301-Zone9", "incident_id": "Zone9-1", "zone": "Zone9",
+            "status": "ready_for_filing", "alert": {"decline_pct": 31.0}, "content_hash": "abc",
+        })
+        reg = FirRegistry(tmp_path / "fir.db")
+        monkeypatch.setattr(app, "EVIDENCE", EvidenceIndex(tmp_path / "evidence"))
+        monkeypatch.setattr(app, "FIRS", reg)
+        monkeypatch.setattr(app, "SUBMITTER", FirSubmitter(reg, ""))
+        return TestClient(app.app)
+
+    def test_post_is_idempotent(self, client):
+        r = client.post("/api/fir/NGT-20260301-Zone9", headers={"Idempotency-Key": "x1"})
+        assert r.status_code == 201
+        body = r.json()
+        assert body["status"] == QUEUED and body["evidence"] == ["abc"]
+        assert body["incident_id"] == "Zone9-1"
+        again = client.post("/api/fir/NGT-20260301-Zone9")
+        assert again.status_code == 200 and again.json()["fir_number"] == body["fir_number"]
+        assert client.get("/api/fir/NGT-20260301-Zone9").json()["fir_number"] == body["fir_number"]
+        assert client.get("/api/fir/metrics").json()["queue_depth"] == 1
+
+    def test_unknown_case_and_key_conflict(self, client):
+        assert client.post("/api/fir/NGT-19990101-ZoneX").status_code == 404
+        assert client.get("/api/fir/NGT-19990101-ZoneX").status_code == 404
+        client.post("/api/fir/NGT-20260301-Zone9", headers={"Idempotency-Key": "x1"})
+        import app
+        app.FIRS.file("NGT-other", {}, idempotency_key="x2")
+        r = client.post("/api/fir/NGT-20260301-Zone9", headers={"Idempotency-Key": "x2"})
+        assert r.status_code == 409
@@ -0,0 +1,134 @@
+"""
+Tests for the vectorized Holt-Winters dolphin count forecasts and the early
+warning on stats rows / evidence packages.
+Run with: pytest tests/ -v
+"""
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+import pipeline
+from checkpoint import read_checkpoint, write_checkpoint
+from config import FORECAST_CONFIG
+from evidence import build_package
+from forecast import HoltWinters
+from lifecycle import forecast_summary
+
+from conftest import DOLPHIN_HEADER, T0, evidence_frames
+
+HOURS = pd.date_range(T0, periods=240, freq="h")
+DECLINE = [30] * 20 + [29, 29, 28, 28, 27, 27, 26, 26, 25, 25, 25]  # 31 hours
+
+
+def _fed(series, cfg=FORECAST_CONFIG):
+    """A forecaster fed {zone: hourly values from T0}."""
+    hw = HoltWinters(cfg)
+    zones = [z for z, values in series.items() for _ in values]
+    stamps = [t for values in series.values() for t in HOURS[:len(values)]]
+    hw.observe(zones, stamps, [v for values in series.values() for v in values])
+    return hw
+
+
+# ── Forecasts ──────────────────────────────────────────────────────────────────
+
+class TestHoltWinters:
+    def test_flat_series_stays_flat_inside_its_interval(self):
+        rng = np.random.default_rng(7)
+        hw = _fed({"Zone7": list(30 + rng.normal(0, 1, 72))})
+        point, lo, hi = hw.forecast(["Zone7"])
+        assert np.all(np.abs(point - 30) < 1.5)
+        assert np.all(lo < point) and np.all(point < hi)
+        assert np.all(np.diff(hi - lo) > 0)  # wider further ahead
+
+    def test_decline_is_flagged_before_the_threshold(self):
+        hw = _fed({"Zone9": DECLINE})
+        cols = hw.columns(["Zone9"], [DECLINE[-1]], [30.0])
+        assert cols["forecast_24h"][0] < cols["forecast_12h"][0] < cols["forecast_6h"][0] < 27
+        assert cols["forecast_cross_h"][0] == 24 and cols["forecast_decline_pct"][0] > 20
+        assert cols["forecast_warning"][0]  # 17% down now, projected past 20%
+        already = hw.columns(["Zone9"], [22.0], [30.0])  # past the threshold: the alert's job
+        assert not already["forecast_warning"][0]
+
+    def test_daily_season_is_learned(self):
+        def season(h):
+            return 30 + 6 * np.sin(2 * np.pi * h / 24)
+        hw = _fed({"Zone8": [season(h) for h in range(216)]})
+        point = hw.forecast(["Zone8"])[0][0]
+        truth = [season(215 + h) for h in FORECAST_CONFIG["horizons_h"]]  # from the open bin
+        assert np.all(np.abs(point - truth) < 1.5)
+
+    def test_unknown_and_warming_zones_are_nan(self):
+        hw = _fed({"Zone7": [30.0] * (FORECAST_CONFIG["warmup"] - 1)})
+        cols = hw.columns(["Zone7", "ZoneX"], [30, 30], [30, 30])
+        assert np.isnan(cols["forecast_6h"]).all() and np.isnan(cols["forecast_cross_h"]).all()
+        assert not cols["forecast_warning"].any()
+
+    def test_zones_are_independent_in_one_batch(self):
+        rng = np.random.default_rng(3)
+        series = {f"Z{i}": list(20 + rng.normal(0, 2, 48) - 0.1 * i * np.arange(48))
+                  for i in range(5)}
+        batch = _fed(series).forecast(list(series))
+        alone = [_fed({z: v}).forecast([z]) for z, v in series.items()]
+        for k in range(3):
+            assert np.allclose(batch[k], np.vstack([a[k] for a in alone]))
+
+    def test_late_rows_and_gaps(self):
+        hw = _fed({"Zone7": [30.0] * 20})
+        hw.observe(["Zone7"], [HOURS[5]], [99.0])
+        assert hw.late_rows == 1
+        hw.observe(["Zone7"], [HOURS[40]], [30.0])  # 20 idle hours in between
+        assert hw.n[hw.registry.intern("Zone7")] == 20
+        assert np.allclose(hw.forecast(["Zone7"])[0], 30)
+
+    def test_checkpoint_roundtrip(self, tmp_path):
+        hw = _fed({"Zone9": DECLINE, "Zone7": [30.0] * 31})
+        write_checkpoint(tmp_path / "c.bin", {"forecaster": hw.to_dict()})
+        restored = HoltWinters().load(read_checkpoint(tmp_path / "c.bin")["forecaster"])
+        for a, b in zip(hw.forecast(["Zone7", "Zone9"]), restored.forecast(["Zone7", "Zone9"])):
+            assert np.array_equal(a, b, equal_nan=True)
+        other = HoltWinters(dict(FORECAST_CONFIG, bin_minutes=30)).load(hw.to_dict())
+        assert not other.seen.any()  # different bins: starts fresh
+
+    def test_cost_is_flat_in_zone_count(self):
+        zones = [f"Z{i}" for i in range(20_000)]
+        hw = HoltWinters()
+        rng = np.random.default_rng(1)
+        for t in HOURS[:FORECAST_CONFIG["warmup"] + 2]:
+            hw.observe(zones, [t] * len(zones), rng.normal(30, 2, len(zones)))
+        started = time.perf_counter()
+        cols = hw.columns(zones, np.full(len(zones), 30.0), np.full(len(zones), 30.0))
+        assert time.perf_counter() - started < 1.0
+        assert np.isfinite(cols["forecast_24h"]).all()
+
+    def test_zones_added_one_at_a_time_grow_capacity_geometrically(self):
+        hw = HoltWinters()
+        grown = set()
+        for i in range(1000):
+            hw.observe([f"Z{i}"], [HOURS[0]], [30.0])
+            grown.add(len(hw.level))
+        assert len(grown) <= 12 and len(hw.level) >= 1000
+        assert len(hw.to_dict()["level"]) == 1000  # spare capacity is not checkpointed
+        assert np.allclose(hw.bin_sum[hw.registry.codes([f"Z{i}" for i in range(1000)])], 30.0)
+
+
+# ── Engine ─────────────────────────────────────────────────────────────────────
+
+class TestEngineForecasts:
+    def test_stats_rows_and_evidence_carry_the_forecast(self, engine):
+        engine["DOLPHIN_CSV"].write_text(DOLPHIN_HEADER + "".join(
+            f"{t.isoformat()},Zone9,{v},0.9\n" for t, v in zip(HOURS, DECLINE)))
+        rows = pipeline._tick(pipeline._PersistenceStore())
+        row = next(r for r in rows if r["zone"] == "Zone9")
+        assert row["decline_pct"] < 20 and bool(row["forecast_warning"])
+        assert row["forecast_cross_h"] == 24
+        stored = json.loads(engine["STATS_JSONL"].read_text().splitlines()[-1])
+        assert stored["forecast_warning"] is True and "forecast_24h_hi" in stored
+
+        summary = forecast_summary(row)
+        assert [h["hours"] for h in summary["horizons"]] == list(FORECAST_CONFIG["horizons_h"])
+        assert summary["warning"] and summary["cross_h"] == 24.0
+        alert, d, m = evidence_frames()
+        assert build_package(dict(alert, forecast=summary), d, m)["forecast"] == summary
+        assert build_package(alert, d, m)["forecast"] is None
@@ -0,0 +1,113 @@
+"""
+Tests for the differential engine harness (stream generation, normalization,
+engine equivalence on a small stream) and the startup budget.
+Run with: pytest tests/ -v
+"""
+import json
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+import harness
+
+SMALL = dict(zones=3, hours=12, rate=4, late=0.1, disorder=0.3, seed=7)
+
+
+def _stats(zone, count, **kw):
+    return dict({k: None for k in harness.STATS_KEYS}, zone=zone, dolphin_count=count, **kw)
+
+
+# ── Generation ─────────────────────────────────────────────────────────────────
+
+class TestGenerate:
+    def test_deterministic_with_late_and_disordered_rows(self, tmp_path):
+        assert harness.generate(tmp_path / "a", **SMALL) == SMALL["hours"]
+        harness.generate(tmp_path / "b", **SMALL)
+        a = (tmp_path / "a" / "stream.csv").read_bytes()
+        assert a == (tmp_path / "b" / "stream.csv").read_bytes()
+        d = pd.read_csv(tmp_path / "a" / "stream.csv")
+        hour = (pd.to_datetime(d["timestamp"]) - harness.START) // pd.Timedelta(hours=1)
+        assert (hour < d["batch"]).any()  # late: arrives in a later batch
+        ts = pd.to_datetime(d["timestamp"])
+        assert (ts.diff().dt.total_seconds() < 0).any()  # out of order within the file
+        assert len(json.loads((tmp_path / "a" / "data" / "zones.json").read_text())) == 3
+
+    def test_zone_count(self, tmp_path):
+        harness.generate(tmp_path, **dict(SMALL, zones=25, hours=2))
+        assert pd.read_csv(tmp_path / "stream.csv")["zone"].nunique() == 25
+
+
+# ── Normalization / comparison ─────────────────────────────────────────────────
+
+class TestNormalize:
+    def test_pathway_retractions(self):
+        rows = [
+            dict(_stats("Z1", 5), time=2, diff=1),
+            dict(_stats("Z1", 6), time=4, diff=1),  # insertion listed before its retraction
+            dict(_stats("Z1", 5), time=4, diff=-1),
+            dict(_stats("Z2", 9), time=2, diff=1),
+            dict(_stats("Z2", 9), time=6, diff=-1),
+        ]
+        assert {z: r["dolphin_count"] for z, r in harness.normalize_stats(rows).items()} == {
+            "Z1": 6}
+
+    def test_timestamps_and_tolerance(self):
+        a = {"stats": harness.normalize_stats([_stats("Z1", 5, avg_48h=10.123,
+                                                      observed_at="2026-03-01 05:00:00")]),
+             "alerts": {}}
+        b = {"stats": harness.normalize_stats([_stats("Z1", 5, avg_48h=10.12,
+                                                      observed_at="2026-03-01T05:00:00")]),
+             "alerts": {}}
+        assert harness.compare(a, b) == []
+        b["stats"]["Z1"]["dolphin_count"] = 4
+        assert harness.compare(a, b) == ["stats Z1.dolphin_count: 5 != 4"]
+
+    def test_regressions_against_baseline(self):
+        base = {"scenarios": {"basic": {"simulation": {"runtime_s": 1.0, "peak_rss_mb": 100}}}}
+        report = {"basic": {"simulation": {"runtime_s": 2.5, "peak_rss_mb": 120}}}
+        assert harness.regressions(report, base, 2.0) == [
+            "basic/simulation runtime_s: 2.5 > 2.0 x 1.0"]
+
+
+# ── Engines ────────────────────────────────────────────────────────────────────
+
+class TestEngines:
+    def test_warm_restart_matches_continuous_run(self, tmp_path):
+        ref = harness.run_engine("simulation", tmp_path / "ref", SMALL)
+        other = harness.run_engine("simulation-restart", tmp_path / "restart", SMALL)
+        assert len(ref["stats"]) == 3 and ref["alerts"]
+        assert ref["runtime_s"] > 0
+        assert harness.compare(ref, other) == []
+
+    @pytest.mark.skipif("pathway" not in harness.available_engines(),
+                        reason="real Pathway not installed (or PATHWAY_REAL=0)")
+    def test_pathway_matches_simulation(self, tmp_path):
+        ref = harness.run_engine("simulation", tmp_path / "ref", SMALL)
+        other = harness.run_engine("pathway", tmp_path / "pw", SMALL)
+        assert harness.compare(ref, other) == []
+
+    def test_baseline_is_tracked(self):
+        baseline = harness.load_baseline()
+        for name in harness.SCENARIOS:
+            entry = baseline["scenarios"][name][harness.REFERENCE]
+            assert entry["runtime_s"] > 0 and entry["zones"] > 0
+
+
+# ── Startup ────────────────────────────────────────────────────────────────────
+
+class TestStartup:
+    def test_api_import_skips_data_libraries(self):
+        probe = ("import sys, app; print(','.join(m for m in ('pandas', 'pyarrow', 'uvicorn')"
+                 " if m in sys.modules))")
+        out = subprocess.run([sys.executable, "-c", probe], cwd=harness.REPO,
+                             capture_output=True, text=True, check=True)
+        assert out.stdout.strip() == ""
+
+    def test_within_budget(self, tmp_path):
+        startup = harness.measure_startup(tmp_path / "home")
+        assert set(startup) == set(harness.STARTUP_BUDGET_S)
+        assert harness.over_budget(startup) == []
+        assert (tmp_path / "home" / "output" / "legal_index.json").exists()
+        assert harness.over_budget({"api_health_s": 9.0}) == ["api_health_s: 9.0 s > 2.0 s"]
@@ -0,0 +1,143 @@
+"""
+Tests for the NGT legal clause index.
+Run with: pytest tests/ -v
+"""
+import os
+
+import pytest
+
+from config import NGT_DIR
+from legal import ClauseIndex, parse_order
+
+ORDER = """NATIONAL GREEN TRIBUNAL
+Original Application No. 38/2024
+
+IN THE MATTER OF: Illegal Sand Mining at Mirzapur
+
+ORDER DATED: 15 January 2024
+
+To stop illegal sand mining the District Magistrate shall:
+a) File FIR against violators under IPC Section 379
+b) Submit action taken report within 2 weeks
+
+PENALTIES
+- Unauthorized mining: ₹50 lakh + 3 years imprisonment
+- Water pollution: ₹5 lakh per day of non-compliance
+
+STANDARDS
+- Maintain BOD below 30 mg/L and DO above 4 mg/L
+- pH: 6.5 to 8.5
+"""
+
+
+def _bump(path, text):
+    path.write_text(text)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+# ── Extraction ─────────────────────────────────────────────────────────────────
+
+class TestParseOrder:
+    def test_header_fields(self):
+        order = parse_order(ORDER, "a.txt")
+        assert order["order_no"] == "O.A. 38/2024"
+        assert order["date"] == "2024-01-15"
+        assert order["subject"] == "Illegal Sand Mining at Mirzapur"
+
+    def test_items_and_tags(self):
+        order = parse_order(ORDER, "a.txt")
+        assert [s["section"] for s in order["sections"]] == ["IPC §379"]
+        mining, pollution = order["penalties"]
+        assert (mining["fine_inr"], mining["prison_years"]) == (5_000_000, 3)
+        assert mining["violations"] == ["sand_mining"]
+        assert pollution["violations"] == ["water_pollution"]
+        assert order["deadlines"][0]["hours"] == 14 * 24
+        bounds = {t["parameter"]: (t.get("min"), t.get("max")) for t in order["thresholds"]}
+        assert bounds == {"BOD": (None, 30.0), "DO": (4.0, None), "pH": (6.5, 8.5)}
+
+    def test_shipped_orders(self):
+        index = ClauseIndex(NGT_DIR)
+        assert len(index) >= 3 and index.error is None
+        assert "IPC §379" in index.sections(("sand_mining", "dolphin_harm"))
+        assert "O.A. 38/2024" in [c["order_no"] for c in index.lookup("sand_mining")]
+
+
+# ── Index ──────────────────────────────────────────────────────────────────────
+
+class TestClauseIndex:
+    def test_lookup_keeps_only_matching_items(self, tmp_path):
+        (tmp_path / "a.txt").write_text(ORDER)
+        index = ClauseIndex(tmp_path)
+        (mining,) = index.lookup("sand_mining")
+        assert [p["text"] for p in mining["penalties"]] == [
+            "Unauthorized mining: ₹50 lakh + 3 years imprisonment"]
+        (pollution,) = index.lookup("water_pollution")
+        assert pollution["sections"] == [] and len(pollution["penalties"]) == 1
+        assert index.lookup("sewage") == []
+        both = index.lookup(("sand_mining", "water_pollution"))
+        assert both is index.lookup(("sand_mining", "water_pollution"))  # memoized
+        assert len(both[0]["penalties"]) == 2
+
+    def test_incremental_reload(self, tmp_path, monkeypatch):
+        (tmp_path / "a.txt").write_text(ORDER)
+        (tmp_path / "b.txt").write_text(ORDER.replace("38/2024", "39/2024"))
+        index = ClauseIndex(tmp_path, check_s=0)
+        parsed = []
+        import legal
+        real = legal.parse_order
+        monkeypatch.setattr(legal, "parse_order", lambda t, s: parsed.append(s) or real(t, s))
+        version = index.refresh().version
+        assert parsed == [] and index.version == version
+        _bump(tmp_path / "b.txt", ORDER.replace("38/2024", "40/2024"))
+        index.refresh()
+        assert parsed == ["b.txt"] and index.version == version + 1
+        assert {c["order_no"] for c in index.lookup("sand_mining")} == {
+            "O.A. 38/2024", "O.A. 40/2024"}
+        (tmp_path / "a.txt").unlink()
+        assert [c["order_no"] for c in index.refresh().lookup("sand_mining")] == ["O.A. 40/2024"]
+
+    def test_starts_from_saved_artifact(self, tmp_path):
+        orders = tmp_path / "orders"
+        orders.mkdir()
+        (orders / "a.txt").write_text(ORDER)
+        (orders / "b.txt").write_text(ORDER.replace("38/2024", "39/2024"))
+        built = ClauseIndex(orders)
+        artifact = built.save(tmp_path / "legal_index.json")
+        loaded = ClauseIndex(orders, check_s=0, artifact=artifact)
+        assert built.parsed == 2 and loaded.parsed == 0
+        assert loaded.lookup("sand_mining") == built.lookup("sand_mining")
+        assert loaded.search(["imprisonment"]) == built.search(["imprisonment"])
+        _bump(orders / "b.txt", ORDER.replace("38/2024", "40/2024"))
+        assert ClauseIndex(orders, artifact=artifact).parsed == 1  # only the changed file
+        assert ClauseIndex(tmp_path, artifact=artifact).parsed == 0  # other root: ignored
+
+    def test_search(self, tmp_path):
+        (tmp_path / "a.txt").write_text(ORDER)
+        (tmp_path / "b.txt").write_text("Sewage order\n\nSTP upgrades within 2 months")
+        index = ClauseIndex(tmp_path)
+        (hits, name, para), = index.search(["mining", "penalties"])
+        assert name == "a.txt" and hits == 4 and para.startswith("IN THE MATTER OF")
+        assert [r[1] for r in index.search(["within"])] == ["b.txt", "a.txt"]
+        assert index.search(["xyzzy"]) == []
+
+    def test_unreadable_file_keeps_previous_parse(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text(ORDER)
+        index = ClauseIndex(tmp_path, check_s=0)
+        path.write_bytes(b"\xff\xfe bad")
+        index.refresh()
+        assert index.error and index.lookup("sand_mining")[0]["order_no"] == "O.A. 38/2024"
+
+
+# ── API ────────────────────────────────────────────────────────────────────────
+
+class TestLegalAPI:
+    def test_clauses_endpoint(self):
+        pytest.importorskip("httpx")
+        from fastapi.testclient import TestClient
+        import app
+        client = TestClient(app.app)
+        body = client.get("/api/legal/clauses", params={"violation": "sand_mining"}).json()
+        assert "IPC §379" in body["sections"] and body["clauses"]
+        assert client.get("/api/legal/clauses", params={"violation": "x"}).status_code == 400
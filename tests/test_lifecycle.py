@@ -0,0 +1,97 @@
+"""
+Tests for the per-zone alert lifecycle state machine.
+Run with: pytest tests/ -v
+"""
+from lifecycle import AlertLifecycle, decline_pct
+
+
+def _row(count, avg=20.0, mining=True, minute=0, zone="Zone9"):
+    return {
+        "zone": zone, "dolphin_count": count, "avg_48h": avg, "mining_detected": mining,
+        "mining_conf": 0.94 if mining else None,
+        "observed_at": f"2026-03-01T10:{minute:02d}:00",
+    }
+
+
+def _events(lc, rows):
+    return [(r["event"], r["state"]) for r in map(lc.update, rows) if r is not None]
+
+
+# ── Transitions ────────────────────────────────────────────────────────────────
+
+class TestTransitions:
+    def test_decline_pct(self):
+        assert decline_pct(15, 20.0) == 25.0
+        assert decline_pct(15, 0) == 0.0
+
+    def test_no_alert_without_mining(self):
+        assert _events(AlertLifecycle(), [_row(10, mining=False)]) == []
+
+    def test_open_escalate_resolve(self):
+        rows = [_row(15, minute=0), _row(11, minute=1), _row(19, minute=2)]
+        assert _events(AlertLifecycle(), rows) == [
+            ("opened", "opened"), ("escalated", "escalated"), ("resolved", "resolved"),
+        ]
+
+    def test_incident_id_stable_across_updates(self):
+        lc = AlertLifecycle()
+        recs = [lc.update(r) for r in (_row(15, minute=0), _row(11, minute=5))]
+        assert recs[0]["incident_id"] == recs[1]["incident_id"]
+        assert recs[0]["case_id"] == recs[1]["case_id"]
+
+    def test_reopened_incident_gets_a_new_case(self):
+        lc = AlertLifecycle()
+        recs = [lc.update(r) for r in (_row(15, minute=0), _row(19, minute=1), _row(15, minute=2))]
+        assert [r["event"] for r in recs] == ["opened", "resolved", "opened"]
+        assert recs[0]["case_id"] != recs[2]["case_id"]  # same zone, same day
+
+
+# ── Noise suppression ──────────────────────────────────────────────────────────
+
+class TestHysteresis:
+    def test_small_deltas_are_suppressed(self):
+        rows = [_row(15.0, minute=0), _row(15.2, minute=1), _row(14.9, minute=2)]
+        assert _events(AlertLifecycle(), rows) == [("opened", "opened")]
+
+    def test_hovering_inside_band_does_not_resolve(self):
+        # 16.8/20 -> 16% decline: below open (20%) but not below resolve (15%)
+        rows = [_row(15, minute=0), _row(16.8, minute=1), _row(16.0, minute=2)]
+        assert _events(AlertLifecycle(), rows) == [("opened", "opened"), ("updated", "opened")]
+
+    def test_state_survives_restart(self, tmp_path):
+        path = tmp_path / "lifecycle.json"
+        lc = AlertLifecycle(path)
+        first = lc.update(_row(15))
+        lc.save()
+        again = AlertLifecycle(path)
+        assert again.update(_row(15.1, minute=1)) is None
+        assert again.active()["Zone9"]["incident_id"] == first["incident_id"]
+
+
+# ── Detector-driven incidents ──────────────────────────────────────────────────
+
+class TestDetectorTrigger:
+    def test_slow_onset_opens_without_static_thresholds(self):
+        anomaly = {"mining_anomaly": True, "dolphin_anomaly": True}
+        rec = AlertLifecycle().update(_row(18, mining=False), anomaly)
+        assert rec["event"] == "opened" and rec["trigger"] == "detector"
+
+    def test_detector_keeps_incident_open(self):
+        lc = AlertLifecycle()
+        lc.update(_row(15))
+        assert lc.update(_row(19.5, minute=1), {"dolphin_anomaly": True})["event"] == "updated"
+        assert lc.update(_row(19.5, minute=2))["event"] == "resolved"
+
+
+# ── Robust baseline ────────────────────────────────────────────────────────────
+
+class TestBaseline:
+    def test_median_baseline_ignores_skewed_average(self):
+        # one spike of 200 drags avg_48h up; the sketched median does not move
+        row = dict(_row(18, avg=38.0), p50_48h=20.0)
+        assert AlertLifecycle().update(row) is None
+        assert AlertLifecycle(baseline="avg_48h").update(row)["event"] == "opened"
+
+    def test_falls_back_to_average_without_sketch(self):
+        rec = AlertLifecycle().update(dict(_row(15), p50_48h=None))
+        assert rec["decline_pct"] == 25.0 and rec["p50_48h"] is None
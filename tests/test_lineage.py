@@ -0,0 +1,165 @@
+"""
+Tests for row lineage: ingest stamps through the engine into stats / alert
+rows, and the API's per-stage latency histograms and sampled traces.
+Run with: pytest tests/ -v
+"""
+import asyncio
+import json
+import time
+
+import pytest
+
+import pipeline
+from config import INGEST_COLUMN, LATENCY_CONFIG
+from lineage import LatencyHistogram, LatencyTracker, Lineage, stages
+from views import ZoneView
+
+from conftest import DOLPHIN_HEADER, dolphin_rows
+
+STAMPED_HEADER = DOLPHIN_HEADER.rstrip("\n") + f",{INGEST_COLUMN}\n"
+
+
+def _stamped(rows, at):
+    return "".join(f"{line},{at}\n" for line in rows.splitlines())
+
+
+def _lineage(emitted, ingested=None, read=None, rows=1):
+    return {"trace_id": f"Z@{emitted}", "rows": rows, "read": read, "emitted": emitted,
+            "ingested": [ingested, ingested] if ingested is not None else None}
+
+
+# ── Engine side ────────────────────────────────────────────────────────────────
+
+class TestLineage:
+    def test_rows_fold_per_zone_until_stamped(self):
+        lin = Lineage(clock=lambda: 100.0)
+        lin.read(["Z1", "Z2", "Z1"], [90.5, 91.0, None], read_at=95.0)
+        lin.read(["Z1"], ["89.25"], read_at=97.0)
+        stamp = lin.stamp("Z1", emitted_at=98.0)
+        assert stamp == {"trace_id": "Z1@98.000", "rows": 3, "ingested": [89.25, 90.5],
+                         "read": 95.0, "emitted": 98.0}
+        assert lin.stamp("Z1", 99.0)["rows"] == 0  # nothing new: the last read
+        assert lin.stamp("Z1", 99.0)["read"] == 97.0
+        assert lin.stamp("Z2")["emitted"] == 100.0
+
+    def test_unstamped_rows_have_no_ingest_time(self):
+        lin = Lineage()
+        lin.read(["Z1", "Z1"], None, read_at=5.0)
+        assert lin.stamp("Z1", 6.0)["ingested"] is None
+        assert stages(lin.stamp("Z1", 6.0), 7.0) == {"serve": 1000.0, "process": 1000.0,
+                                                     "total": 2000.0}
+
+
+class TestEngineLineage:
+    def test_stats_and_alerts_carry_lineage(self, engine):
+        before = time.time()
+        engine["DOLPHIN_CSV"].write_text(STAMPED_HEADER + _stamped(dolphin_rows(0, 12), before))
+        pipeline._tick(pipeline._PersistenceStore())
+        stats = [json.loads(ln) for ln in engine["STATS_JSONL"].read_text().splitlines()]
+        lineage = stats[-1]["lineage"]
+        assert lineage["rows"] == 13  # 12 dolphin rows + the zone's unstamped mining row
+        assert lineage["ingested"] == [round(before, 3)] * 2
+        assert lineage["ingested"][0] <= lineage["read"] <= lineage["emitted"] <= time.time()
+        alerts = [json.loads(ln) for ln in engine["ALERTS_JSONL"].read_text().splitlines()]
+        assert alerts and alerts[-1]["lineage"] == lineage
+
+    def test_lineage_does_not_defeat_exactly_once(self, engine):
+        store = pipeline._PersistenceStore()
+        pipeline._tick(store)
+        lines = engine["STATS_JSONL"].read_text().splitlines()
+        pipeline._tick(store)  # no new rows: same stats, new lineage
+        assert engine["STATS_JSONL"].read_text().splitlines() == lines
+        with open(engine["DOLPHIN_CSV"], "a") as f:
+            f.write(dolphin_rows(12, 4))
+        pipeline._tick(store)
+        row = json.loads(engine["STATS_JSONL"].read_text().splitlines()[-1])
+        assert row["lineage"]["rows"] == 4 and row["lineage"]["ingested"] is None
+        assert INGEST_COLUMN not in store.dolphins  # windows keep the sensor columns only
+
+
+# ── API side ───────────────────────────────────────────────────────────────────
+
+class TestLatencyTracker:
+    def test_histogram_quantiles_and_slo(self):
+        h = LatencyHistogram((10, 100, 1000), slo_ms=100)
+        h.observe(5, weight=98)
+        h.observe(400)
+        h.observe(3000)
+        snap = h.snapshot()
+        assert (snap["rows"], snap["over_slo"], snap["max_ms"]) == (100, 2, 3000)
+        assert (snap["p50_ms"], snap["p99_ms"]) == (10, 1000)
+        assert h.quantile(1.0) == 3000 and snap["buckets"]["inf"] == 1
+
+    def test_stages_are_weighted_by_rows_and_backlog_is_skipped(self):
+        tracker = LatencyTracker(clock=lambda: 1000.0)
+        tracker.visible("stats", [
+            {"zone": "Z1", "lineage": _lineage(1000.5, ingested=999.0, read=1000.0, rows=4)},
+            {"zone": "Z2", "lineage": _lineage(990.0, read=989.0)},  # written before start
+            {"zone": "Z3"},  # no lineage (older pipeline)
+        ], at=1001.0)
+        snap = tracker.snapshot()
+        assert snap["backlog_skipped"] == 1 and snap["records"] == 1
+        got = {stage: h["max_ms"] for stage, h in snap["stages"]["stats"].items()}
+        assert got == {"poll": 1000.0, "process": 500.0, "serve": 500.0, "total": 2000.0}
+        assert snap["stages"]["stats"]["total"]["rows"] == 4
+
+    def test_slow_traces_are_always_kept_others_sampled(self):
+        cfg = dict(LATENCY_CONFIG, sample_every=3, traces_per_zone=2, max_zones=2)
+        tracker = LatencyTracker(cfg, clock=lambda: 0.0)
+        for i in range(6):
+            tracker.visible("stats", [{"zone": "Z1", "lineage": _lineage(10.0 + i, read=10.0)}],
+                            at=10.5 + i)
+        kept = tracker.snapshot("Z1")["traces"]
+        assert [t["over_slo"] for t in kept] == [True, True]  # 3rd..6th took > 2 s; newest 2
+        assert kept[0]["stages_ms"]["total"] == 5500.0
+        for zone in ("Z2", "Z3"):
+            tracker.visible("alerts", [{"zone": zone, "lineage": _lineage(5.0, read=1.0)}], at=9.0)
+        assert list(tracker.traces) == ["Z2", "Z3"]  # least recently traced dropped
+        assert tracker.summary()["over_slo"] == 4
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        pytest.importorskip("httpx")
+        from fastapi.testclient import TestClient
+        import app
+        tracker = LatencyTracker(dict(LATENCY_CONFIG, sample_every=1))
+        path = tmp_path / "stats.jsonl"
+        path.touch()
+        monkeypatch.setattr(app, "LATENCY", tracker)
+        monkeypatch.setattr(app, "STATS", ZoneView(path, app.STATS_SORT, derive=app._with_status,
+                                                   visible=tracker.observer("stats")))
+        return TestClient(app.app), path
+
+    def test_rows_are_timed_when_the_api_first_serves_them(self, client):
+        client, path = client
+        now = time.time()
+        with open(path, "a") as f:
+            f.write(json.dumps({"zone": "Z1", "dolphin_count": 30, "avg_48h": 30.0,
+                                "lineage": _lineage(now, ingested=now - 1, read=now - 0.5)}))
+            f.write("\n")
+        assert client.get("/api/stats").json()[0]["zone"] == "Z1"
+        body = client.get("/api/latency", params={"zone": "Z1"}).json()
+        total = body["stages"]["stats"]["total"]
+        assert total["rows"] == 1 and 1000 <= total["max_ms"] < 1000 + 60_000
+        assert body["traces"][0]["trace_id"] == f"Z@{now}"
+        assert client.get("/api/latency", params={"zone": "Z2"}).json()["traces"] == []
+        assert client.get("/api/health").json()["latency"]["rows"] == 1
+
+    def test_sink_follower_outlives_refresh_errors(self, monkeypatch):
+        import app
+        refreshed = []
+
+        class _View:
+            def refresh(self):
+                refreshed.append(1)
+                if len(refreshed) == 1:
+                    raise OSError("stats.jsonl: stale file handle")
+        monkeypatch.setattr(app, "STATS", _View())
+        monkeypatch.setattr(app, "ALERTS", _View())
+        monkeypatch.setitem(app.LATENCY_CONFIG, "follow_ms", 5)
+
+        async def follow_briefly():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(app._follow_sinks(), 0.2)
+        asyncio.run(follow_briefly())
+        assert len(refreshed) > 2
@@ -0,0 +1,71 @@
+"""
+Tests for the pandas simulation engine's operators.
+Run with: pytest tests/ -v
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+import pipeline
+
+
+def _stats(observed_at="2026-03-02 12:00"):
+    return pd.DataFrame({
+        "zone": ["Zone7", "Zone9"],
+        "dolphin_count": [40, 12],
+        "observed_at": pd.to_datetime([observed_at] * 2),
+    })
+
+
+def _mining(*events):
+    return pd.DataFrame({
+        "zone": [z for z, _, _ in events],
+        "timestamp": pd.to_datetime([t for _, t, _ in events]),
+        "confidence": [c for _, _, c in events],
+    })
+
+
+# ── Event-time interval join ───────────────────────────────────────────────────
+
+class TestIntervalJoin:
+    def test_recent_event_is_matched(self):
+        out = pipeline._interval_join(_stats(), _mining(("Zone9", "2026-03-02 06:00", 0.9)))
+        row = out.set_index("zone").loc["Zone9"]
+        assert row["mining_conf"] == 0.9 and row["mining_events"] == 1
+
+    def test_expired_event_is_not_matched(self):
+        old = _mining(("Zone9", "2026-01-01 06:00", 0.99))
+        out = pipeline._interval_join(_stats(), old).set_index("zone")
+        assert pd.isna(out.loc["Zone9", "mining_conf"])
+        assert out.loc["Zone9", "mining_events"] == 0
+
+    def test_event_after_observation_is_not_matched(self):
+        late = _mining(("Zone9", "2026-03-02 13:00", 0.95))
+        out = pipeline._interval_join(_stats(), late).set_index("zone")
+        assert out.loc["Zone9", "mining_events"] == 0
+
+    def test_downstream_zone_unaffected_before_arrival(self):
+        out = pipeline._interval_join(_stats(), _mining(("Zone9", "2026-03-02 06:00", 0.9)))
+        assert out.set_index("zone").loc["Zone7", "mining_events"] == 0
+
+    def test_upstream_event_reaches_downstream_zone(self):
+        # Zone9 (Mirzapur) is upstream of Zone7; ~21h travel puts it inside the lag window
+        out = pipeline._interval_join(_stats(), _mining(("Zone9", "2026-03-01 12:00", 0.93)))
+        out = out.set_index("zone")
+        assert out.loc["Zone7", "mining_conf"] == 0.93
+        assert out.loc["Zone9", "mining_events"] == 1
+
+
+# ── JSON output ────────────────────────────────────────────────────────────────
+
+class TestJsonNulls:
+    def test_gaps_become_null_and_other_columns_keep_their_values(self):
+        frame = pd.DataFrame({"zone": ["Zone7", "Zone9"], "dolphin_count": [40, 12],
+                              "avg_48h": [40.0, 15.5], "causal_lag_h": [np.nan, 6.0],
+                              "forecast_warning": [False, True]})
+        rows = pipeline._json_nulls(frame).to_dict("records")
+        assert rows[0]["causal_lag_h"] is None and rows[1]["causal_lag_h"] == 6.0
+        assert json.loads(json.dumps(rows, allow_nan=False))[1] == {
+            "zone": "Zone9", "dolphin_count": 12, "avg_48h": 15.5, "causal_lag_h": 6.0,
+            "forecast_warning": True}
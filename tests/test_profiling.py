@@ -0,0 +1,128 @@
+"""
+Tests for the on-demand stack sampler, tracemalloc tick diffs and the admin API.
+Run with: pytest tests/ -v
+"""
+import os
+import signal
+import threading
+import time
+import tracemalloc
+
+import pytest
+
+import profiling
+from profiling import MemoryTracer, SamplingProfiler
+
+FAST = {"interval_ms": 1, "duration_s": 0.3, "max_duration_s": 1,
+        "memory_frames": 1, "memory_top": 5}
+
+
+def _busy_loop_for_profile(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+# ── Sampler ────────────────────────────────────────────────────────────────────
+
+class TestSamplingProfiler:
+    def test_collapsed_stacks_show_busy_thread(self, tmp_path):
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy_loop_for_profile, args=(stop,), name="busy")
+        worker.start()
+        sampler = SamplingProfiler("t", tmp_path, FAST)
+        try:
+            assert sampler.start(0.2)
+            assert sampler.start(0.2) is False  # one profile at a time
+            time.sleep(0.1)
+            path = sampler.stop()
+        finally:
+            stop.set()
+            worker.join()
+        assert path.suffix == ".collapsed" and path.name.startswith("t-")
+        lines = path.read_text().splitlines()
+        busy = [ln for ln in lines if ln.startswith("busy;")]
+        assert busy and any("_busy_loop_for_profile (test_profiling.py" in ln for ln in busy)
+        assert all(int(ln.rsplit(" ", 1)[1]) > 0 for ln in lines)
+        assert not any("jaljeevan-profiler" in ln for ln in lines)
+        assert not sampler.running
+
+    def test_duration_is_clamped(self, tmp_path):
+        sampler = SamplingProfiler("t", tmp_path, FAST)
+        started = time.monotonic()
+        sampler.start(3600)
+        sampler._thread.join(5)
+        assert time.monotonic() - started < 3 and sampler.last_path.exists()
+
+
+# ── Memory ─────────────────────────────────────────────────────────────────────
+
+class TestMemoryTracer:
+    def test_inactive_tick_is_free(self, tmp_path):
+        tracer = MemoryTracer("t", tmp_path, FAST)
+        was_tracing = tracemalloc.is_tracing()
+        assert tracer.tick() is None
+        assert tracemalloc.is_tracing() == was_tracing and not list(tmp_path.iterdir())
+
+    def test_growth_between_ticks(self, tmp_path):
+        tracer = MemoryTracer("t", tmp_path, FAST)
+        assert tracer.toggle() is True
+        try:
+            hoard = [bytearray(1024) for _ in range(2000)]  # ~2 MiB kept alive
+            growth = tracer.tick("grow")
+        finally:
+            assert tracer.toggle() is False
+        assert hoard and growth[0]["size_diff_kb"] > 1000
+        assert growth[0]["where"].startswith(__file__)
+        log = (tmp_path / "memory-t.log").read_text()
+        assert log.startswith("# ") and "tick 1 grow" in log
+
+    @pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="no SIGUSR1 on this platform")
+    def test_signals(self, tmp_path, monkeypatch):
+        sampler = SamplingProfiler("t", tmp_path, FAST)
+        tracer = MemoryTracer("t", tmp_path, FAST)
+        monkeypatch.setattr(profiling, "SAMPLER", sampler)
+        monkeypatch.setattr(profiling, "MEMORY", tracer)
+        old = signal.getsignal(signal.SIGUSR1), signal.getsignal(signal.SIGUSR2)
+        try:
+            assert profiling.install("sig")
+            os.kill(os.getpid(), signal.SIGUSR1)
+            os.kill(os.getpid(), signal.SIGUSR2)
+            assert sampler.running and tracer.active
+            assert sampler.stop().name.startswith("sig-")
+        finally:
+            tracer.disable()
+            signal.signal(signal.SIGUSR1, old[0])
+            signal.signal(signal.SIGUSR2, old[1])
+
+
+# ── Admin API ──────────────────────────────────────────────────────────────────
+
+class TestAdminAPI:
+    def test_disabled_without_token(self):
+        pytest.importorskip("httpx")
+        from fastapi.testclient import TestClient
+        import app
+        client = TestClient(app.app)
+        assert client.post("/api/admin/profile").status_code == 404
+
+    def test_profile_and_memory(self, tmp_path, monkeypatch):
+        pytest.importorskip("httpx")
+        from fastapi.testclient import TestClient
+        import app
+        monkeypatch.setattr(app, "ADMIN_TOKEN", "s3cret")
+        monkeypatch.setattr(app, "PROFILE_DIR", tmp_path)
+        monkeypatch.setattr(app, "SAMPLER", SamplingProfiler("api", tmp_path, FAST))
+        monkeypatch.setattr(app, "MEMORY", MemoryTracer("api", tmp_path, FAST))
+        client = TestClient(app.app)
+        assert client.get("/api/admin/profile").status_code == 403
+        auth = {"X-Admin-Token": "s3cret"}
+        r = client.post("/api/admin/profile", params={"seconds": 0.1}, headers=auth)
+        assert r.status_code == 202 and r.json()["running"]
+        app.SAMPLER.stop()
+        assert client.get("/api/admin/profile", headers=auth).json()["profiles"]
+        assert client.get("/api/admin/memory", headers=auth).status_code == 409
+        assert client.post("/api/admin/memory", headers=auth).json() == {"active": True}
+        try:
+            assert isinstance(client.get("/api/admin/memory", headers=auth).json()["diff"], list)
+        finally:
+            client.post("/api/admin/memory", params={"on": False}, headers=auth)
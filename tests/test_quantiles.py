@@ -0,0 +1,84 @@
+"""
+Tests for the KLL quantile sketches and their 48h windowing.
+Run with: pytest tests/ -v
+"""
+import numpy as np
+import pandas as pd
+
+from quantiles import KLLSketch, WindowedQuantiles
+
+T0 = pd.Timestamp("2026-03-01")
+
+
+def _rank(data, value):
+    return float((np.asarray(data) < value).mean())
+
+
+# ── Sketch ─────────────────────────────────────────────────────────────────────
+
+class TestKLLSketch:
+    def test_rank_error_and_bounded_size(self):
+        data = np.random.default_rng(0).normal(20, 5, 50_000)
+        sketch = KLLSketch(200)
+        for v in data:
+            sketch.update(v)
+        for q, est in zip((0.1, 0.5, 0.9), sketch.quantiles((0.1, 0.5, 0.9))):
+            assert abs(_rank(data, est) - q) < 0.02
+        assert sum(map(len, sketch.levels)) < 3 * 200
+
+    def test_merge_equals_union(self):
+        data = np.random.default_rng(1).exponential(10, 20_000)
+        a, b = KLLSketch(200), KLLSketch(200)
+        for v in data[:7_000]:
+            a.update(v)
+        for v in data[7_000:]:
+            b.update(v)
+        a.merge(b)
+        assert a.n == len(data)
+        assert abs(_rank(data, a.quantiles([0.5])[0]) - 0.5) < 0.02
+
+    def test_deterministic_and_state_roundtrip(self):
+        a, b = KLLSketch(50), KLLSketch(50)
+        for v in range(1000):
+            a.update(v % 37)
+            b.update(v % 37)
+        assert a.state() == b.state()
+        again = KLLSketch.from_state(a.state())
+        assert again.quantiles([0.1, 0.9]) == a.quantiles([0.1, 0.9])
+
+    def test_empty_is_nan(self):
+        assert np.isnan(KLLSketch().quantiles([0.5])[0])
+
+
+# ── Window ─────────────────────────────────────────────────────────────────────
+
+class TestWindowedQuantiles:
+    def test_outlier_does_not_move_median(self):
+        wq = WindowedQuantiles()
+        times = [T0 + pd.Timedelta(minutes=10 * i) for i in range(100)]
+        counts = [20] * 99 + [500]
+        wq.observe(["Zone9"] * 100, times, counts)
+        p10, p50, p90 = wq.quantiles(["Zone9"])[0]
+        assert p10 == p50 == p90 == 20
+
+    def test_old_buckets_expire(self):
+        wq = WindowedQuantiles()
+        wq.observe(["Zone9"] * 10, [T0] * 10, [40] * 10)
+        later = T0 + pd.Timedelta(hours=60)
+        wq.observe(["Zone9"] * 10, [later] * 10, [10] * 10)
+        assert wq.quantiles(["Zone9"])[0, 1] == 10
+        assert len(wq.buckets[wq.registry.intern("Zone9")]) == 1
+
+    def test_unknown_zone_and_shard_merge(self):
+        a, b = WindowedQuantiles(), WindowedQuantiles()
+        a.observe(["Zone7"] * 50, [T0] * 50, range(50))
+        b.observe(["Zone7"] * 50, [T0] * 50, range(50, 100))
+        q = a.merge(b).quantiles(["Zone7", "ZoneX"])
+        assert 45 <= q[0, 1] <= 55
+        assert np.isnan(q[1]).all()
+
+    def test_dict_roundtrip(self):
+        wq = WindowedQuantiles()
+        wq.observe(["Zone8"] * 30, [T0] * 30, range(30))
+        again = WindowedQuantiles().load(wq.to_dict())
+        assert np.array_equal(again.quantiles(["Zone8"]), wq.quantiles(["Zone8"]))
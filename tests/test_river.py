@@ -0,0 +1,81 @@
+"""
+Tests for the river-network reachability index and causal fan-out.
+Run with: pytest tests/ -v
+"""
+import json
+
+import pandas as pd
+
+import river
+import zones
+from config import ZONES as CONFIG_ZONES
+from river import RiverNetwork
+
+ZONES = ["A", "B", "C", "D"]
+REACHES = [
+    {"from": "A", "to": "B", "km": 10.0},
+    {"from": "B", "to": "C", "km": 20.0},
+    {"from": "C", "to": "D", "km": 30.0, "travel_hours": 100},
+]
+
+
+def _net(**kw):
+    return RiverNetwork(ZONES, REACHES, flow_kmh=10.0, **kw)
+
+
+# ── Reachability index ─────────────────────────────────────────────────────────
+
+class TestReachability:
+    def test_downstream_is_cumulative(self):
+        assert _net().downstream_of("A") == [("A", 0.0, 0.0), ("B", 10.0, 1.0), ("C", 30.0, 3.0)]
+
+    def test_travel_horizon_bounds_index(self):
+        # C -> D takes 100h, beyond the 48h horizon
+        assert [z for z, _, _ in _net(max_travel_hours=48).downstream_of("C")] == ["C"]
+        assert [z for z, _, _ in _net(max_travel_hours=200).downstream_of("C")] == ["C", "D"]
+
+    def test_upstream_is_inverse(self):
+        assert sorted(z for z, _, _ in _net().upstream_of("C")) == ["A", "B", "C"]
+
+    def test_long_chain_precomputes(self):
+        n = 2000
+        zones = [f"R{i}" for i in range(n)]
+        reaches = [{"from": zones[i], "to": zones[i + 1], "km": 3.0} for i in range(n - 1)]
+        net = RiverNetwork(zones, reaches, flow_kmh=3.0, max_travel_hours=10)
+        assert len(net.downstream_of("R0")) == 11
+
+
+# ── Fan-out ────────────────────────────────────────────────────────────────────
+
+class TestFanout:
+    def test_event_reaches_only_downstream_zones(self):
+        events = pd.DataFrame({
+            "zone": ["B"], "timestamp": pd.to_datetime(["2026-03-01 00:00"]), "confidence": [0.9],
+        })
+        out = _net().fanout(events).set_index("zone")
+        assert sorted(out.index) == ["B", "C"]
+        assert out.loc["C", "timestamp"] == pd.Timestamp("2026-03-01 02:00")
+        assert out.loc["C", "source_zone"] == "B"
+
+    def test_unknown_zone_affects_itself(self):
+        events = pd.DataFrame({
+            "zone": ["Z"], "timestamp": pd.to_datetime(["2026-03-01 00:00"]), "confidence": [0.9],
+        })
+        out = _net().fanout(events)
+        assert list(out["zone"]) == ["Z"] and list(out["travel_hours"]) == [0.0]
+
+
+# ── Zone registry reloads ──────────────────────────────────────────────────────
+
+class TestNetworkReload:
+    def test_network_is_rebuilt_when_the_registry_reloads(self, tmp_path, monkeypatch):
+        path = tmp_path / "zones.json"
+        path.write_text(json.dumps(CONFIG_ZONES))
+        monkeypatch.setattr(zones, "_registry", zones.ZoneRegistry(path, check_s=0))
+        monkeypatch.setattr(river, "_network", None)
+        monkeypatch.setattr(river, "_built_for", None)
+        first = river.network()
+        assert river.network() is first  # unchanged registry: cached
+        path.write_text(json.dumps(CONFIG_ZONES + [{"id": "ZoneNew", "name": "New"}]))
+        zones._registry.refresh(force=True)
+        assert "ZoneNew" in river.network().adjacency
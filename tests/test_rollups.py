@@ -0,0 +1,120 @@
+"""
+Tests for the incrementally maintained 1m / 1h / 1d rollups.
+Run with: pytest tests/ -v
+"""
+import pandas as pd
+import pytest
+
+from rollups import RollupIndex, RollupWriter
+
+T0 = pd.Timestamp("2026-03-01")
+
+
+def _dolphins(zone, minutes, counts):
+    return pd.DataFrame({
+        "zone": zone,
+        "timestamp": [T0 + pd.Timedelta(minutes=m) for m in minutes],
+        "dolphin_count": counts,
+    })
+
+
+def _mining(zone, minutes):
+    times = [T0 + pd.Timedelta(minutes=m) for m in minutes]
+    return pd.DataFrame({"zone": zone, "timestamp": times})
+
+
+# ── Writer ─────────────────────────────────────────────────────────────────────
+
+class TestRollupWriter:
+    def test_buckets_match_raw_aggregates(self, tmp_path):
+        w = RollupWriter(tmp_path)
+        minutes = list(range(0, 180, 7))
+        counts = [20 + (m % 5) for m in minutes]
+        for i in range(0, len(minutes), 4):  # several small ticks
+            w.observe(_dolphins("Zone9", minutes[i:i + 4], counts[i:i + 4]),
+                      _mining("Zone9", [m for m in minutes[i:i + 4] if m % 2]))
+        _, points = RollupIndex(tmp_path).query("Zone9", resolution="1h")
+        first = points[0]
+        raw = [c for m, c in zip(minutes, counts) if m < 60]
+        assert first["t"] == "2026-03-01T00:00:00"
+        assert first["count"] == len(raw) and first["sum"] == sum(raw)
+        assert (first["min"], first["max"], first["last"]) == (min(raw), max(raw), raw[-1])
+        assert first["mining_events"] == sum(1 for m in minutes if m < 60 and m % 2)
+
+    def test_only_buckets_past_grace_are_finalized(self, tmp_path):
+        w = RollupWriter(tmp_path)
+        w.observe(_dolphins("Zone9", [0, 61, 125], [1, 2, 3]))
+        lines = (tmp_path / "1h.jsonl").read_text().splitlines()
+        assert len(lines) == 1  # 00:00 closed; 01:00 and 02:00 still open
+        assert {b for _, b in w.open["1h"]} == {T0.value // 3_600_000_000_000 + 1,
+                                                T0.value // 3_600_000_000_000 + 2}
+
+    def test_late_rows_are_counted_not_applied(self, tmp_path):
+        w = RollupWriter(tmp_path)
+        w.observe(_dolphins("Zone9", [0, 200], [1, 2]))
+        w.observe(_dolphins("Zone9", [5], [99]))
+        assert w.late_rows == 2  # 1m and 1h buckets already closed; the day is open
+        assert w.open["1d"][("Zone9", T0.value // 86_400_000_000_000)][3] == 99
+
+    def test_state_roundtrip(self, tmp_path):
+        w = RollupWriter(tmp_path)
+        w.observe(_dolphins("Zone8", [0, 1, 2], [5, 6, 7]))
+        again = RollupWriter(tmp_path).load(w.to_dict())
+        for writer in (w, again):
+            writer.observe(_dolphins("Zone8", [3], [8]))
+        assert again.to_dict() == w.to_dict()
+
+
+# ── Read side ──────────────────────────────────────────────────────────────────
+
+class TestRollupIndex:
+    def test_resolution_from_range(self, tmp_path):
+        ix = RollupIndex(tmp_path, max_points=2000)
+        assert ix.pick_resolution("2026-03-01", "2026-03-02") == "1m"
+        assert ix.pick_resolution("2026-03-01", "2026-04-01") == "1h"
+        assert ix.pick_resolution("2025-03-01", "2026-03-01") == "1d"
+
+    def test_tails_appended_buckets_and_open_snapshot(self, tmp_path):
+        w = RollupWriter(tmp_path)
+        ix = RollupIndex(tmp_path)
+        w.observe(_dolphins("Zone7", [0, 130], [40, 41]))
+        w.write_open()
+        _, before = ix.query("Zone7", resolution="1h")
+        w.observe(_dolphins("Zone7", [250], [42]))
+        w.write_open()
+        _, after = ix.query("Zone7", resolution="1h")
+        assert [p["t"][11:13] for p in before] == ["00", "02"]
+        assert [p["t"][11:13] for p in after] == ["00", "02", "04"]
+
+    def test_range_filter(self, tmp_path):
+        w = RollupWriter(tmp_path)
+        w.observe(_dolphins("Zone7", range(0, 600, 30), [1] * 20))
+        _, points = RollupIndex(tmp_path).query(
+            "Zone7", "2026-03-01T02:00", "2026-03-01T04:00", resolution="1h",
+        )
+        assert [p["t"][11:13] for p in points] == ["02", "03", "04"]
+
+
+# ── API ────────────────────────────────────────────────────────────────────────
+
+class TestRollupAPI:
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        pytest.importorskip("httpx")
+        from fastapi.testclient import TestClient
+        import app
+        w = RollupWriter(tmp_path)
+        w.observe(_dolphins("Zone9", range(0, 300, 10), [20] * 30))
+        w.write_open()
+        monkeypatch.setattr(app, "ROLLUPS", RollupIndex(tmp_path))
+        return TestClient(app.app)
+
+    def test_auto_resolution_header(self, client):
+        r = client.get("/api/rollups", params={"zone": "Zone9", "start": "2026-02-01",
+                                               "end": "2026-03-02"})
+        assert r.status_code == 200
+        assert r.headers["X-Rollup-Resolution"] == "1h"
+        assert sum(p["count"] for p in r.json()) == 30
+
+    def test_unknown_resolution(self, client):
+        assert client.get("/api/rollups", params={"resolution": "5m"}).status_code == 400
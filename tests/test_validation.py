@@ -0,0 +1,114 @@
+"""
+Tests for vectorized CSV row validation and the dead-letter quarantine.
+Run with: pytest tests/ -v
+"""
+import json
+
+import pytest
+
+import pipeline
+from validation import Quarantine, validate
+from zones import ZoneRegistry
+
+from conftest import DOLPHIN_HEADER, MINING_HEADER, dolphin_rows
+
+
+@pytest.fixture
+def zones(tmp_path):
+    path = tmp_path / "zones.json"
+    path.write_text(json.dumps([{"id": "Zone7"}, {"id": "Zone9"}]))
+    return ZoneRegistry(path)
+
+
+def _reasons(rejected):
+    return {r["line"]: r["reasons"] for r in rejected}
+
+
+# ── validate() ─────────────────────────────────────────────────────────────────
+
+class TestValidate:
+    def test_clean_rows_are_typed(self, zones):
+        raw = (DOLPHIN_HEADER + dolphin_rows(0, 3)).encode()
+        valid, rejected = validate(raw, "dolphins", zones)
+        assert rejected == [] and len(valid) == 3
+        assert valid["timestamp"].dtype.kind == "M"
+        assert str(valid["dolphin_count"].dtype) == "int64"
+        assert str(valid["confidence"].dtype) == "float64"
+
+    def test_bad_lines_are_rejected_with_reasons(self, zones):
+        bad = [
+            "2026-03-01T10:00:00,Zone9,12\n",                # field_count
+            "yesterday,Zone9,12,0.9\n",                      # bad_timestamp
+            "2026-03-01T10:00:00,Atlantis,12,0.9\n",         # unknown_zone
+            "2026-03-01T10:00:00,Zone9,-3,0.9\n",            # dolphin_count_range
+            "2026-03-01T10:00:00,Zone9,2.5,1.7\n",           # both out of range
+            "2026-03-01T10:00:00,Zone9,many,\n",             # not numbers
+        ]
+        raw = (DOLPHIN_HEADER + dolphin_rows(0, 2) + "".join(bad) + dolphin_rows(2, 1)).encode()
+        valid, rejected = validate(raw, "dolphins", zones)
+        assert len(valid) == 3 and str(valid["dolphin_count"].dtype) == "int64"
+        assert [r["line"] for r in rejected] == [line.rstrip("\n") for line in bad]
+        reasons = [r["reasons"] for r in rejected]
+        assert reasons == [
+            ["field_count"], ["bad_timestamp"], ["unknown_zone"], ["dolphin_count_range"],
+            ["dolphin_count_range", "confidence_range"], ["bad_dolphin_count", "bad_confidence"],
+        ]
+        assert all(r["stream"] == "dolphins" for r in rejected)
+
+    def test_mining_schema(self, zones):
+        raw = (MINING_HEADER + "2026-03-01T10:00:00,Zone9,0.95,2.9,0.9\n"
+               + "2026-03-01T10:10:00,Zone9,0.95,inf,1.2\n").encode()
+        valid, rejected = validate(raw, "mining", zones)
+        assert len(valid) == 1
+        assert rejected[0]["reasons"] == ["bad_turbidity_anomaly", "night_activity_range"]
+
+    def test_missing_column_rejects_everything(self, zones):
+        raw = b"timestamp,zone,confidence\n2026-03-01T10:00:00,Zone9,0.9\n\n"
+        valid, rejected = validate(raw, "dolphins", zones)
+        assert valid.empty and list(valid.columns)[:2] == ["timestamp", "zone"]
+        assert _reasons(rejected) == {"2026-03-01T10:00:00,Zone9,0.9": ["bad_header"]}
+
+    def test_crlf_and_blank_lines(self, zones):
+        raw = (DOLPHIN_HEADER + dolphin_rows(0, 2)).replace("\n", "\r\n").encode() + b"\r\n"
+        valid, rejected = validate(raw, "dolphins", zones)
+        assert len(valid) == 2 and rejected == []
+
+
+# ── Quarantine ─────────────────────────────────────────────────────────────────
+
+class TestQuarantine:
+    def test_counts_and_dead_letters(self, tmp_path):
+        q = Quarantine(tmp_path / "dead.jsonl", tmp_path / "validation.json")
+        q.record("dolphins", 5, [])
+        q.record("dolphins", 2, [{"stream": "dolphins", "line": "x", "reasons": ["field_count"]},
+                                 {"stream": "dolphins", "line": "y,Zone9,1,0.9",
+                                  "reasons": ["bad_timestamp"]}])
+        assert q.counts["dolphins"] == {"accepted": 7, "rejected": 2,
+                                        "reasons": {"field_count": 1, "bad_timestamp": 1}}
+        letters = [json.loads(line) for line in (tmp_path / "dead.jsonl").read_text().splitlines()]
+        assert [d["line"] for d in letters] == ["x", "y,Zone9,1,0.9"]
+        assert all("rejected_at" in d for d in letters)
+
+        q.write_snapshot()
+        snap = json.loads((tmp_path / "validation.json").read_text())
+        assert snap["rejected"] == 2 and snap["streams"]["dolphins"]["accepted"] == 7
+
+        restored = Quarantine(tmp_path / "dead.jsonl", tmp_path / "validation.json")
+        restored.load(q.to_dict())
+        assert restored.snapshot() == q.snapshot()
+
+
+# ── In the simulation engine ───────────────────────────────────────────────────
+
+class TestTick:
+    def test_corrupt_line_costs_one_row(self, engine, tmp_path):
+        with open(engine["DOLPHIN_CSV"], "a") as f:
+            f.write("2026-03-01T12:00:00,Zone9,NaN-ish\n" + dolphin_rows(12, 2))
+        store = pipeline._PersistenceStore()
+        assert pipeline._tick(store) is not None
+        assert store.quarantine.counts["dolphins"] == {
+            "accepted": 14, "rejected": 1, "reasons": {"field_count": 1}}
+        assert engine["STATS_JSONL"].read_text()
+        dead = tmp_path / "output" / "deadletter.jsonl"
+        assert json.loads(dead.read_text())["line"] == "2026-03-01T12:00:00,Zone9,NaN-ish"
+        assert json.loads((tmp_path / "output" / "validation.json").read_text())["rejected"] == 1
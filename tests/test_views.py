@@ -0,0 +1,124 @@
+"""
+Tests for the indexed zone views behind /api/stats and /api/alerts.
+Run with: pytest tests/ -v
+"""
+import json
+import random
+
+import pytest
+
+from views import ZoneView
+
+SORT = {"zone": str, "decline_pct": float, "dolphin_count": float}
+
+
+def _append(path, rows):
+    with open(path, "a") as f:
+        f.writelines(json.dumps(r) + "\n" for r in rows)
+
+
+def _row(zone, decline, status=None):
+    status = status or ("crit" if decline > 25 else "warn" if decline > 0 else "good")
+    return {"zone": zone, "decline_pct": decline, "dolphin_count": 40 - decline / 2,
+            "status": status}
+
+
+def _all_pages(view, **kw):
+    rows, cursor = [], None
+    while True:
+        page, total, cursor = view.page(cursor=cursor, **kw)
+        rows.extend(page)
+        if cursor is None:
+            return rows, total
+
+
+# ── Indexes ────────────────────────────────────────────────────────────────────
+
+class TestZoneView:
+    def test_pages_match_full_sort_after_updates(self, tmp_path):
+        path = tmp_path / "stats.jsonl"
+        rng = random.Random(5)
+        latest = {}
+        view = ZoneView(path, SORT)
+        for _ in range(6):  # several appended batches, many zones updated in place
+            batch = [_row(f"Z{rng.randrange(300):03d}", round(rng.uniform(-20, 60), 1))
+                     for _ in range(200)]
+            _append(path, batch)
+            latest.update((r["zone"], r) for r in batch)
+            view.refresh()
+        for status in (None, "crit", "warn", "good"):
+            expect = [r for r in latest.values() if status is None or r["status"] == status]
+            expect.sort(key=lambda r: (r["decline_pct"], r["zone"]), reverse=True)
+            rows, total = _all_pages(view, status=status, sort="-decline_pct", limit=17)
+            assert total == len(expect)
+            assert [r["zone"] for r in rows] == [r["zone"] for r in expect]
+
+    def test_top_k(self, tmp_path):
+        path = tmp_path / "stats.jsonl"
+        _append(path, [_row(f"Z{i}", i) for i in range(50)])
+        rows, total, cursor = ZoneView(path, SORT).page(status="crit", sort="-decline_pct",
+                                                        limit=3)
+        assert [r["zone"] for r in rows] == ["Z49", "Z48", "Z47"]
+        assert total == 24 and cursor
+
+    def test_missing_values_page_last(self, tmp_path):
+        path = tmp_path / "stats.jsonl"
+        _append(path, [_row("A", 5), dict(_row("B", 5), decline_pct=None), _row("C", 1)])
+        view = ZoneView(path, SORT)
+        for sort in ("decline_pct", "-decline_pct"):
+            rows, _ = _all_pages(view, sort=sort, limit=1)
+            assert rows[-1]["zone"] == "B"
+
+    def test_keep_drops_zone_and_truncation_reloads(self, tmp_path):
+        path = tmp_path / "alerts.jsonl"
+        _append(path, [{"zone": "A", "state": "opened"}, {"zone": "B", "state": "opened"}])
+        view = ZoneView(path, {"zone": str}, status_field="state",
+                        keep=lambda a: a["state"] != "resolved")
+        _append(path, [{"zone": "A", "state": "resolved"}])
+        assert [r["zone"] for r in view.page()[0]] == ["B"]
+        assert view.refresh().counts() == {"opened": 1}
+        path.write_text(json.dumps({"zone": "C", "state": "escalated"}) + "\n")
+        assert [r["zone"] for r in view.page()[0]] == ["C"]
+
+    def test_bad_sort_and_cursor(self, tmp_path):
+        path = tmp_path / "stats.jsonl"
+        _append(path, [_row("A", 1), _row("B", 2)])
+        view = ZoneView(path, SORT)
+        with pytest.raises(KeyError):
+            view.page(sort="nope")
+        _, _, cursor = view.page(sort="zone", limit=1)
+        with pytest.raises(ValueError):
+            view.page(sort="decline_pct", cursor=cursor)
+        with pytest.raises(ValueError):
+            view.page(cursor="not-a-cursor")
+
+
+# ── API ────────────────────────────────────────────────────────────────────────
+
+class TestPagedAPI:
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        pytest.importorskip("httpx")
+        from fastapi.testclient import TestClient
+        import app
+        path = tmp_path / "stats.jsonl"
+        _append(path, [{"zone": f"Z{i}", "dolphin_count": 40 - i, "avg_48h": 40.0}
+                       for i in range(30)])
+        monkeypatch.setattr(app, "STATS", ZoneView(path, app.STATS_SORT,
+                                                   derive=app._with_status))
+        return TestClient(app.app)
+
+    def test_status_filter_and_cursor_headers(self, client):
+        r = client.get("/api/stats", params={"status": "crit", "sort": "-decline_pct",
+                                             "limit": 2})
+        assert [z["zone"] for z in r.json()] == ["Z29", "Z28"]
+        assert r.headers["X-Total-Count"] == "19"  # decline 2.5 * i > 25: Z11..Z29
+        r = client.get("/api/stats", params={"status": "crit", "sort": "-decline_pct",
+                                             "limit": 17, "cursor": r.headers["X-Next-Cursor"]})
+        assert [z["zone"] for z in r.json()][:2] == ["Z27", "Z26"]
+        assert len(r.json()) == 17 and "X-Next-Cursor" not in r.headers
+
+    def test_bad_requests(self, client):
+        assert client.get("/api/stats", params={"sort": "mining"}).status_code == 400
+        assert client.get("/api/stats", params={"cursor": "%%%"}).status_code == 400
+        assert client.get("/api/stats", params={"limit": 0}).status_code == 400
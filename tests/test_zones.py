@@ -0,0 +1,153 @@
+"""
+Tests for the file-backed zone registry.
+Run with: pytest tests/ -v
+"""
+import json
+import os
+import random
+
+import pytest
+
+from config import ZONES
+from zones import ZoneRegistry, haversine_km, load_zones, write_default
+
+
+def _write(path, zones):
+    path.write_text(json.dumps(zones))
+    st = path.stat()  # make sure the change is visible even within one mtime tick
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+# ── File formats ───────────────────────────────────────────────────────────────
+
+class TestLoadZones:
+    def test_csv(self, tmp_path):
+        path = tmp_path / "zones.csv"
+        path.write_text("id,name,base,lat,lon,district\nZ1,One,40,25.3,82.9,Varanasi\n")
+        z, = load_zones(path)
+        assert z == {"id": "Z1", "name": "One", "base": 40, "lat": 25.3, "lon": 82.9,
+                     "district": "Varanasi"}
+
+    def test_geojson_points_and_polygons(self, tmp_path):
+        path = tmp_path / "zones.geojson"
+        path.write_text(json.dumps({"type": "FeatureCollection", "features": [
+            {"type": "Feature", "properties": {"id": "P", "name": "Point"},
+             "geometry": {"type": "Point", "coordinates": [82.9, 25.3]}},
+            {"type": "Feature", "id": "Q", "properties": {},
+             "geometry": {"type": "Polygon",
+                          "coordinates": [[[82, 25], [84, 25], [84, 27], [82, 27]]]}},
+        ]}))
+        p, q = load_zones(path)
+        assert (p["lat"], p["lon"]) == (25.3, 82.9)
+        assert (q["id"], q["name"], q["lat"], q["lon"]) == ("Q", "Q", 26.0, 83.0)
+
+    def test_duplicate_id_rejected(self, tmp_path):
+        path = tmp_path / "zones.json"
+        path.write_text(json.dumps([{"id": "A"}, {"id": "A"}]))
+        with pytest.raises(ValueError):
+            load_zones(path)
+
+
+# ── Registry ───────────────────────────────────────────────────────────────────
+
+class TestZoneRegistry:
+    def test_missing_file_falls_back_to_config(self, tmp_path):
+        reg = ZoneRegistry(tmp_path / "zones.json")
+        assert [z["id"] for z in reg] == [z["id"] for z in ZONES]
+        write_default(tmp_path / "zones.json")
+        assert [z["id"] for z in load_zones(tmp_path / "zones.json")] == reg.ids
+
+    def test_hot_reload_keeps_interned_ids(self, tmp_path):
+        path = tmp_path / "zones.json"
+        _write(path, [{"id": "A", "name": "Alpha"}, {"id": "B"}])
+        reg = ZoneRegistry(path, check_s=0)
+        assert reg.intern("B") == 1 and reg.name("A") == "Alpha"
+        _write(path, [{"id": "C"}, {"id": "B", "name": "Beta"}])
+        reg.refresh()
+        assert reg.version == 2
+        assert "A" not in reg and reg.name("B") == "Beta"
+        assert [reg.intern(z) for z in ("A", "B", "C")] == [0, 1, 2]
+        assert reg.codes(["C", "A", "nope"]).tolist() == [2, 0, -1]
+        assert reg.codes(["nope", "C", "nope"], assign=True).tolist() == [3, 2, 3]
+
+    def test_operators_index_state_by_interned_id(self):
+        from causality import LaggedXCorr
+        from forecast import HoltWinters
+        from quantiles import WindowedQuantiles
+        from zones import registry
+        t = ["2026-03-01T10:00:00"] * 2
+        hw, xc, wq = HoltWinters(), LaggedXCorr(), WindowedQuantiles()
+        hw.observe(["ZoneB", "ZoneA"], t, [30, 40])
+        xc.observe_dolphin("ZoneA", t[0], 40)
+        wq.observe(["ZoneA"], t[:1], [40])
+        row = registry().intern("ZoneA")
+        assert hw.bin_sum[row] == 40 and xc.ycnt_ring[row].sum() == 1
+        assert list(wq.buckets) == [row]
+
+    def test_refresh_is_throttled(self, tmp_path):
+        path = tmp_path / "zones.json"
+        _write(path, [{"id": "A"}])
+        reg = ZoneRegistry(path, check_s=3600)
+        _write(path, [{"id": "A"}, {"id": "B"}])
+        assert len(reg.refresh()) == 1
+        assert len(reg.refresh(force=True)) == 2
+
+    def test_bad_file_keeps_previous_registry(self, tmp_path):
+        path = tmp_path / "zones.json"
+        _write(path, [{"id": "A"}])
+        reg = ZoneRegistry(path, check_s=0)
+        path.write_text('[{"id": "A"}, {"name": "no id"')  # half-saved edit
+        reg.refresh()
+        assert "A" in reg and reg.error
+
+
+# ── Spatial lookup ─────────────────────────────────────────────────────────────
+
+class TestNearest:
+    def test_matches_brute_force_over_thousands_of_zones(self, tmp_path):
+        rng = random.Random(7)
+        zones = [{"id": f"Z{i}", "lat": rng.uniform(22, 30), "lon": rng.uniform(78, 88)}
+                 for i in range(5000)]
+        path = tmp_path / "zones.json"
+        _write(path, zones)
+        reg = ZoneRegistry(path)
+        for _ in range(200):
+            lat, lon = rng.uniform(21, 31), rng.uniform(77, 89)
+            expect = min(zones, key=lambda z: haversine_km(lat, lon, z["lat"], z["lon"]))
+            assert reg.nearest(lat, lon)[0]["id"] == expect["id"]
+
+    def test_max_km(self, tmp_path):
+        reg = ZoneRegistry(tmp_path / "zones.json")
+        zone, km = reg.nearest(25.32, 82.97)
+        assert zone["id"] == "Zone7" and km < 1
+        assert reg.nearest(28.6, 77.2, max_km=50) is None
+
+    def test_query_outside_the_occupied_cells(self, tmp_path):
+        reg = ZoneRegistry(tmp_path / "zones.json")
+        expect = min(ZONES, key=lambda z: haversine_km(-10.0, 60.0, z["lat"], z["lon"]))
+        assert reg.nearest(-10.0, 60.0)[0]["id"] == expect["id"]
+        assert reg.nearest(-10.0, 60.0, max_km=100) is None
+
+
+# ── API ────────────────────────────────────────────────────────────────────────
+
+class TestZonesAPI:
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        pytest.importorskip("httpx")
+        from fastapi.testclient import TestClient
+        import app
+        path = tmp_path / "zones.json"
+        _write(path, [{"id": "A", "lat": 25.0, "lon": 82.0}])
+        reg = ZoneRegistry(path, check_s=0)
+        monkeypatch.setattr(app, "registry", reg.refresh)
+        return TestClient(app.app), path
+
+    def test_list_nearest_and_reload(self, client):
+        client, path = client
+        assert [z["id"] for z in client.get("/api/zones").json()] == ["A"]
+        _write(path, [{"id": "A", "lat": 25.0, "lon": 82.0}, {"id": "B", "lat": 26.0, "lon": 83.0}])
+        assert client.get("/api/health").json()["zones"] == 2
+        r = client.get("/api/zones", params={"lat": 25.9, "lon": 83.0})
+        assert r.json()["id"] == "B" and r.json()["distance_km"] < 12
+        assert client.get("/api/zones", params={"lat": 25.9}).status_code == 400
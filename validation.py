@@ -0,0 +1,170 @@
+"""
+JalJeevan Score -- Row Validation
+=================================
+The CSV lines read each tick are checked column-wise, in bulk, before any
+operator sees them:
+
+  field_count          the line has as many fields as the header
+  bad_timestamp        timestamp is not an ISO 8601 date-time
+  unknown_zone         zone is not in the zone registry
+  bad_<column>         a numeric field is empty, not a number or infinite
+  <column>_range       outside its range in SCHEMAS or,
+                       for dolphin_count, not a whole number
+
+Valid rows flow on typed (timestamp as datetime64, numbers as numbers).
+Rejected lines go to output/deadletter.jsonl with their stream, raw text and
+every reason that applies, and are counted per stream and reason, so one
+corrupt line costs one row instead of the whole tick.  The work is a handful
+of vectorized passes over the new lines only; per-row Python runs just for
+the rejected ones.
+"""
+
+import csv
+import io
+import json
+import math
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config import DEADLETTER_JSONL, MAX_DOLPHIN_COUNT, VALIDATION_JSON
+from zones import registry
+
+REQUIRED = ("timestamp", "zone")
+
+# stream -> numeric column -> (low, high, whole number only)
+SCHEMAS = {
+    "dolphins": {
+        "dolphin_count": (0, MAX_DOLPHIN_COUNT, True),
+        "confidence": (0.0, 1.0, False),
+    },
+    "mining": {
+        "confidence": (0.0, 1.0, False),
+        "turbidity_anomaly": (-math.inf, math.inf, False),
+        "night_activity": (0.0, 1.0, False),
+    },
+}
+
+
+def _lines(raw):
+    """(start, end) byte offsets and comma counts of each line, header first."""
+    buf = np.frombuffer(raw, dtype=np.uint8)
+    ends = np.flatnonzero(buf == 10)
+    if not len(buf) or buf[-1] != 10:
+        ends = np.append(ends, len(buf))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    commas = np.concatenate(([0], np.cumsum(buf == 44)))
+    return starts, ends, commas[ends] - commas[starts]
+
+
+def _typed(frame, stream):
+    for col, (_, _, whole) in SCHEMAS[stream].items():
+        dtype = "int64" if whole else "float64"
+        if frame[col].dtype != dtype:
+            frame[col] = frame[col].astype(dtype)
+    return frame
+
+
+def validate(raw, stream, zones=None):
+    """
+    (valid rows, rejected lines) for raw CSV bytes: the header line, then
+    complete rows.  Rejected lines are {"stream", "line", "reasons"} dicts.
+    `zones` is the registry membership is checked against (registry()).
+    """
+    schema = SCHEMAS[stream]
+    starts, ends, commas = _lines(raw)
+    head = raw[:ends[0] + 1]
+    header = head.decode("utf-8", errors="replace").strip().split(",")
+    starts, ends, commas = starts[1:], ends[1:], commas[1:]
+    size = ends - starts
+    crlf = np.frombuffer(raw, dtype=np.uint8)[np.minimum(starts, max(len(raw) - 1, 0))] == 13
+    blank = (size == 0) | ((size == 1) & crlf)
+    starts, ends, commas = starts[~blank], ends[~blank], commas[~blank]  # read_csv skips these too
+
+    def text(i):
+        return raw[starts[i]:ends[i]].decode("utf-8", errors="replace").rstrip("\r")
+
+    if any(c not in header for c in (*REQUIRED, *schema)):
+        empty = pd.DataFrame({c: pd.Series(dtype=object) for c in (*REQUIRED, *schema)})
+        empty["timestamp"] = pd.Series(dtype="datetime64[ns]")
+        rejected = [{"stream": stream, "line": text(i), "reasons": ["bad_header"]}
+                    for i in range(len(starts))]
+        return _typed(empty, stream), rejected
+
+    # Split with the C parser; lines with the wrong field count are cut out first
+    fits = commas + 1 == len(header)
+    if fits.all():
+        body = raw
+    else:
+        body = head + b"".join(raw[s:e] + b"\n" for s, e in zip(starts[fits], ends[fits]))
+    frame = pd.read_csv(io.BytesIO(body), quoting=csv.QUOTE_NONE, encoding_errors="replace")
+
+    stamps = pd.to_datetime(frame["timestamp"], format="ISO8601", errors="coerce")
+    zones = registry() if zones is None else zones
+    masks = {"bad_timestamp": stamps.isna().to_numpy(),
+             "unknown_zone": ~zones.registered(frame["zone"])}
+    for col, (lo, hi, whole) in schema.items():
+        if frame[col].dtype.kind not in "iuf":  # something in the column is not a number
+            frame[col] = pd.to_numeric(frame[col].astype(str).str.strip(), errors="coerce")
+        x = frame[col].to_numpy(dtype=float)
+        finite = np.isfinite(x)
+        with np.errstate(invalid="ignore"):
+            out = (x < lo) | (x > hi) | ((np.mod(x, 1) != 0) if whole else False)
+        masks[f"bad_{col}"] = ~finite
+        masks[f"{col}_range"] = finite & out
+
+    checks = {"field_count": ~fits}
+    for reason, mask in masks.items():
+        checks[reason] = np.zeros(len(fits), dtype=bool)
+        checks[reason][fits] = mask
+    table = np.column_stack(list(checks.values()))
+    bad = table.any(axis=1)
+    ok = ~bad[fits]
+    frame["timestamp"] = stamps
+    valid = _typed(frame if ok.all() else frame[ok].reset_index(drop=True), stream)
+
+    names = np.array(list(checks))
+    rejected = [{"stream": stream, "line": text(i), "reasons": names[table[i]].tolist()}
+                for i in np.flatnonzero(bad)]
+    return valid, rejected
+
+
+# ── Quarantine ─────────────────────────────────────────────────────────────────
+
+class Quarantine:
+    """Dead-letter sink for rejected lines plus per-stream / per-reason counters."""
+
+    def __init__(self, path=DEADLETTER_JSONL, snapshot_path=VALIDATION_JSON):
+        self.path = Path(path)
+        self.snapshot_path = Path(snapshot_path)
+        self.counts = {}  # stream -> {"accepted": n, "rejected": n, "reasons": {reason: n}}
+
+    def record(self, stream, accepted, rejected):
+        """Count a validated batch and append its rejected lines to the sink."""
+        c = self.counts.setdefault(stream, {"accepted": 0, "rejected": 0, "reasons": {}})
+        c["accepted"] += accepted
+        if not rejected:
+            return
+        c["rejected"] += len(rejected)
+        at = datetime.now().isoformat(timespec="seconds")
+        with open(self.path, "a") as f:
+            for r in rejected:
+                for reason in r["reasons"]:
+                    c["reasons"][reason] = c["reasons"].get(reason, 0) + 1
+                f.write(json.dumps(dict(r, rejected_at=at), ensure_ascii=False) + "\n")
+
+    def snapshot(self):
+        return {"streams": self.counts,
+                "rejected": sum(c["rejected"] for c in self.counts.values())}
+
+    def write_snapshot(self):
+        """Counters for the API process (output/validation.json)."""
+        self.snapshot_path.write_text(json.dumps(self.snapshot(), sort_keys=True))
+
+    def to_dict(self):
+        return {s: dict(c, reasons=dict(c["reasons"])) for s, c in self.counts.items()}
+
+    def load(self, state):
+        self.counts = state or {}
@@ -0,0 +1,251 @@
+"""
+JalJeevan Score -- Indexed Zone Views
+=====================================
+The API's in-memory view of a JSONL sink (stats or alerts): the latest row
+per zone, kept current by tailing the file from its last byte offset, plus
+secondary indexes that are touched only for zones whose row changed:
+
+  buckets   status -> one sorted key list per sortable column ("*" = all zones)
+  keys      (value, zone) tuples kept sorted with bisect; zones without a
+            value sit in a separate list that always pages last
+
+  changes   every applied row gets a sequence number; a change log of
+            (seq, zone) answers "what changed since version v" with one bisect
+
+A page is one bisect to the cursor plus a walk of `limit` keys, so "top 20
+worst zones" costs O(log n + k) at any zone count and no request touches
+rows it does not return.  Cursors are opaque (base64 of sort, status and
+the last key) and are rejected if reused with a different sort or status.
+Versions are "<epoch>.<seq>"; the epoch changes whenever the view is rebuilt
+(API restart, sink rewritten), which tells clients to take a full snapshot.
+"""
+
+import base64
+import bisect
+import json
+import math
+import os
+from itertools import islice
+from pathlib import Path
+
+ALL = "*"
+
+
+def _value(row, key, kind):
+    v = row.get(key)
+    if v is None:
+        return None
+    try:
+        v = kind(v)
+    except (TypeError, ValueError):
+        return None
+    return None if kind is float and math.isnan(v) else v
+
+
+class _SortedKeys:
+    """(value, zone) in order, then zones with no value."""
+
+    __slots__ = ("keys", "missing")
+
+    def __init__(self):
+        self.keys, self.missing = [], []
+
+    def __len__(self):
+        return len(self.keys) + len(self.missing)
+
+    def add(self, zone, value):
+        if value is None:
+            bisect.insort(self.missing, zone)
+        else:
+            bisect.insort(self.keys, (value, zone))
+
+    def remove(self, zone, value):
+        items, item = (self.missing, zone) if value is None else (self.keys, (value, zone))
+        i = bisect.bisect_left(items, item)
+        if i < len(items) and items[i] == item:
+            del items[i]
+
+    def walk(self, desc=False, after=None):
+        """(value, zone) in page order, starting after the `after` key."""
+        keys, missing = self.keys, self.missing
+        if after is None or after[0] is not None:
+            if desc:
+                end = len(keys) if after is None else bisect.bisect_left(keys, tuple(after))
+                for i in range(end - 1, -1, -1):
+                    yield keys[i]
+            else:
+                start = 0 if after is None else bisect.bisect_right(keys, tuple(after))
+                for i in range(start, len(keys)):
+                    yield keys[i]
+            start = 0
+        else:
+            start = bisect.bisect_right(missing, after[1])
+        for i in range(start, len(missing)):
+            yield None, missing[i]
+
+
+class ZoneView:
+    """Latest row per zone from a JSONL sink, indexed by status and sort columns."""
+
+    def __init__(self, path, sort_keys, status_field="status", derive=None, keep=None,
+                 visible=None):
+        self.path = Path(path)
+        self.sort_keys = dict(sort_keys)  # column -> float / str
+        self.status_field = status_field
+        self.derive = derive  # fills computed fields on rows written without them
+        self.keep = keep  # rows failing it drop their zone from the view
+        self.visible = visible  # called with each refreshed chunk's rows once servable
+        self._reset()
+
+    def _reset(self):
+        self.rows = {}
+        self._index = {}  # (status, column) -> _SortedKeys
+        self._offset = 0
+        self.epoch = os.urandom(4).hex()
+        self.seq = 0
+        self._seqs = {}  # zone -> seq of its last change (removed zones included)
+        self._log_seq, self._log_zone = [], []  # change log, ascending seq
+
+    # ── Maintenance ────────────────────────────────────────────────────────────
+
+    def refresh(self):
+        """Apply rows appended since the last call (a shrunk file is re-read)."""
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            return self
+        if size < self._offset:
+            self._reset()
+        if size == self._offset:
+            return self
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(size - self._offset)
+        end = chunk.rfind(b"\n") + 1  # ignore a half-written last line
+        parsed = []
+        for line in chunk[:end].splitlines():
+            if line.strip():
+                try:
+                    parsed.append(json.loads(line))
+                except ValueError:
+                    continue
+        latest = {row.get("zone", "?"): row for row in parsed}
+        for zone, row in latest.items():
+            self._apply(zone, row)
+        self._offset += end
+        if self.visible is not None and parsed:
+            self.visible(parsed)
+        return self
+
+    def _apply(self, zone, row):
+        self.seq += 1
+        self._seqs[zone] = self.seq
+        self._log_seq.append(self.seq)
+        self._log_zone.append(zone)
+        if len(self._log_seq) > 2 * len(self._seqs) + 1024:
+            self._compact()
+        old = self.rows.pop(zone, None)
+        if old is not None:
+            self._update(zone, old, self._unindex)
+        if self.derive is not None:
+            row = self.derive(row)
+        if self.keep is not None and not self.keep(row):
+            return
+        self.rows[zone] = row
+        self._update(zone, row, self._add)
+
+    def _compact(self):
+        """Keep only each zone's latest log entry (answers stay exact)."""
+        latest = sorted((s, z) for z, s in self._seqs.items())
+        self._log_seq = [s for s, _ in latest]
+        self._log_zone = [z for _, z in latest]
+
+    def _update(self, zone, row, op):
+        for status in (ALL, row.get(self.status_field)):
+            for key, kind in self.sort_keys.items():
+                op(status, key, zone, _value(row, key, kind))
+
+    def _add(self, status, key, zone, value):
+        index = self._index.get((status, key))
+        if index is None:
+            index = self._index[(status, key)] = _SortedKeys()
+        index.add(zone, value)
+
+    def _unindex(self, status, key, zone, value):
+        index = self._index.get((status, key))
+        if index is not None:
+            index.remove(zone, value)
+
+    # ── Queries ────────────────────────────────────────────────────────────────
+
+    def counts(self):
+        """Zones per status."""
+        first = next(iter(self.sort_keys))
+        return {s: len(ix) for (s, k), ix in self._index.items() if k == first and s != ALL}
+
+    @property
+    def version(self):
+        return f"{self.epoch}.{self.seq}"
+
+    def changes(self, since=None):
+        """
+        (rows, removed zones, version, full) since version `since`.  A missing,
+        foreign or future version gets the full snapshot with full=True.
+        """
+        self.refresh()
+        epoch, _, seq = (since or "").partition(".")
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self.seq:
+            return list(self.rows.values()), [], self.version, True
+        i = bisect.bisect_right(self._log_seq, int(seq))
+        zones = dict.fromkeys(self._log_zone[i:])
+        rows = [self.rows[z] for z in zones if z in self.rows]
+        return rows, [z for z in zones if z not in self.rows], self.version, False
+
+    def page(self, status=None, sort="zone", limit=None, cursor=None):
+        """
+        (rows, total, next_cursor) for one status bucket (all zones if None),
+        ordered by `sort` ("-col" for descending).  Unknown columns raise
+        KeyError, malformed or mismatched cursors ValueError.
+        """
+        self.refresh()
+        desc, key = sort.startswith("-"), sort.lstrip("-")
+        if key not in self.sort_keys:
+            raise KeyError(key)
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be positive")
+        status = status or ALL
+        after = _decode(cursor, sort, status, self.sort_keys[key]) if cursor else None
+        index = self._index.get((status, key)) or _SortedKeys()
+        keys = list(islice(index.walk(desc, after), None if limit is None else limit + 1))
+        more = limit is not None and len(keys) > limit
+        keys = keys[:limit]
+        nxt = _encode(sort, status, keys[-1]) if more else None
+        return [self.rows[z] for _, z in keys], len(index), nxt
+
+
+def sort_key(row, sort, sort_keys):
+    """The (value, zone) key `row` is ordered by under `sort` (value None if missing)."""
+    key = sort.lstrip("-")
+    return _value(row, key, sort_keys[key]), str(row.get("zone", "?"))
+
+
+def cursor_after(sort, status, key):
+    """Cursor for the rows after `key` -- how federation.py resumes a backend mid-page."""
+    return _encode(sort, status or ALL, key)
+
+
+def _encode(sort, status, key):
+    raw = json.dumps([sort, status, list(key)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor, sort, status, kind):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        c_sort, c_status, (value, zone) = json.loads(raw)
+        key = (None if value is None else kind(value), str(zone))
+    except (ValueError, TypeError):
+        raise ValueError("Malformed cursor")
+    if (c_sort, c_status) != (sort, status):
+        raise ValueError("Cursor belongs to a different sort or status")
+    return key
@@ -0,0 +1,265 @@
+"""
+JalJeevan Score -- Zone Registry
+================================
+River zones come from a file (config.ZONES_FILE) rather than code, so a new
+stretch is added by editing the file: the pipeline, simulator and API pick it
+up on their next refresh(), no restart.
+
+  by id       dict lookup, O(1)
+  interned    every zone id gets a small int that never changes for the life
+              of the process, even across reloads, so hot paths can index
+              NumPy arrays by it instead of hashing strings: the operators
+              (causality.py, forecast.py, quantiles.py) key their state by it
+  by lat/lon  uniform grid of ZONE_GRID_DEG cells; nearest() scans rings of
+              cells outward from the query point and stops once no unscanned
+              cell can hold anything closer
+
+File formats, picked by suffix:
+
+  .csv       id,name,base,lat,lon  (extra columns are kept)
+  .json      [{"id": ..., "name": ..., "lat": ..., "lon": ...}, ...]
+             or {"zones": [...]}
+  .geojson   FeatureCollection; id/name/base in properties, Point geometry
+             (other geometries use the mean of their outer ring)
+
+A missing file means config.ZONES.  A file that fails to parse keeps the
+previous registry and records the reason in `error`.
+"""
+
+import csv
+import json
+import math
+import threading
+import time
+from pathlib import Path
+
+from config import ZONE_GRID_DEG, ZONE_RELOAD_S, ZONES, ZONES_FILE
+
+KM_PER_DEG = 111.195
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((p2 - p1) / 2) ** 2
+         + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * 6371.0 * math.asin(min(1.0, math.sqrt(a)))
+
+
+# ── File formats ───────────────────────────────────────────────────────────────
+
+def _number(value):
+    if value in (None, ""):
+        return None
+    try:
+        return float(value) if "." in str(value) or "e" in str(value).lower() else int(value)
+    except ValueError:
+        return value
+
+
+def _from_csv(path):
+    with open(path, newline="") as f:
+        return [{k: _number(v) if k in ("base", "lat", "lon") else v for k, v in row.items()}
+                for row in csv.DictReader(f)]
+
+
+def _from_geojson(doc):
+    records = []
+    for feature in doc.get("features", []):
+        z = dict(feature.get("properties") or {})
+        z.setdefault("id", feature.get("id"))
+        geom = feature.get("geometry") or {}
+        coords = geom.get("coordinates")
+        if geom.get("type") == "Point":
+            z["lon"], z["lat"] = coords[0], coords[1]
+        elif coords:
+            ring = coords[0][0] if geom.get("type") == "MultiPolygon" else coords
+            ring = ring[0] if isinstance(ring[0][0], (list, tuple)) else ring
+            z["lon"] = sum(c[0] for c in ring) / len(ring)
+            z["lat"] = sum(c[1] for c in ring) / len(ring)
+        records.append(z)
+    return records
+
+
+def load_zones(path):
+    """Zone records from a .csv / .json / .geojson file; raises ValueError if malformed."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        records = _from_csv(path)
+    else:
+        doc = json.loads(path.read_text())
+        if isinstance(doc, dict) and doc.get("type") == "FeatureCollection":
+            records = _from_geojson(doc)
+        elif isinstance(doc, dict):
+            records = doc.get("zones", [])
+        else:
+            records = doc
+    seen = set()
+    for z in records:
+        if not isinstance(z, dict) or not z.get("id"):
+            raise ValueError(f"{path.name}: zone without an id: {z!r}")
+        z["id"] = str(z["id"])
+        if z["id"] in seen:
+            raise ValueError(f"{path.name}: duplicate zone id {z['id']}")
+        seen.add(z["id"])
+        z.setdefault("name", z["id"])
+        for key in ("lat", "lon"):
+            if z.get(key) is not None:
+                z[key] = float(z[key])
+    return records
+
+
+# ── Registry ───────────────────────────────────────────────────────────────────
+
+class ZoneRegistry:
+    """Zones by id, interned int and location, reloaded when the file changes."""
+
+    def __init__(self, path=ZONES_FILE, grid_deg=ZONE_GRID_DEG, check_s=ZONE_RELOAD_S):
+        self.path = Path(path)
+        self.grid_deg = grid_deg
+        self.check_s = check_s
+        self.ids = []  # interned int -> zone id (append-only)
+        self._codes = {}  # zone id -> interned int
+        # (zone id -> record, grid cell -> [record], occupied cell bounds), swapped whole
+        self._view = ({}, {}, None)
+        self.version = 0
+        self.error = None
+        self._stamp = None
+        self._checked = None
+        self._lock = threading.Lock()
+        self.refresh(force=True)
+
+    # ── Loading ────────────────────────────────────────────────────────────────
+
+    def refresh(self, force=False):
+        """Reload if the file changed (checked at most every `check_s`); returns self."""
+        now = time.monotonic()
+        if not force and self._checked is not None and now - self._checked < self.check_s:
+            return self
+        self._checked = now
+        try:
+            st = self.path.stat()
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        if stamp == self._stamp and self.version:
+            return self
+        try:
+            records = load_zones(self.path) if stamp else [dict(z) for z in ZONES]
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            self.error = f"{type(e).__name__}: {e}"
+            return self
+        self._install(records)
+        self._stamp = stamp
+        self.error = None
+        return self
+
+    def _install(self, records):
+        by_id, grid = {}, {}
+        for z in records:
+            by_id[z["id"]] = z
+            self.intern(z["id"])
+            if z.get("lat") is not None and z.get("lon") is not None:
+                grid.setdefault(self._cell(z["lat"], z["lon"]), []).append(z)
+        rows, cols = [i for i, _ in grid], [j for _, j in grid]
+        extent = (min(rows), max(rows), min(cols), max(cols)) if grid else None
+        self._view = (by_id, grid, extent)  # one assignment: readers never see a half-built index
+        self.version += 1
+
+    # ── Lookup ─────────────────────────────────────────────────────────────────
+
+    def __len__(self):
+        return len(self._view[0])
+
+    def __iter__(self):
+        return iter(list(self._view[0].values()))
+
+    def __contains__(self, zone):
+        return zone in self._view[0]
+
+    def get(self, zone):
+        return self._view[0].get(zone)
+
+    def name(self, zone):
+        z = self._view[0].get(zone)
+        return z["name"] if z else zone
+
+    def intern(self, zone):
+        """Stable int for `zone`, assigning the next one on first sight."""
+        code = self._codes.get(zone)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(zone)
+                if code is None:
+                    code = self._codes[zone] = len(self.ids)
+                    self.ids.append(zone)
+        return code
+
+    def codes(self, zones, assign=False):
+        """Interned ints as an int64 array; -1 for ids never seen, unless `assign`."""
+        import numpy as np
+        zones = zones.tolist() if hasattr(zones, "tolist") else zones
+        get = self._codes.get
+        lookup = self.intern if assign else lambda zone: get(zone, -1)
+        return np.fromiter(map(lookup, zones), dtype=np.int64, count=len(zones))
+
+    def registered(self, zones):
+        """Vectorized membership: boolean array, True where the id is a current zone."""
+        import pandas as pd
+        return pd.Series(zones).isin(self._view[0].keys()).to_numpy()
+
+    # ── Spatial ────────────────────────────────────────────────────────────────
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.grid_deg), math.floor(lon / self.grid_deg))
+
+    def nearest(self, lat, lon, max_km=None):
+        """(record, km) of the closest zone, or None if none within `max_km`."""
+        _, grid, extent = self._view
+        if not grid:
+            return None
+        ci, cj = self._cell(lat, lon)
+        imin, imax, jmin, jmax = extent  # no ring past the farthest occupied cell
+        span = max(ci - imin, imax - ci, cj - jmin, jmax - cj, 0)
+        best, best_km = None, math.inf
+        for r in range(span + 1):
+            # Anything in ring r or beyond is at least (r - 1) cells away
+            floor_km = (max(r - 1, 0) * self.grid_deg * KM_PER_DEG
+                        * math.cos(math.radians(min(89.0, abs(lat) + r * self.grid_deg))))
+            if floor_km >= best_km or (max_km is not None and floor_km > max_km):
+                break
+            for cell in self._ring(ci, cj, r):
+                for z in grid.get(cell, ()):
+                    km = haversine_km(lat, lon, z["lat"], z["lon"])
+                    if km < best_km:
+                        best, best_km = z, km
+        if best is None or (max_km is not None and best_km > max_km):
+            return None
+        return best, round(best_km, 3)
+
+    @staticmethod
+    def _ring(ci, cj, r):
+        if r == 0:
+            yield ci, cj
+            return
+        for d in range(-r, r + 1):
+            yield ci - r, cj + d
+            yield ci + r, cj + d
+        for d in range(-r + 1, r):
+            yield ci + d, cj - r
+            yield ci + d, cj + r
+
+
+_registry = None
+
+
+def registry():
+    """Process-wide registry, refreshed from ZONES_FILE when it changes."""
+    global _registry
+    if _registry is None:
+        _registry = ZoneRegistry()
+    return _registry.refresh()
+
+
+def write_default(path=ZONES_FILE):
+    """Seed `path` with config.ZONES (used by pipeline bootstrap)."""
+    Path(path).write_text(json.dumps({"zones": ZONES}, indent=2) + "\n")